@@ -0,0 +1,90 @@
+import argparse
+import json
+import statistics
+import sys
+import time
+sys.path.append('.')
+
+from src.ingestion.embedder import Embedder
+from src.ingestion.onnx_embedder import OnnxEmbedder, parity_check
+from loguru import logger
+
+SAMPLE_TEXTS = [
+    "How do I reset my VPN password?",
+    "Deployment guide for the payments service on Kubernetes",
+    "Jira PROJ-118: login page returns 500 after SSO redirect",
+    "What were the key decisions in last week's sprint planning?",
+    "Security policy for rotating production database credentials",
+    "The ingestion pipeline chunks documents into 500 character windows with 50 characters of overlap.",
+    "Slack #support: customers report slow search results since the last release",
+    "System architecture overview of the enterprise search API and its agents",
+]
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(q * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def benchmark(name, embedder, texts, single_runs, batch_size):
+    embedder.embed_batch(texts[:batch_size])  # warm up
+
+    latencies = []
+    for i in range(single_runs):
+        start = time.perf_counter()
+        embedder.embed_text(texts[i % len(texts)])
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    embedder.embed_batch(texts, batch_size=batch_size)
+    elapsed = time.perf_counter() - start
+
+    result = {
+        "backend": name,
+        "single_p50_ms": round(statistics.median(latencies), 2),
+        "single_p95_ms": round(percentile(latencies, 0.95), 2),
+        "single_p99_ms": round(percentile(latencies, 0.99), 2),
+        "batch_throughput_per_s": round(len(texts) / elapsed, 1),
+    }
+    logger.info(result)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare PyTorch and ONNX embedding backends")
+    parser.add_argument("--texts", type=int, default=512, help="Texts in the throughput run")
+    parser.add_argument("--single-runs", type=int, default=200, help="Single-text encodes for latency")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--min-cosine", type=float, default=0.99, help="Fail if parity drops below this")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    texts = [f"{SAMPLE_TEXTS[i % len(SAMPLE_TEXTS)]} ({i})" for i in range(args.texts)]
+
+    torch_embedder = Embedder()
+    candidates = {
+        "onnx-fp32": OnnxEmbedder(quantize=False),
+        "onnx-int8": OnnxEmbedder(quantize=True),
+    }
+
+    results = [benchmark("torch", torch_embedder, texts, args.single_runs, args.batch_size)]
+    failed = False
+    for name, embedder in candidates.items():
+        result = benchmark(name, embedder, texts, args.single_runs, args.batch_size)
+        result["parity"] = parity_check(torch_embedder, embedder, texts[:128])
+        logger.info(f"{name} parity vs torch: {result['parity']}")
+        failed |= result["parity"]["min_cosine"] < args.min_cosine
+        results.append(result)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if failed:
+        logger.error(f"Parity check failed: min cosine below {args.min_cosine}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+import argparse
+import itertools
+import json
+import sys
+import time
+sys.path.append('.')
+
+import chromadb
+import numpy as np
+from chromadb.config import Settings as ChromaSettings
+from src.storage.vector_store import VectorStore
+from benchmark_vectors import make_queries
+from loguru import logger
+
+
+def load_vectors(synthetic: int, dimension: int) -> np.ndarray:
+    """Embeddings from the live collection, or random unit vectors"""
+    if synthetic:
+        rng = np.random.default_rng(0)
+        vectors = rng.standard_normal((synthetic, dimension)).astype(np.float32)
+    else:
+        store = VectorStore()
+        vectors = np.asarray(store.collection.get(include=["embeddings"])["embeddings"], dtype=np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def exact_top_k(vectors: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    scores = queries @ vectors.T
+    top = np.argpartition(-scores, kth=min(k, len(vectors) - 1), axis=1)[:, :k]
+    order = np.take_along_axis(scores, top, axis=1).argsort(axis=1)[:, ::-1]
+    return np.take_along_axis(top, order, axis=1)
+
+
+def run_config(client, vectors, queries, truth, k, space, m, construction_ef, search_ef):
+    name = f"bench_{space}_{m}_{construction_ef}_{search_ef}"
+    try:
+        client.delete_collection(name)
+    except Exception:
+        pass
+    collection = client.create_collection(
+        name=name,
+        metadata={
+            "hnsw:space": space,
+            "hnsw:M": m,
+            "hnsw:construction_ef": construction_ef,
+            "hnsw:search_ef": search_ef,
+        },
+    )
+
+    ids = [str(i) for i in range(len(vectors))]
+    start = time.perf_counter()
+    for offset in range(0, len(vectors), 5000):
+        collection.add(ids=ids[offset:offset + 5000], embeddings=vectors[offset:offset + 5000].tolist())
+    build_seconds = time.perf_counter() - start
+
+    latencies, hits = [], 0
+    for query, expected in zip(queries, truth):
+        start = time.perf_counter()
+        result = collection.query(query_embeddings=[query.tolist()], n_results=k, include=[])
+        latencies.append((time.perf_counter() - start) * 1000)
+        hits += len({int(i) for i in result["ids"][0]} & set(expected.tolist()))
+
+    client.delete_collection(name)
+    return {
+        "space": space,
+        "M": m,
+        "construction_ef": construction_ef,
+        "search_ef": search_ef,
+        f"recall@{k}": round(hits / (len(queries) * k), 4),
+        "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+        "p99_ms": round(float(np.percentile(latencies, 99)), 3),
+        "build_seconds": round(build_seconds, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep HNSW parameters for recall@k and query latency")
+    parser.add_argument("--synthetic", type=int, default=0, help="Use N random vectors instead of the collection")
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--noise", type=float, default=0.05)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--spaces", default="cosine,l2")
+    parser.add_argument("--m", default="8,16,32")
+    parser.add_argument("--construction-ef", default="100,200")
+    parser.add_argument("--search-ef", default="10,32,64,128")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    vectors = load_vectors(args.synthetic, args.dimension)
+    if len(vectors) <= args.k:
+        logger.error(f"Need more than {args.k} vectors, found {len(vectors)}")
+        sys.exit(1)
+
+    queries = make_queries(vectors, args.queries, args.noise)
+    truth = exact_top_k(vectors, queries, args.k)
+    logger.info(f"Benchmarking {len(vectors)} vectors with {len(queries)} queries")
+
+    client = chromadb.Client(ChromaSettings(anonymized_telemetry=False))
+    grid = itertools.product(
+        args.spaces.split(","),
+        [int(v) for v in args.m.split(",")],
+        [int(v) for v in args.construction_ef.split(",")],
+        [int(v) for v in args.search_ef.split(",")],
+    )
+
+    results = []
+    for space, m, construction_ef, search_ef in grid:
+        result = run_config(client, vectors, queries, truth, args.k, space, m, construction_ef, search_ef)
+        logger.info(result)
+        results.append(result)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
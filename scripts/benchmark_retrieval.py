@@ -0,0 +1,65 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+sys.path.append('.')
+
+from generate_dummy_data import generate_all
+from src.evaluation.dataset import build_queries, save_queries
+from src.evaluation.harness import configure_isolated_settings, ingest_corpus, run_benchmark, compare
+from loguru import logger
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Offline retrieval quality and latency benchmark on the synthetic corpus"
+    )
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42, help="Seed for the corpus and the query set")
+    parser.add_argument("--workdir", help="Keep the corpus and index here instead of a temp dir")
+    parser.add_argument("--output", default="data/benchmarks/retrieval_baseline.json")
+    parser.add_argument("--baseline", help="Earlier result to report deltas against")
+    parser.add_argument("--max-recall-drop", type=float, default=0.02,
+                        help="Exit non-zero if recall@k drops more than this versus --baseline")
+    args = parser.parse_args()
+
+    output = os.path.abspath(args.output)
+    baseline_path = os.path.abspath(args.baseline) if args.baseline else None
+    workdir = args.workdir or tempfile.mkdtemp(prefix="retrieval_benchmark_")
+    configure_isolated_settings(workdir)
+
+    data_dir = os.path.join(workdir, "data")
+    generate_all(data_dir, seed=args.seed)
+    documents = asyncio.run(ingest_corpus(data_dir))
+
+    queries = build_queries(documents, seed=args.seed)
+    save_queries(queries, os.path.join(workdir, "queries.jsonl"))
+    logger.info(f"Built {len(queries)} labelled queries from {len(documents)} documents in {workdir}")
+
+    report = run_benchmark(queries, k=args.k)
+    report["config"]["seed"] = args.seed
+
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    logger.info(f"Wrote results to {output}")
+
+    if baseline_path:
+        with open(baseline_path, "r") as f:
+            deltas = compare(report, json.load(f))
+        logger.info(f"Change versus {baseline_path}: {deltas}")
+
+        recall_key = f"recall@{args.k}"
+        regressed = [
+            name for name, delta in deltas.items()
+            if delta.get(recall_key, 0.0) < -args.max_recall_drop
+        ]
+        if regressed:
+            logger.error(f"{recall_key} regressed for {regressed}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import argparse
+import itertools
+import json
+import os
+import sys
+import tempfile
+import time
+sys.path.append('.')
+
+import numpy as np
+from src import registry
+from src.storage.reduced_index import ReducedIndex, TwoStageSearcher
+from benchmark_vectors import make_queries
+from src.evaluation.ranking import percentiles
+from loguru import logger
+
+
+def load_store_vectors(store):
+    ids, vectors = [], []
+    for chunks in store.iter_chunks():
+        for chunk in chunks:
+            ids.append(chunk["id"])
+            vectors.append(chunk["embedding"])
+    vectors = np.asarray(vectors, dtype=np.float32)
+    return ids, vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def measure(name, search, queries, truth, k):
+    latencies, hits = [], 0
+    for query, expected in zip(queries, truth):
+        start = time.perf_counter()
+        found = {result["id"] for result in search(query.tolist(), k)}
+        latencies.append((time.perf_counter() - start) * 1000)
+        hits += len(found & expected)
+
+    result = {
+        "path": name,
+        f"recall@{k}": round(hits / (len(queries) * k), 4),
+        **{f"{key}_ms": round(value, 2) for key, value in percentiles(latencies).items()},
+    }
+    logger.info(result)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recall and latency of two-stage versus single-stage retrieval")
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--noise", type=float, default=0.05)
+    parser.add_argument("--methods", default="pca,truncate")
+    parser.add_argument("--dimensions", default="32,64,128")
+    parser.add_argument("--dtypes", default="int8,float16")
+    parser.add_argument("--shortlists", default="50,100,200,500")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    store = registry.get_vector_store()
+    ids, vectors = load_store_vectors(store)
+    if len(ids) <= args.k:
+        logger.error(f"Need more than {args.k} indexed chunks, found {len(ids)}")
+        sys.exit(1)
+
+    queries = make_queries(vectors, args.queries, args.noise)
+    exact = np.argsort(-(queries @ vectors.T), axis=1)[:, :args.k]
+    truth = [{ids[i] for i in row} for row in exact]
+
+    results = [
+        measure("single-stage", lambda q, k: store.search(q, n_results=k), queries, truth, args.k)
+    ]
+
+    workdir = tempfile.mkdtemp(prefix="reduced_index_")
+    grid = itertools.product(
+        args.methods.split(","),
+        [int(d) for d in args.dimensions.split(",")],
+        args.dtypes.split(","),
+    )
+    for method, dimension, dtype in grid:
+        index = ReducedIndex.build(
+            store,
+            path=os.path.join(workdir, f"{method}_{dimension}_{dtype}"),
+            dimension=dimension,
+            method=method,
+            dtype=dtype
+        )
+        for shortlist in [int(s) for s in args.shortlists.split(",")]:
+            searcher = TwoStageSearcher(store, index, shortlist_size=shortlist)
+            result = measure(
+                f"two-stage {method} {dimension}d {dtype} shortlist={shortlist}",
+                lambda q, k: searcher.search(q, n_results=k),
+                queries, truth, args.k
+            )
+            result["index_mb"] = round(index.codes.nbytes / 1e6, 2)
+            results.append(result)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
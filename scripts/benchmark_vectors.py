@@ -0,0 +1,9 @@
+import numpy as np
+
+
+def make_queries(vectors: np.ndarray, n_queries: int, noise: float) -> np.ndarray:
+    """Perturbed copies of stored unit vectors, so each query has a realistic neighbourhood"""
+    rng = np.random.default_rng(1)
+    picks = vectors[rng.choice(len(vectors), size=n_queries, replace=len(vectors) < n_queries)]
+    queries = picks + noise * rng.standard_normal(picks.shape).astype(np.float32)
+    return queries / np.linalg.norm(queries, axis=1, keepdims=True)
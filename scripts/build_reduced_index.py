@@ -0,0 +1,29 @@
+import argparse
+import sys
+sys.path.append('.')
+
+from src import registry
+from src.storage.reduced_index import ReducedIndex
+from config.settings import settings
+from loguru import logger
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the reduced-dimension index for two-stage retrieval")
+    parser.add_argument("--method", choices=["pca", "truncate"], default=settings.REDUCED_METHOD)
+    parser.add_argument("--dimension", type=int, default=settings.REDUCED_DIMENSION)
+    parser.add_argument("--dtype", choices=["int8", "float16"], default=settings.REDUCED_DTYPE)
+    parser.add_argument("--path", default=settings.REDUCED_INDEX_DIR)
+    args = parser.parse_args()
+
+    index = ReducedIndex.build(
+        registry.get_vector_store(),
+        path=args.path,
+        dimension=args.dimension,
+        method=args.method,
+        dtype=args.dtype
+    )
+    logger.info(f"✅ Reduced index with {len(index)} vectors written to {args.path}")
+    logger.info("Set TWO_STAGE_ENABLED=true to search with it")
+
+if __name__ == "__main__":
+    main()
@@ -10,10 +10,10 @@ def ensure_dir(directory):
     """Ensure directory exists"""
     os.makedirs(directory, exist_ok=True)
 
-def generate_confluence_data():
+def generate_confluence_data(base_dir="data"):
     """Generate dummy Confluence pages"""
     print("Generating Confluence data...")
-    ensure_dir("data/confluence")
+    ensure_dir(f"{base_dir}/confluence")
     
     spaces = ["Engineering", "Product", "Marketing", "HR"]
     page_types = ["Requirements", "Design", "Tutorial", "Meeting Notes", "Architecture"]
@@ -56,15 +56,15 @@ def generate_confluence_data():
         documents.append(doc)
         
         # Save individual files
-        with open(f"data/confluence/CONF-{i+1000}.json", 'w') as f:
+        with open(f"{base_dir}/confluence/CONF-{i+1000}.json", 'w') as f:
             json.dump(doc, f, indent=2)
     
     print(f"Generated {len(documents)} Confluence documents")
 
-def generate_jira_data():
+def generate_jira_data(base_dir="data"):
     """Generate dummy Jira issues"""
     print("Generating Jira data...")
-    ensure_dir("data/jira")
+    ensure_dir(f"{base_dir}/jira")
     
     issue_types = ["Bug", "Task", "Story", "Epic"]
     priorities = ["High", "Medium", "Low", "Critical"]
@@ -87,15 +87,15 @@ def generate_jira_data():
             "comments": "\n".join([f"{fake.name()}: {fake.sentence()}" for _ in range(random.randint(0, 3))])
         }
         
-        with open(f"data/jira/PROJ-{i+100}.json", 'w') as f:
+        with open(f"{base_dir}/jira/PROJ-{i+100}.json", 'w') as f:
             json.dump(doc, f, indent=2)
     
     print(f"Generated 40 Jira issues")
 
-def generate_slack_data():
+def generate_slack_data(base_dir="data"):
     """Generate dummy Slack messages"""
     print("Generating Slack data...")
-    ensure_dir("data/slack")
+    ensure_dir(f"{base_dir}/slack")
     
     channels = ["general", "engineering", "product", "random", "support"]
     
@@ -110,15 +110,15 @@ def generate_slack_data():
             "permalink": f"https://slack.example.com/archives/C123/{i+5000}"
         }
         
-        with open(f"data/slack/SLACK-{i+5000}.json", 'w') as f:
+        with open(f"{base_dir}/slack/SLACK-{i+5000}.json", 'w') as f:
             json.dump(doc, f, indent=2)
     
     print(f"Generated 50 Slack messages")
 
-def generate_document_data():
+def generate_document_data(base_dir="data"):
     """Generate dummy text documents"""
     print("Generating documents...")
-    ensure_dir("data/documents")
+    ensure_dir(f"{base_dir}/documents")
     
     doc_types = [
         "API Documentation",
@@ -161,19 +161,27 @@ def generate_document_data():
         """
         
         filename = f"{doc_type.replace(' ', '_').lower()}_{i+1}.txt"
-        with open(f"data/documents/{filename}", 'w') as f:
+        with open(f"{base_dir}/documents/{filename}", 'w') as f:
             f.write(content)
     
     print(f"Generated 30 documents")
 
+def generate_all(base_dir="data", seed=None):
+    """Generate every source under base_dir; a seed makes the corpus reproducible"""
+    if seed is not None:
+        random.seed(seed)
+        Faker.seed(seed)
+
+    generate_confluence_data(base_dir)
+    generate_jira_data(base_dir)
+    generate_slack_data(base_dir)
+    generate_document_data(base_dir)
+
 if __name__ == "__main__":
     print("🎲 Generating dummy enterprise data...")
     print("=" * 50)
     
-    generate_confluence_data()
-    generate_jira_data()
-    generate_slack_data()
-    generate_document_data()
+    generate_all()
     
     print("=" * 50)
     print("✅ Dummy data generation complete!")
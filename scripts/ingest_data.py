@@ -25,24 +25,17 @@ async def main():
         DocumentConnector()
     ]
     
-    total_docs = 0
+    # Connectors are fetched concurrently and their documents streamed into
+    # the chunk, embed and store stages as they arrive
+    result = await pipeline.ingest_sources(connectors)
     
-    for connector in connectors:
-        logger.info(f"Fetching documents from {connector.source_name}...")
-        
-        try:
-            documents = await connector.fetch_documents()
-            logger.info(f"Found {len(documents)} documents from {connector.source_name}")
-            
-            if documents:
-                result = await pipeline.ingest_documents(documents)
-                logger.info(f"Ingested {result['chunks_created']} chunks from {result['documents_processed']} documents")
-                total_docs += result['documents_processed']
-        
-        except Exception as e:
-            logger.error(f"Error ingesting from {connector.source_name}: {e}")
-    
-    logger.info(f" Ingestion complete! Total documents: {total_docs}")
+    for name, stage in result["stages"].items():
+        logger.info(f"  {name}: {stage['workers']} workers, {stage['utilisation']:.0%} busy")
+    logger.info(
+        f" Ingestion complete! Total documents: {result['documents_processed']} "
+        f"({result['chunks_created']} chunks, {result['failed_documents']} failed) "
+        f"in {result['elapsed_seconds']}s"
+    )
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,189 @@
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+sys.path.append('.')
+
+import httpx
+from src.evaluation.ranking import percentiles
+from loguru import logger
+
+SAMPLE_QUERIES = [
+    "How do I deploy the payments service?",
+    "Open critical bugs in the login flow",
+    "What did the team decide about the database migration?",
+    "Security policy for production credentials",
+    "API documentation for the search endpoint",
+    "Recent discussions in the support channel",
+    "System architecture overview",
+    "Performance issues reported last week",
+]
+
+
+async def measure_loop_lag(samples: list, interval: float = 0.01):
+    """How late the event loop wakes a sleeping task; large values mean something blocked it"""
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append((time.perf_counter() - start - interval) * 1000)
+
+
+async def run_level(client: httpx.AsyncClient, concurrency: int, duration: float, unique: bool, in_process: bool):
+    latencies, statuses, errors = [], {}, 0
+    counter = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        nonlocal counter, errors
+        while time.perf_counter() < deadline:
+            counter += 1
+            query = SAMPLE_QUERIES[counter % len(SAMPLE_QUERIES)]
+            if unique:
+                # Distinct text defeats request coalescing and the LLM cache
+                query = f"{query} #{counter}"
+
+            start = time.perf_counter()
+            try:
+                response = await client.post("/api/v1/search", json={"query": query, "max_results": 5})
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+                if response.status_code != 200:
+                    errors += 1
+            except httpx.HTTPError as e:
+                statuses[type(e).__name__] = statuses.get(type(e).__name__, 0) + 1
+                errors += 1
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    loop_lag = []
+    lag_task = asyncio.create_task(measure_loop_lag(loop_lag)) if in_process else None
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    if lag_task:
+        lag_task.cancel()
+
+    result = {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "throughput_rps": round(len(latencies) / elapsed, 2),
+        "error_rate": round(errors / len(latencies), 4) if latencies else 0.0,
+        "statuses": {str(status): count for status, count in statuses.items()},
+        "latency_ms": {
+            key: round(value, 1)
+            for key, value in percentiles(latencies, points=(50, 90, 99, 100)).items()
+        },
+    }
+    if in_process:
+        result["loop_lag_ms"] = {
+            key: round(value, 1) for key, value in percentiles(loop_lag, points=(50, 99, 100)).items()
+        }
+    logger.info(result)
+    return result
+
+
+async def sweep(client, levels, duration, unique, in_process):
+    # One request first so model loading and connection setup are not measured
+    await client.post("/api/v1/search", json={"query": "warm up", "max_results": 5})
+    return [await run_level(client, level, duration, unique, in_process) for level in levels]
+
+
+async def run_in_process(args):
+    from src.api.main import app, lifespan
+
+    transport = httpx.ASGITransport(app=app)
+    # ASGITransport does not send lifespan events, so run startup/shutdown around the sweep
+    async with lifespan(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=args.timeout) as client:
+            return await sweep(client, args.levels, args.duration, args.unique, in_process=True)
+
+
+async def run_against(url: str, args):
+    limits = httpx.Limits(max_connections=max(args.levels), max_keepalive_connections=max(args.levels))
+    async with httpx.AsyncClient(base_url=url, timeout=args.timeout, limits=limits) as client:
+        return await sweep(client, args.levels, args.duration, args.unique, in_process=False)
+
+
+def start_server(args) -> subprocess.Popen:
+    """Local uvicorn with the stub LLM, for measuring worker counts"""
+    env = {
+        **os.environ,
+        "LLM_PROVIDER": "stub",
+        "LLM_STUB_LATENCY_MS": str(args.llm_latency_ms),
+        "LLM_CACHE_ENABLED": "false",
+    }
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "src.api.main:app",
+            "--host", "127.0.0.1", "--port", str(args.port), "--workers", str(args.workers),
+            "--log-level", "warning",
+        ],
+        env=env,
+    )
+
+    deadline = time.time() + args.startup_timeout
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{args.port}/health").status_code == 200:
+                return server
+        except httpx.HTTPError:
+            pass
+        if server.poll() is not None:
+            raise RuntimeError("uvicorn exited during startup")
+        time.sleep(0.5)
+
+    server.terminate()
+    raise RuntimeError(f"Server not ready after {args.startup_timeout}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive /search at increasing concurrency with a stub LLM")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--url", help="Target an already running server (start it with LLM_PROVIDER=stub)")
+    mode.add_argument("--server", action="store_true", help="Start a local uvicorn server for the run")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers with --server")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--startup-timeout", type=float, default=120.0)
+    parser.add_argument("--levels", default="1,2,4,8,16,32", help="Comma-separated concurrency levels")
+    parser.add_argument("--duration", type=float, default=15.0, help="Seconds per concurrency level")
+    parser.add_argument("--llm-latency-ms", type=float, default=300.0, help="Stub completion time")
+    parser.add_argument("--repeat-queries", dest="unique", action="store_false",
+                        help="Reuse a small query set, so coalescing and caches take effect")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+    args.levels = [int(level) for level in args.levels.split(",")]
+
+    if args.url:
+        results = asyncio.run(run_against(args.url, args))
+    elif args.server:
+        server = start_server(args)
+        try:
+            results = asyncio.run(run_against(f"http://127.0.0.1:{args.port}", args))
+        finally:
+            server.terminate()
+            server.wait()
+    else:
+        from config.settings import settings
+        settings.LLM_PROVIDER = "stub"
+        settings.LLM_STUB_LATENCY_MS = args.llm_latency_ms
+        settings.LLM_CACHE_ENABLED = False
+        results = asyncio.run(run_in_process(args))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {"mode": "url" if args.url else "server" if args.server else "in-process",
+                 "workers": args.workers if args.server else None,
+                 "llm_latency_ms": args.llm_latency_ms,
+                 "levels": results},
+                f,
+                indent=2
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import argparse
+import sys
+sys.path.append('.')
+
+from src.storage.vector_store import VectorStore
+from src.storage.sharded_vector_store import ShardedVectorStore
+from config.settings import settings
+from loguru import logger
+
+def migrate():
+    """Rebuild the collection with the HNSW settings from config"""
+
+    store = VectorStore()
+    logger.info(
+        f"Rebuilding {store.collection_name} (space={store.space}) with "
+        f"space={settings.CHROMA_DISTANCE} M={settings.HNSW_M} "
+        f"construction_ef={settings.HNSW_CONSTRUCTION_EF} search_ef={settings.HNSW_SEARCH_EF}"
+    )
+    copied = store.rebuild_collection()
+    logger.info(f"✅ Rebuilt {store.collection_name} with {copied} chunks")
+
+def rebuild_shard(value: str):
+    """Rebuild a single shard of the sharded layout"""
+
+    store = ShardedVectorStore()
+    copied = store.rebuild_shard(value)
+    logger.info(f"✅ Rebuilt shard {store.shard_name(value)} with {copied} chunks")
+
+def shard():
+    """Split the single collection into one collection per VECTOR_SHARD_KEY value"""
+
+    source = VectorStore()
+    store = ShardedVectorStore()
+    copied = store.import_collection(source)
+    logger.info(f"✅ Copied {copied} chunks into shards {store.count_by_shard()}")
+    logger.info(f"Set VECTOR_STORE_BACKEND=sharded to serve from them; {source.collection_name} is left in place")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild or re-partition the vector index")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--to-sharded", action="store_true", help="Copy the single collection into shards")
+    group.add_argument("--shard", help="Rebuild only the shard for this partition value")
+    args = parser.parse_args()
+
+    if args.to_sharded:
+        shard()
+    elif args.shard:
+        rebuild_shard(args.shard)
+    else:
+        migrate()
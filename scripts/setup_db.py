@@ -1,9 +1,7 @@
 import sys
 sys.path.append('.')
 
-from src.storage.metadata_store import MetadataStore, Base
-from sqlalchemy import create_engine
-from config.settings import settings
+from src.storage.metadata_store import MetadataStore, Base, create_db_engine
 from loguru import logger
 
 def setup_database():
@@ -12,7 +10,7 @@ def setup_database():
     logger.info("Setting up database...")
     
     try:
-        engine = create_engine(settings.DATABASE_URL)
+        engine = create_db_engine()
         Base.metadata.create_all(engine)
         logger.info("✅ Database tables created successfully")
         
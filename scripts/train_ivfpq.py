@@ -0,0 +1,84 @@
+import argparse
+import shutil
+import sys
+import time
+sys.path.append('.')
+
+import numpy as np
+from src.storage.vector_store import VectorStore
+from src.storage.ivfpq_store import IVFPQVectorStore
+from config.settings import settings
+from loguru import logger
+
+def sample_vectors(source, size: int, seed: int = 0) -> np.ndarray:
+    """Uniform reservoir sample of the source store's embeddings"""
+    rng = np.random.default_rng(seed)
+    reservoir, seen = [], 0
+    for chunks in source.iter_chunks():
+        for chunk in chunks:
+            if len(reservoir) < size:
+                reservoir.append(chunk["embedding"])
+            else:
+                slot = rng.integers(0, seen + 1)
+                if slot < size:
+                    reservoir[slot] = chunk["embedding"]
+            seen += 1
+    logger.info(f"Sampled {len(reservoir)} of {seen} vectors for training")
+    return np.asarray(reservoir, dtype=np.float32)
+
+def evaluate(source, store: IVFPQVectorStore, queries: int, k: int):
+    """Recall@k of the IVF-PQ store against the source store, using stored vectors as queries"""
+    sample = sample_vectors(source, queries, seed=1)
+    recalls, latencies = [], []
+    for query in sample:
+        expected = {hit["id"] for hit in source.search(query.tolist(), n_results=k)}
+        start = time.perf_counter()
+        found = {hit["id"] for hit in store.search(query.tolist(), n_results=k)}
+        latencies.append((time.perf_counter() - start) * 1000)
+        recalls.append(len(expected & found) / max(len(expected), 1))
+    logger.info(
+        f"nprobe={store.nprobe} refine={store.refine_factor}: recall@{k}={np.mean(recalls):.3f} "
+        f"p50={np.percentile(latencies, 50):.1f}ms p99={np.percentile(latencies, 99):.1f}ms"
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the IVF-PQ index from the Chroma collection")
+    parser.add_argument("--path", default=settings.IVFPQ_INDEX_DIR)
+    parser.add_argument("--nlist", type=int, default=settings.IVFPQ_NLIST)
+    parser.add_argument("--m", type=int, default=settings.IVFPQ_M)
+    parser.add_argument("--sample", type=int, default=settings.IVFPQ_TRAIN_SAMPLE)
+    parser.add_argument("--import", dest="import_chunks", action="store_true", help="Copy every chunk in after training")
+    parser.add_argument("--force", action="store_true", help="Replace an existing index at --path")
+    parser.add_argument("--evaluate", type=int, default=0, metavar="QUERIES", help="Measure recall against Chroma")
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.force:
+        shutil.rmtree(args.path, ignore_errors=True)
+
+    source = VectorStore()
+    store = IVFPQVectorStore(args.path)
+    if not store.trained:
+        store.train(sample_vectors(source, args.sample), nlist=args.nlist, m=args.m)
+
+    if args.import_chunks:
+        copied = 0
+        for chunks in source.iter_chunks():
+            store.add_documents(chunks)
+            copied += len(chunks)
+        logger.info(f"Imported {copied} chunks")
+
+    memory = store.memory_bytes()
+    full_bytes = store.count() * settings.EMBEDDING_DIMENSION * 4
+    logger.info(
+        f"✅ IVF-PQ store at {args.path}: {store.count()} chunks, "
+        f"{memory['in_memory'] / 1e6:.1f}MB in memory, {memory['codes_on_disk'] / 1e6:.1f}MB of codes "
+        f"vs {full_bytes / 1e6:.1f}MB of float32 vectors"
+    )
+
+    if args.evaluate:
+        evaluate(source, store, args.evaluate, args.k)
+    logger.info("Set VECTOR_STORE_BACKEND=ivfpq to serve from it; tune recall with IVFPQ_NPROBE")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+import argparse
+import asyncio
+import sys
+sys.path.append('.')
+
+from src.connectors.jira_connector import JiraConnector
+from src.connectors.slack_connector import SlackConnector
+from src.connectors.document_connector import DocumentConnector
+from src.ingestion.pipeline import IngestionPipeline
+from src.ingestion.watcher import IngestionWatcher
+from config.settings import settings
+from prometheus_client import start_http_server
+from loguru import logger
+
+async def main(backend: str | None, metrics_port: int):
+    """Keep the index in sync with data/ until interrupted"""
+
+    if metrics_port:
+        start_http_server(metrics_port)
+        logger.info(f"Serving watcher metrics on :{metrics_port}/metrics")
+
+    watcher = IngestionWatcher(
+        pipeline=IngestionPipeline(),
+        connectors=[JiraConnector(), SlackConnector(), DocumentConnector()],
+        backend=backend
+    )
+    await watcher.run()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Incrementally index data/ as files change")
+    parser.add_argument("--backend", choices=["auto", "inotify", "poll"], default=None)
+    parser.add_argument("--metrics-port", type=int, default=settings.WATCH_METRICS_PORT,
+                        help="Port for the Prometheus endpoint (0 disables it)")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(main(args.backend, args.metrics_port))
+    except KeyboardInterrupt:
+        logger.info("Watcher stopped")
@@ -0,0 +1,64 @@
+from typing import List, Dict, Any, Optional, Tuple
+from .. import registry
+from config.settings import settings
+import numpy as np
+import re
+
+
+class ExtractiveSynthesizer:
+    """Answer by quoting the retrieved sentences closest to the query, without an LLM
+
+    Source numbering matches SynthesisAgent._prepare_context, so the
+    [Source N] markers resolve through the same citation parser.
+    """
+
+    def __init__(self):
+        self.embedder = registry.get_embedder()
+        self.max_sentences = settings.EXTRACTIVE_MAX_SENTENCES
+        self.min_score = settings.EXTRACTIVE_MIN_SCORE
+
+    def answer(
+        self,
+        query: str,
+        docs: List[Dict[str, Any]],
+        query_embedding: Optional[List[float]] = None
+    ) -> str:
+        """query_embedding is the retrieval embedding when available; otherwise the query is encoded here"""
+        sentences = self._candidate_sentences(docs[:5])
+        if not sentences:
+            return ""
+
+        # Every candidate (and the query, if needed) in one encode, scored with a single matrix product
+        texts = [text for text, _ in sentences]
+        if query_embedding is None:
+            vectors = np.asarray(self.embedder.embed_batch([query] + texts), dtype=np.float32)
+        else:
+            vectors = np.vstack([
+                np.asarray(query_embedding, dtype=np.float32),
+                np.asarray(self.embedder.embed_batch(texts), dtype=np.float32)
+            ])
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True) + 1e-12
+        scores = vectors[1:] @ vectors[0]
+
+        best = [i for i in np.argsort(-scores)[:self.max_sentences] if scores[i] >= self.min_score]
+        if not best:
+            best = [int(np.argmax(scores))]
+
+        return "\n".join(
+            f"- {sentences[i][0]} [Source {sentences[i][1]}]" for i in best
+        )
+
+    @staticmethod
+    def _candidate_sentences(docs: List[Dict[str, Any]]) -> List[Tuple[str, int]]:
+        """(sentence, source number) pairs; overlapping chunks repeat text, so keep the first copy"""
+        seen = set()
+        candidates = []
+        for idx, doc in enumerate(docs, 1):
+            for sentence in re.split(r"(?<=[.!?])\s+|\n+", doc["content"]):
+                sentence = sentence.strip()
+                # Chunk boundaries cut sentences; fragments under four words are noise
+                if len(sentence.split()) < 4 or sentence in seen:
+                    continue
+                seen.add(sentence)
+                candidates.append((sentence, idx))
+        return candidates
@@ -0,0 +1,220 @@
+from typing import Dict, Iterable, Optional
+from functools import lru_cache
+from config.settings import settings
+from ..monitoring.metrics import CACHE_EVENTS
+from loguru import logger
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+
+class LLMCache:
+    """Persistent completion cache keyed by (provider, model, temperature, prompt hash)"""
+
+    def __init__(
+        self,
+        path: str | None = None,
+        max_entries: int | None = None
+    ):
+        self.path = path or settings.LLM_CACHE_PATH
+        self.max_entries = max_entries or settings.LLM_CACHE_MAX_ENTRIES
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        # key -> last access time of hits not yet written; flushed before
+        # eviction and every LLM_CACHE_ACCESS_FLUSH_SECONDS by a background
+        # thread, so a hit never commits to disk
+        self._accessed: Dict[str, float] = {}
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS completions (
+                key TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                completion TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_completions_last_access
+                ON completions(last_access);
+            CREATE TABLE IF NOT EXISTS completion_chunks (
+                key TEXT NOT NULL,
+                chunk_id TEXT NOT NULL,
+                PRIMARY KEY (key, chunk_id)
+            );
+            CREATE INDEX IF NOT EXISTS idx_completion_chunks_chunk
+                ON completion_chunks(chunk_id);
+        """)
+        self._conn.commit()
+
+        self._flusher = threading.Thread(target=self._flush_periodically, name="llm-cache-flush", daemon=True)
+        self._flusher.start()
+
+    @staticmethod
+    def make_key(provider: str, model: str, temperature: float, prompt: str) -> str:
+        prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        return f"{provider}:{model}:{temperature:.3f}:{prompt_hash}"
+
+    def get(
+        self,
+        prompt: str,
+        temperature: float,
+        kind: str = "default"
+    ) -> Optional[str]:
+        """Return the cached completion for a prompt, or None on a miss"""
+        key = self.make_key(settings.LLM_PROVIDER, settings.LLM_MODEL, temperature, prompt)
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT completion FROM completions WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                self._on_lookup(kind, hit=False)
+                return None
+
+            self._accessed[key] = time.time()
+            self.hits += 1
+            self._on_lookup(kind, hit=True)
+            return row[0]
+
+    def set(
+        self,
+        prompt: str,
+        temperature: float,
+        completion: str,
+        kind: str = "default",
+        chunk_ids: Iterable[str] | None = None
+    ):
+        """Store a completion, tagging it with the chunk ids it was built from"""
+        key = self.make_key(settings.LLM_PROVIDER, settings.LLM_MODEL, temperature, prompt)
+        now = time.time()
+
+        with self._lock:
+            self._accessed.pop(key, None)
+            self._flush_access()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO completions (key, kind, completion, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, kind, completion, now, now)
+            )
+            self._conn.execute("DELETE FROM completion_chunks WHERE key = ?", (key,))
+            if chunk_ids:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO completion_chunks (key, chunk_id) VALUES (?, ?)",
+                    [(key, chunk_id) for chunk_id in chunk_ids]
+                )
+            self._evict()
+            self._conn.commit()
+
+    def invalidate_chunks(self, chunk_ids: Iterable[str]) -> int:
+        """Drop every entry that was built from any of the given chunks"""
+        chunk_ids = list(chunk_ids)
+        if not chunk_ids:
+            return 0
+
+        removed = 0
+        with self._lock:
+            for start in range(0, len(chunk_ids), 500):
+                batch = chunk_ids[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                keys = [
+                    row[0] for row in self._conn.execute(
+                        f"SELECT DISTINCT key FROM completion_chunks WHERE chunk_id IN ({placeholders})",
+                        batch
+                    )
+                ]
+                removed += self._delete_keys(keys)
+            self._conn.commit()
+
+        if removed:
+            logger.info(f"Invalidated {removed} cached completions for {len(chunk_ids)} changed chunks")
+        return removed
+
+    def flush(self):
+        """Write buffered last-access times"""
+        with self._lock:
+            self._flush_access()
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._accessed.clear()
+            self._conn.execute("DELETE FROM completions")
+            self._conn.execute("DELETE FROM completion_chunks")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM completions").fetchone()[0]
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": size,
+            "max_entries": self.max_entries
+        }
+
+    def _flush_access(self):
+        """Write buffered last-access times (lock held; the caller commits)"""
+        if not self._accessed:
+            return
+        self._conn.executemany(
+            "UPDATE completions SET last_access = ? WHERE key = ?",
+            [(accessed, key) for key, accessed in self._accessed.items()]
+        )
+        self._accessed.clear()
+
+    def _flush_periodically(self):
+        while True:
+            time.sleep(settings.LLM_CACHE_ACCESS_FLUSH_SECONDS)
+            if not self._accessed:
+                continue
+            try:
+                self.flush()
+            except Exception as e:
+                logger.warning(f"Error flushing LLM cache access times: {e}")
+
+    def _evict(self):
+        """Evict least recently used entries above the size limit (lock held)"""
+        size = self._conn.execute("SELECT COUNT(*) FROM completions").fetchone()[0]
+        overflow = size - self.max_entries
+        if overflow <= 0:
+            return
+
+        keys = [
+            row[0] for row in self._conn.execute(
+                "SELECT key FROM completions ORDER BY last_access ASC LIMIT ?", (overflow,)
+            )
+        ]
+        evicted = self._delete_keys(keys)
+        self.evictions += evicted
+        CACHE_EVENTS.labels(cache="llm", result="eviction").inc(evicted)
+
+    def _delete_keys(self, keys: list) -> int:
+        if not keys:
+            return 0
+        placeholders = ",".join("?" * len(keys))
+        self._conn.execute(f"DELETE FROM completion_chunks WHERE key IN ({placeholders})", keys)
+        self._conn.execute(f"DELETE FROM completions WHERE key IN ({placeholders})", keys)
+        return len(keys)
+
+    def _on_lookup(self, kind: str, hit: bool):
+        CACHE_EVENTS.labels(cache=f"llm_{kind}", result="hit" if hit else "miss").inc()
+
+
+@lru_cache
+def get_llm_cache() -> Optional[LLMCache]:
+    if not settings.LLM_CACHE_ENABLED:
+        return None
+    try:
+        return LLMCache()
+    except Exception as e:
+        logger.error(f"Error opening LLM cache, continuing without it: {e}")
+        return None
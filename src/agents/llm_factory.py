@@ -1,12 +1,16 @@
 from config.settings import settings
-from langchain_groq import ChatGroq
 
 def get_llm(temperature: float = 0.2):
     if settings.LLM_PROVIDER == "groq":
+        from langchain_groq import ChatGroq
         return ChatGroq(
             api_key=settings.GROQ_API_KEY,
             model=settings.LLM_MODEL,
             temperature=temperature
         )
 
+    if settings.LLM_PROVIDER == "stub":
+        from .stub_llm import StubLLM
+        return StubLLM(latency_ms=settings.LLM_STUB_LATENCY_MS)
+
     raise ValueError(f"Unsupported LLM provider: {settings.LLM_PROVIDER}")
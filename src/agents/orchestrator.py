@@ -1,9 +1,17 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 from .query_agent import QueryAgent
 from .retrieval_agent import RetrievalAgent
 from .synthesis_agent import SynthesisAgent
-from ..storage.metadata_store import MetadataStore
+from .singleflight import SingleFlight
+from .result_sets import ResultSetStore
+from .time_constraints import parse_time_constraint
+from .. import registry
+from ..storage.query_log_writer import QueryLogWriter
+from ..monitoring.metrics import track_stage, CACHE_EVENTS, ERRORS, SEARCH_LATENCY
+from ..monitoring.stats import query_stats
+from config.settings import settings
 from loguru import logger
+import copy
 import time
 
 class SearchOrchestrator:
@@ -13,57 +21,236 @@ class SearchOrchestrator:
         self.query_agent = QueryAgent()
         self.retrieval_agent = RetrievalAgent()
         self.synthesis_agent = SynthesisAgent()
-        #self.metadata_store = MetadataStore()
-        self.metadata_store = None
+        self.metadata_store = registry.get_metadata_store()
+        self.query_log_writer = None
+        if self.metadata_store and settings.QUERY_LOG_ENABLED:
+            self.query_log_writer = QueryLogWriter(self.metadata_store)
+        self._inflight = SingleFlight()
+        self.result_sets = ResultSetStore()
     
     def search(
         self,
         query: str,
         sources: List[str] = None,
+        max_results: int = 10,
+        answer_mode: str | None = None,
+        cursor: str | None = None
+    ) -> Dict[str, Any]:
+        """Execute search, sharing one execution between identical concurrent requests
+
+        With a cursor, the next page is served from the stored result set of
+        an earlier search; raises CursorExpired if it is gone.
+        """
+        
+        start_time = time.time()
+        
+        if cursor:
+            return self._next_page(cursor, max_results, start_time)
+        
+        if not settings.SEARCH_COALESCING_ENABLED:
+            result = self._execute_search(query, sources, max_results, answer_mode)
+        else:
+            key = self._coalescing_key(query, sources, max_results, answer_mode)
+            result, shared = self._inflight.do(
+                key,
+                lambda: self._execute_search(query, sources, max_results, answer_mode)
+            )
+            
+            if shared:
+                logger.info(f"Coalesced search for query: {query}")
+                CACHE_EVENTS.labels(cache="search_coalescing", result="hit").inc()
+                # Followers get their own copy so nobody mutates the leader's response
+                result = copy.deepcopy(result)
+                result["query"] = query
+        
+        latency_ms = int((time.time() - start_time) * 1000)
+        query_stats.record(latency_ms, result.get("sources_searched", []))
+        
+        # Log query off the request path
+        if self.query_log_writer:
+            self.query_log_writer.submit(
+                query=query,
+                results_count=len(result.get("documents", [])),
+                latency_ms=latency_ms,
+                sources=result.get("sources_searched", [])
+            )
+        return result
+    
+    def retrieve(
+        self,
+        query: str,
+        sources: List[str] = None,
+        max_results: int = 10,
+        cursor: str | None = None
+    ) -> Dict[str, Any]:
+        """Ranked documents only: rule-based query analysis and no synthesis, so no LLM calls"""
+        
+        start_time = time.time()
+        
+        if cursor:
+            page = self._next_page(cursor, max_results, start_time)
+            return {key: page[key] for key in ("query", "documents", "sources_searched", "latency_ms", "next_cursor")}
+        
+        with track_stage("query_analysis"):
+            query_analysis = self.query_agent.analyze_query(query, use_llm=False)
+        search_sources, ranked_docs, next_cursor, _ = self._rank(query, query_analysis, sources, max_results)
+        
+        latency_ms = int((time.time() - start_time) * 1000)
+        query_stats.record(latency_ms, search_sources)
+        return {
+            "query": query,
+            "documents": [self._format_document(doc) for doc in ranked_docs[:max_results]],
+            "sources_searched": search_sources,
+            "latency_ms": latency_ms,
+            "next_cursor": next_cursor
+        }
+    
+    def _rank(
+        self,
+        query: str,
+        query_analysis: Dict[str, Any],
+        sources: List[str] = None,
         max_results: int = 10
+    ) -> Tuple[List[str], List[Dict[str, Any]], str | None, Optional[List[float]]]:
+        """(sources searched, ranked documents, cursor past the first page or None, query embedding)"""
+        
+        # Determine sources
+        if sources:
+            search_sources = sources
+        else:
+            search_sources = query_analysis["sources"]
+            if "all" in search_sources:
+                search_sources = ["confluence", "jira", "slack", "documents"]
+        
+        # Retrieve enough candidates to page through
+        logger.info(f"Retrieving from sources: {search_sources}")
+        # A few pages deep: enough to page without re-running, without multiplying every search's cost
+        candidates = max_results
+        if settings.SEARCH_CURSOR_ENABLED:
+            candidates = max_results * max(1, settings.SEARCH_CURSOR_PAGES)
+        ranked_docs, query_embedding = self.retrieval_agent.retrieve_with_embedding(
+            query=query_analysis["reformulated_query"],
+            sources=search_sources,
+            max_results=candidates,
+            since=parse_time_constraint(query_analysis.get("time_constraint"))
+        )
+        
+        # Refresh citation fields from the document metadata table
+        self._apply_document_metadata(ranked_docs)
+        
+        next_cursor = None
+        if len(ranked_docs) > max_results:
+            set_id = self.result_sets.put({
+                "query": query,
+                "query_analysis": query_analysis,
+                "sources_searched": search_sources,
+                "documents": [self._format_document(doc) for doc in ranked_docs]
+            })
+            next_cursor = self.result_sets.make_cursor(set_id, max_results)
+        return search_sources, ranked_docs, next_cursor, query_embedding
+    
+    def _next_page(self, cursor: str, max_results: int, start_time: float) -> Dict[str, Any]:
+        """Slice the next page out of a stored result set; no retrieval, no LLM"""
+        with track_stage("cursor_page"):
+            result_set, documents, next_cursor = self.result_sets.page(cursor, max_results)
+        return {
+            "query": result_set["query"],
+            "query_analysis": result_set["query_analysis"],
+            "answer": "",
+            "citations": [],
+            "confidence": 0.0,
+            "answer_mode": None,
+            "documents": documents,
+            "sources_searched": result_set["sources_searched"],
+            "latency_ms": int((time.time() - start_time) * 1000),
+            "next_cursor": next_cursor
+        }
+    
+    def _apply_document_metadata(self, docs: List[Dict[str, Any]]):
+        """Overlay title/url/author from document_metadata with one indexed lookup"""
+        if not self.metadata_store or not settings.DOCUMENT_METADATA_ENABLED or not docs:
+            return
+        
+        try:
+            rows = self.metadata_store.get_documents(
+                [doc["metadata"]["source_id"] for doc in docs if "source_id" in doc["metadata"]]
+            )
+        except Exception as e:
+            logger.error(f"Error reading document metadata: {e}")
+            return
+        
+        for doc in docs:
+            row = rows.get(doc["metadata"].get("source_id"))
+            if not row:
+                continue
+            for key in ("title", "url", "author", "updated_at", "status"):
+                if row.get(key) is not None:
+                    doc["metadata"][key] = row[key]
+    
+    def close(self):
+        """Flush pending query logs"""
+        if self.query_log_writer:
+            self.query_log_writer.close()
+    
+    @staticmethod
+    def _format_document(doc: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "id": doc["id"],
+            "source": doc["metadata"]["source"],
+            "title": doc["metadata"]["title"],
+            "excerpt": doc["content"][:200],
+            "score": doc["score"],
+            "url": doc["metadata"].get("url")
+        }
+    
+    @staticmethod
+    def _coalescing_key(
+        query: str,
+        sources: List[str] = None,
+        max_results: int = 10,
+        answer_mode: str | None = None
+    ):
+        normalized_query = " ".join(query.lower().split())
+        normalized_sources = tuple(sorted({s.lower() for s in sources})) if sources else ()
+        return (normalized_query, normalized_sources, max_results, answer_mode or settings.SYNTHESIS_MODE)
+    
+    def _execute_search(
+        self,
+        query: str,
+        sources: List[str] = None,
+        max_results: int = 10,
+        answer_mode: str | None = None
     ) -> Dict[str, Any]:
         """Execute complete search workflow"""
         
         start_time = time.time()
+        answer_mode = answer_mode or settings.SYNTHESIS_MODE
         
         try:
             # Step 1: Analyze query
             logger.info(f"Analyzing query: {query}")
-            query_analysis = self.query_agent.analyze_query(query)
-            
-            # Determine sources
-            if sources:
-                search_sources = sources
-            else:
-                search_sources = query_analysis["sources"]
-                if "all" in search_sources:
-                    search_sources = ["confluence", "jira", "slack", "documents"]
+            # Extractive answers are for fast lookups, so skip the LLM entirely
+            with track_stage("query_analysis"):
+                query_analysis = self.query_agent.analyze_query(query, use_llm=answer_mode != "extractive")
             
             # Step 2: Retrieve relevant documents
-            logger.info(f"Retrieving from sources: {search_sources}")
-            retrieved_docs = self.retrieval_agent.retrieve(
-                query=query_analysis["reformulated_query"],
-                sources=search_sources,
-                max_results=max_results
+            search_sources, ranked_docs, next_cursor, query_embedding = self._rank(
+                query, query_analysis, sources, max_results
             )
+            retrieved_docs = ranked_docs[:max_results]
             
-            # Step 3: Synthesize answer
+            # Step 3: Synthesize answer from the first page only
             logger.info(f"Synthesizing answer from {len(retrieved_docs)} documents")
             result = self.synthesis_agent.synthesize_answer(
                 query=query,
-                retrieved_docs=retrieved_docs
+                retrieved_docs=retrieved_docs,
+                mode=answer_mode,
+                query_embedding=query_embedding
             )
             
             # Calculate latency
             latency_ms = int((time.time() - start_time) * 1000)
-            
-            # Log query
-            # self.metadata_store.log_query(
-            #     query=query,
-            #     results_count=len(retrieved_docs),
-            #     latency_ms=latency_ms,
-            #     sources=search_sources
-            # )
+            SEARCH_LATENCY.observe(latency_ms / 1000)
             
             # Build final response
             response = {
@@ -72,19 +259,11 @@ class SearchOrchestrator:
                 "answer": result["answer"],
                 "citations": result["citations"],
                 "confidence": result["confidence"],
-                "documents": [
-                    {
-                        "id": doc["id"],
-                        "source": doc["metadata"]["source"],
-                        "title": doc["metadata"]["title"],
-                        "excerpt": doc["content"][:200],
-                        "score": doc["score"],
-                        "url": doc["metadata"].get("url")
-                    }
-                    for doc in retrieved_docs
-                ],
+                "answer_mode": result.get("mode", answer_mode),
+                "documents": [self._format_document(doc) for doc in retrieved_docs],
                 "sources_searched": search_sources,
-                "latency_ms": latency_ms
+                "latency_ms": latency_ms,
+                "next_cursor": next_cursor
             }
             
             logger.info(f"Search completed in {latency_ms}ms")
@@ -92,6 +271,7 @@ class SearchOrchestrator:
             
         except Exception as e:
             logger.error(f"Error in search orchestration: {e}")
+            ERRORS.labels(stage="search").inc()
             return {
                 "query": query,
                 "answer": f"An error occurred: {str(e)}",
@@ -1,17 +1,24 @@
 from typing import Dict, List, Any
 from langchain_core.prompts import ChatPromptTemplate
-from  .llm_factory import get_llm
+from .. import registry
+from .llm_cache import get_llm_cache
+from ..monitoring.metrics import FALLBACKS
 from config.settings import settings
 from loguru import logger
 import re
 
 class QueryAgent:
     def __init__(self):
-        self.llm = get_llm(temperature=0.1)
+        self.temperature = 0.1
+        self.llm = registry.get_llm(temperature=self.temperature)
+        self.cache = get_llm_cache()
     
-    def analyze_query(self, query: str) -> Dict[str, Any]:
+    def analyze_query(self, query: str, use_llm: bool = True) -> Dict[str, Any]:
         """Analyze the user query to extract intent and context"""
         
+        if not use_llm:
+            return self._default_analysis(query)
+        
         prompt = ChatPromptTemplate.from_template("""
         Analyze the following user query and extract:
         1. Primary intent (search, question, summary, comparison)
@@ -31,8 +38,13 @@ class QueryAgent:
         """)
         
         try:
-            ai_message = self.llm.invoke(prompt.format(query=query))
-            response = ai_message.content
+            formatted_prompt = prompt.format(query=query)
+            response = self.cache.get(formatted_prompt, self.temperature, kind="query_analysis") if self.cache else None
+            if response is None:
+                ai_message = self.llm.invoke(formatted_prompt)
+                response = ai_message.content
+                if self.cache and response.strip():
+                    self.cache.set(formatted_prompt, self.temperature, response, kind="query_analysis")
 
 
             # Parse response
@@ -54,11 +66,17 @@ class QueryAgent:
             
         except Exception as e:
             logger.error(f"Error analyzing query: {e}")
-            return {
-                "original_query": query,
-                "intent": "search",
-                "entities": [],
-                "sources": ["all"],
-                "time_constraint": None,
-                "reformulated_query": query
-            }
\ No newline at end of file
+            FALLBACKS.labels(component="query_analysis").inc()
+            return self._default_analysis(query)
+    
+    @staticmethod
+    def _default_analysis(query: str) -> Dict[str, Any]:
+        """Search everything with the query as typed"""
+        return {
+            "original_query": query,
+            "intent": "search",
+            "entities": [],
+            "sources": ["all"],
+            "time_constraint": None,
+            "reformulated_query": query
+        }
\ No newline at end of file
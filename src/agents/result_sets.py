@@ -0,0 +1,71 @@
+from typing import Any, Dict, List, Optional, Tuple
+from collections import OrderedDict
+from config.settings import settings
+from ..monitoring.metrics import CACHE_EVENTS
+import secrets
+import threading
+import time
+
+
+class CursorExpired(LookupError):
+    """The cursor is malformed, or its result set was evicted or has expired"""
+
+
+class ResultSetStore:
+    """Short-lived, in-process ranked result sets that search cursors page through
+
+    A cursor is "<set id>.<offset>"; the set holds the formatted documents in
+    rank order, so serving a page is a slice. Sets expire after a TTL and the
+    least recently used are evicted beyond max_sets.
+    """
+
+    def __init__(self, ttl_seconds: int | None = None, max_sets: int | None = None):
+        self.ttl_seconds = ttl_seconds or settings.SEARCH_CURSOR_TTL_SECONDS
+        self.max_sets = max_sets or settings.SEARCH_CURSOR_MAX_SETS
+        self._lock = threading.Lock()
+        self._sets: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+    def put(self, result_set: Dict[str, Any]) -> str:
+        """Store a result set and return its id"""
+        set_id = secrets.token_urlsafe(12)
+        now = time.monotonic()
+        with self._lock:
+            self._sets[set_id] = (now + self.ttl_seconds, result_set)
+            while len(self._sets) > self.max_sets:
+                self._sets.popitem(last=False)
+            # Sweep expired sets from the least recently used end; page() checks expiry for the rest
+            while self._sets:
+                oldest_id, (expires_at, _) = next(iter(self._sets.items()))
+                if expires_at > now:
+                    break
+                del self._sets[oldest_id]
+        return set_id
+
+    @staticmethod
+    def make_cursor(set_id: str, offset: int) -> str:
+        return f"{set_id}.{offset}"
+
+    def page(self, cursor: str, size: int) -> Tuple[Dict[str, Any], List[Dict[str, Any]], Optional[str]]:
+        """(result set, documents of the page, cursor of the next page or None)"""
+        set_id, _, offset = cursor.rpartition(".")
+        if not set_id or not offset.isdigit():
+            raise CursorExpired(f"Malformed cursor: {cursor}")
+        offset = int(offset)
+
+        with self._lock:
+            entry = self._sets.get(set_id)
+            if entry is None or entry[0] <= time.monotonic():
+                self._sets.pop(set_id, None)
+                CACHE_EVENTS.labels(cache="search_cursor", result="miss").inc()
+                raise CursorExpired("Cursor expired; run the search again")
+            self._sets.move_to_end(set_id)
+        CACHE_EVENTS.labels(cache="search_cursor", result="hit").inc()
+
+        result_set = entry[1]
+        documents = result_set["documents"][offset:offset + size]
+        end = offset + size
+        next_cursor = self.make_cursor(set_id, end) if end < len(result_set["documents"]) else None
+        return result_set, documents, next_cursor
+
+    def __len__(self) -> int:
+        return len(self._sets)
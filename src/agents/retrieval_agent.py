@@ -1,39 +1,71 @@
-from typing import List, Dict, Any
-from ..storage.vector_store import VectorStore
-from ..ingestion.embedder import Embedder
+from typing import List, Dict, Any, Optional, Tuple
+from datetime import datetime
+from .. import registry
+from ..storage.reduced_index import ReducedIndex, TwoStageSearcher
+from ..monitoring.metrics import track_stage, ERRORS
 from config.settings import settings
 from loguru import logger
 
 class RetrievalAgent:
     def __init__(self):
-        self.vector_store = VectorStore()
-        self.embedder = Embedder()
+        self.vector_store = registry.get_vector_store()
+        self.embedder = registry.get_embedder()
+        self.two_stage = None
+        if settings.TWO_STAGE_ENABLED:
+            index = ReducedIndex.load()
+            if index is not None:
+                self.two_stage = TwoStageSearcher(self.vector_store, index)
+            else:
+                logger.warning("Two-stage search enabled but no reduced index is built; using single-stage search")
     
     def retrieve(
         self,
         query: str,
         sources: List[str] = None,
-        max_results: int = None
+        max_results: int = None,
+        since: Optional[datetime] = None
     ) -> List[Dict[str, Any]]:
         """Retrieve relevant documents using hybrid search"""
+        return self.retrieve_with_embedding(query, sources, max_results, since)[0]
+    
+    def retrieve_with_embedding(
+        self,
+        query: str,
+        sources: List[str] = None,
+        max_results: int = None,
+        since: Optional[datetime] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[List[float]]]:
+        """(ranked documents, query embedding or None on failure), so later stages need not re-embed"""
         
         max_results = max_results or settings.MAX_RESULTS
+        query_embedding = None
         
         try:
             # Generate query embedding
-            query_embedding = self.embedder.embed_text(query)
+            with track_stage("query_embedding"):
+                query_embedding = self.embedder.embed_text(query)
             
-            # Build filter for sources
-            where_filter = None
+            # Build filter for sources and time range
+            conditions = []
             if sources and "all" not in sources:
-                where_filter = {"source": {"$in": sources}}
+                conditions.append({"source": {"$in": sources}})
+            if since and settings.TIME_FILTER_ENABLED:
+                conditions.append({"updated_ts": {"$gte": since.timestamp()}})
+            where_filter = None
+            if len(conditions) == 1:
+                where_filter = conditions[0]
+            elif conditions:
+                where_filter = {"$and": conditions}
             
             # Perform vector search
-            results = self.vector_store.search(
-                query_embedding=query_embedding,
-                n_results=max_results * 2,  # Get more for reranking
-                where=where_filter
-            )
+            # Reduced-vector shortlist plus exact rescoring, when an index is built
+            searcher = self.two_stage or self.vector_store
+            with track_stage("vector_search"):
+                results = searcher.search(
+                    query_embedding=query_embedding,
+                    n_results=max_results * 2,  # Get more for reranking
+                    where=where_filter
+                )
             
             # Filter by similarity threshold
             # filtered_results = [
@@ -43,13 +75,15 @@ class RetrievalAgent:
             filtered_results = results
             
             # Rerank and deduplicate
-            reranked_results = self._rerank(query, filtered_results)
+            with track_stage("rerank"):
+                reranked_results = self._rerank(query, filtered_results)
             
-            return reranked_results[:max_results]
+            return reranked_results[:max_results], query_embedding
             
         except Exception as e:
             logger.error(f"Error retrieving documents: {e}")
-            return []
+            ERRORS.labels(stage="retrieval").inc()
+            return [], query_embedding
     
     def _rerank(self, query: str, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Reranking based on exact match and recency"""
@@ -0,0 +1,42 @@
+from dataclasses import dataclass
+import re
+import time
+
+
+@dataclass
+class StubMessage:
+    content: str
+
+
+class StubLLM:
+    """Deterministic stand-in for the chat model, for offline benchmarks
+
+    Query analysis passes the query through unchanged and searches all
+    sources, so retrieval quality is measured on the raw query. Synthesis
+    cites the top sources without generating text. latency_ms blocks the
+    calling thread like a synchronous HTTP call to a real provider would.
+    """
+
+    def __init__(self, latency_ms: float = 0.0):
+        self.latency_ms = latency_ms
+
+    def invoke(self, prompt: str) -> StubMessage:
+        if self.latency_ms > 0:
+            time.sleep(self.latency_ms / 1000)
+
+        if "REFORMULATED:" in prompt:
+            match = re.search(r"Query:\s*(.+)", prompt)
+            query = match.group(1).strip() if match else ""
+            return StubMessage(
+                content=(
+                    "INTENT: search\n"
+                    "ENTITIES: \n"
+                    "SOURCES: all\n"
+                    "TIME: none\n"
+                    f"REFORMULATED: {query}"
+                )
+            )
+
+        sources = sorted(set(re.findall(r"\[Source (\d+)\]", prompt)), key=int)[:3]
+        citations = " ".join(f"[Source {n}]" for n in sources)
+        return StubMessage(content=f"Stub answer based on {citations}".strip())
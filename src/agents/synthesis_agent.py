@@ -1,29 +1,52 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from langchain_core.prompts import ChatPromptTemplate
-from .llm_factory import get_llm
+from .. import registry
+from .llm_cache import get_llm_cache
+from .extractive_synthesizer import ExtractiveSynthesizer
+from ..monitoring.metrics import track_stage, FALLBACKS
 from config.settings import settings
 from loguru import logger
 
 class SynthesisAgent:
     def __init__(self):
-        self.llm = get_llm(temperature=0.3)
+        self.temperature = 0.3
+        self.llm = registry.get_llm(temperature=self.temperature)
+        self.cache = get_llm_cache()
+        self.extractive = ExtractiveSynthesizer()
     
     def synthesize_answer(
         self,
         query: str,
-        retrieved_docs: List[Dict[str, Any]]
+        retrieved_docs: List[Dict[str, Any]],
+        mode: str | None = None,
+        query_embedding: Optional[List[float]] = None
     ) -> Dict[str, Any]:
-        """Generate answer from retrieved documents with citations"""
+        """Generate answer from retrieved documents with citations
+
+        query_embedding, when retrieval already computed it, saves the
+        extractive path from encoding the query a second time.
+        """
+        
+        mode = mode or settings.SYNTHESIS_MODE
         
         if not retrieved_docs:
             return {
                 "answer": "I couldn't find any relevant information to answer your question.",
                 "citations": [],
-                "confidence": 0.0
+                "confidence": 0.0,
+                "mode": mode
             }
         
+        if mode == "extractive":
+            try:
+                return self._extractive_answer(query, retrieved_docs, query_embedding)
+            except Exception as e:
+                logger.error(f"Error building extractive answer: {e}")
+                return self._error_answer(mode)
+        
         # Prepare context from retrieved documents
-        context = self._prepare_context(retrieved_docs)
+        with track_stage("context_build"):
+            context = self._prepare_context(retrieved_docs)
         
         prompt = ChatPromptTemplate.from_template("""
         You are an enterprise search assistant. Answer the question based ONLY on the provided context.
@@ -40,10 +63,20 @@ class SynthesisAgent:
         """)
         
         try:
-            ai_message = self.llm.invoke(
-                prompt.format(context=context, query=query)
-            )
-            response = ai_message.content
+            formatted_prompt = prompt.format(context=context, query=query)
+            response = self.cache.get(formatted_prompt, self.temperature, kind="synthesis") if self.cache else None
+            if response is None:
+                with track_stage("llm_synthesis"):
+                    ai_message = self.llm.invoke(formatted_prompt)
+                response = ai_message.content
+                if self.cache and response.strip():
+                    self.cache.set(
+                        formatted_prompt,
+                        self.temperature,
+                        response,
+                        kind="synthesis",
+                        chunk_ids=[doc["id"] for doc in retrieved_docs[:5]]
+                    )
             
             # Extract citations from response
             citations = self._extract_citations(response, retrieved_docs)
@@ -51,16 +84,46 @@ class SynthesisAgent:
             return {
                 "answer": response,
                 "citations": citations,
-                "confidence": self._calculate_confidence(retrieved_docs)
+                "confidence": self._calculate_confidence(retrieved_docs),
+                "mode": "llm"
             }
             
         except Exception as e:
             logger.error(f"Error synthesizing answer: {e}")
-            return {
-                "answer": "An error occurred while generating the answer.",
-                "citations": [],
-                "confidence": 0.0
-            }
+            FALLBACKS.labels(component="synthesis").inc()
+            if settings.SYNTHESIS_FALLBACK_EXTRACTIVE:
+                # Rate limits and outages still get a cited answer
+                try:
+                    return self._extractive_answer(query, retrieved_docs, query_embedding)
+                except Exception as e:
+                    logger.error(f"Error building extractive fallback answer: {e}")
+            return self._error_answer("llm")
+    
+    def _extractive_answer(
+        self,
+        query: str,
+        docs: List[Dict[str, Any]],
+        query_embedding: Optional[List[float]] = None
+    ) -> Dict[str, Any]:
+        """Cited answer made of the retrieved sentences closest to the query"""
+        with track_stage("extractive_synthesis"):
+            answer = self.extractive.answer(query, docs, query_embedding)
+        
+        return {
+            "answer": answer or "I couldn't find a passage that answers your question.",
+            "citations": self._extract_citations(answer, docs),
+            "confidence": self._calculate_confidence(docs),
+            "mode": "extractive"
+        }
+    
+    @staticmethod
+    def _error_answer(mode: str) -> Dict[str, Any]:
+        return {
+            "answer": "An error occurred while generating the answer.",
+            "citations": [],
+            "confidence": 0.0,
+            "mode": mode
+        }
     
     def _prepare_context(self, docs: List[Dict[str, Any]]) -> str:
         """Prepare context string from documents"""
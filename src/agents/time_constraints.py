@@ -0,0 +1,64 @@
+from datetime import datetime, timedelta
+import re
+
+UNIT_DAYS = {"day": 1, "week": 7, "month": 30, "quarter": 91, "year": 365}
+NUMBER_WORDS = {
+    "a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6,
+    "seven": 7, "eight": 8, "nine": 9, "ten": 10, "twelve": 12, "few": 3, "couple": 2
+}
+
+
+def parse_time_constraint(text: str | None, now: datetime | None = None) -> datetime | None:
+    """Earliest update time a query asks for, from the query agent's TIME field
+
+    Understands phrases like "today", "yesterday", "this week", "last month",
+    "past 3 days" and "since 2024-01-15"; anything else means no constraint.
+    """
+    if not text:
+        return None
+    text = text.lower().strip()
+    # Connector timestamps are naive local times, so compare in local time too
+    now = now or datetime.now()
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    if text in ("none", "n/a", "no", "any", "all time"):
+        return None
+    if "today" in text:
+        return today
+    if "yesterday" in text:
+        return today - timedelta(days=1)
+
+    match = re.search(r"(\d{4}-\d{2}-\d{2})", text)
+    if match:
+        try:
+            return datetime.fromisoformat(match.group(1))
+        except ValueError:
+            return None
+
+    match = re.search(r"this (week|month|quarter|year)", text)
+    if match:
+        unit = match.group(1)
+        if unit == "week":
+            return today - timedelta(days=today.weekday())
+        if unit == "month":
+            return today.replace(day=1)
+        if unit == "quarter":
+            return today.replace(month=3 * ((today.month - 1) // 3) + 1, day=1)
+        return today.replace(month=1, day=1)
+
+    match = re.search(
+        r"(?:last|past|previous|recent|within|in the last|in the past)\s+"
+        r"(?:(\d+|[a-z]+)\s+)?(day|week|month|quarter|year)s?",
+        text
+    )
+    if match:
+        count_text, unit = match.groups()
+        if count_text is None:
+            count = 1
+        elif count_text.isdigit():
+            count = int(count_text)
+        else:
+            count = NUMBER_WORDS.get(count_text, 1)
+        return now - timedelta(days=count * UNIT_DAYS[unit])
+
+    return None
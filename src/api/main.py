@@ -1,18 +1,64 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
+from contextlib import asynccontextmanager
 from .routes import router
+from .. import registry
+from ..monitoring.metrics import STARTUP_SECONDS
+from ..monitoring.process import current_rss_mb
 from config.settings import settings
 from datetime import datetime
+from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
+from loguru import logger
+import time
 import uvicorn
 
 # print("SETTINGS LOADED FROM:", settings.__class__.__module__, settings.__class__.__file__)
 print("Settings loaded:", settings)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load models and stores once, before /health reports ready"""
+    start = time.perf_counter()
+    rss_before = current_rss_mb()
+    app.state.ready = False
+    
+    if settings.INGEST_JOBS_ENABLED:
+        # Fails startup if jobs could not write where the API searches
+        registry.get_ingestion_jobs()
+    
+    if settings.WARM_UP_ON_STARTUP:
+        warm_up = await run_in_threadpool(registry.warm_up)
+        logger.info(f"Warm-up finished in {warm_up['warm_up_seconds']}s | chunks={warm_up['chunks']}")
+    
+    startup_seconds = time.perf_counter() - start
+    STARTUP_SECONDS.set(startup_seconds)
+    app.state.ready = True
+    logger.info(
+        f"API ready in {startup_seconds:.2f}s | rss={current_rss_mb()}MB (was {rss_before}MB before warm-up)"
+    )
+    
+    yield
+    
+    orchestrator = registry.peek("orchestrator")
+    if orchestrator:
+        orchestrator.close()
+    ingestion_jobs = registry.peek("ingestion_jobs")
+    if ingestion_jobs:
+        await run_in_threadpool(ingestion_jobs.shutdown)
+
 app = FastAPI(
     title="Enterprise Search API",
     description="Intelligent multi-source enterprise search with AI",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
+# Compress large responses for clients that send Accept-Encoding: gzip
+app.add_middleware(GZipMiddleware, minimum_size=settings.GZIP_MINIMUM_SIZE)
+
 # CORS
 app.add_middleware(
     CORSMiddleware,
@@ -35,11 +81,24 @@ async def root():
 
 @app.get("/health")
 async def health():
+    if not getattr(app.state, "ready", False):
+        return JSONResponse(
+            status_code=503,
+            content={
+                "status": "starting",
+                "version": "1.0.0",
+                "timestamp": datetime.utcnow().isoformat()
+            }
+        )
     return {
         "status": "healthy",
         "version": "1.0.0",
         "timestamp": datetime.utcnow().isoformat()
     }
 
+@app.get("/metrics")
+async def metrics():
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -1,11 +1,29 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Literal
 from datetime import datetime
 
 class SearchRequest(BaseModel):
     query: str = Field(..., description="Search query")
     sources: Optional[List[str]] = Field(None, description="Data sources to search")
     max_results: Optional[int] = Field(10, description="Maximum number of results")
+    answer_mode: Optional[Literal["llm", "extractive"]] = Field(
+        None, description="How to build the answer; extractive quotes retrieved sentences without an LLM"
+    )
+    cursor: Optional[str] = Field(
+        None, description="next_cursor of an earlier response; returns that page of its results without an answer"
+    )
+    fields: Optional[List[str]] = Field(
+        None, description="Response fields to return, e.g. [\"answer\", \"documents.id\"]; all when omitted"
+    )
+
+class RetrieveRequest(BaseModel):
+    query: str = Field(..., description="Search query")
+    sources: Optional[List[str]] = Field(None, description="Data sources to search")
+    max_results: Optional[int] = Field(10, description="Maximum number of results")
+    cursor: Optional[str] = Field(None, description="next_cursor of an earlier response")
+    fields: Optional[List[str]] = Field(
+        None, description="Response fields to return, e.g. [\"documents.id\", \"documents.score\"]; all when omitted"
+    )
 
 class Citation(BaseModel):
     source_number: int
@@ -31,6 +49,29 @@ class SearchResponse(BaseModel):
     sources_searched: List[str]
     latency_ms: int
     query_analysis: Optional[Dict[str, Any]] = None
+    answer_mode: Optional[str] = None
+    next_cursor: Optional[str] = None
+
+class RetrieveResponse(BaseModel):
+    query: str
+    documents: List[DocumentResult]
+    sources_searched: List[str]
+    latency_ms: int
+    next_cursor: Optional[str] = None
+
+class IngestRequest(BaseModel):
+    sources: Optional[List[str]] = Field(None, description="Sources to ingest (jira, slack, documents); all when omitted")
+
+class IngestJob(BaseModel):
+    job_id: str
+    status: str
+    sources: List[str]
+    created_at: float
+    finished_at: Optional[float] = None
+    progress: Optional[Dict[str, Any]] = Field(
+        None, description="Documents, chunks, per-second rates and per-stage utilisation so far"
+    )
+    error: Optional[str] = None
 
 class HealthResponse(BaseModel):
     status: str
@@ -1,28 +1,146 @@
 from fastapi import APIRouter, HTTPException, Query
-from .models import SearchRequest, SearchResponse, HealthResponse
-from ..agents.orchestrator import SearchOrchestrator
-from typing import List
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+from .models import (
+    SearchRequest, SearchResponse, RetrieveRequest, RetrieveResponse, DocumentResult, HealthResponse,
+    IngestRequest, IngestJob
+)
+from ..registry import get_orchestrator, get_ingestion_jobs, get_manifest
+from ..ingestion.jobs import JobLimitReached, BackendNotSupported
+from ..agents.result_sets import CursorExpired
+from ..monitoring.stats import query_stats
+from config.settings import settings
+from typing import Any, Dict, List, Optional, Type
 from loguru import logger
 
 router = APIRouter()
-orchestrator = SearchOrchestrator()
+
+def validate_fields(fields: Optional[List[str]], model: Type[BaseModel]) -> Dict[str, set]:
+    """Parse requested fields into {field: sub-fields}; an empty set means the whole field"""
+    selected: Dict[str, set] = {}
+    for field in fields or []:
+        name, _, sub = field.partition(".")
+        if name not in model.model_fields or (sub and (name != "documents" or sub not in DocumentResult.model_fields)):
+            raise HTTPException(status_code=400, detail=f"Unknown field: {field}")
+        # The whole field wins over any sub-fields
+        if not sub:
+            selected[name] = set()
+        elif selected.get(name) != set():
+            selected.setdefault(name, set()).add(sub)
+    return selected
+
+def select_fields(payload: Dict[str, Any], selected: Dict[str, set]) -> Dict[str, Any]:
+    """Keep only the selected fields; "documents.id" keeps one key of each document"""
+    if not selected:
+        return payload
+    
+    slim = {}
+    for name, subs in selected.items():
+        if name not in payload:
+            continue
+        value = payload[name]
+        if subs:
+            value = [{key: item[key] for key in subs if key in item} for item in value]
+        slim[name] = value
+    return slim
 
 @router.post("/search", response_model=SearchResponse)
 async def search(request: SearchRequest):
     """
     Execute intelligent search across enterprise data sources
     """
+    # Reject bad field names before paying for retrieval and synthesis
+    selected = validate_fields(request.fields, SearchResponse)
     try:
-        result = orchestrator.search(
+        # Run off the event loop so concurrent duplicates can be coalesced
+        result = await run_in_threadpool(
+            get_orchestrator().search,
             query=request.query,
             sources=request.sources,
-            max_results=request.max_results
+            max_results=request.max_results,
+            answer_mode=request.answer_mode,
+            cursor=request.cursor
         )
-        return result
+        # Returned as-is: the orchestrator builds the response shape, so skip re-validating it
+        return ORJSONResponse(select_fields(result, selected))
+    except CursorExpired as e:
+        raise HTTPException(status_code=410, detail=str(e))
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Search error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/retrieve", response_model=RetrieveResponse)
+async def retrieve(request: RetrieveRequest):
+    """
+    Ranked documents only, without query rewriting or answer synthesis (no LLM calls)
+    """
+    selected = validate_fields(request.fields, RetrieveResponse)
+    try:
+        result = await run_in_threadpool(
+            get_orchestrator().retrieve,
+            query=request.query,
+            sources=request.sources,
+            max_results=request.max_results,
+            cursor=request.cursor
+        )
+        return ORJSONResponse(select_fields(result, selected))
+    except CursorExpired as e:
+        raise HTTPException(status_code=410, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Retrieve error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+def ingestion_jobs():
+    """The job manager, or 409 when ingestion jobs are disabled"""
+    try:
+        return get_ingestion_jobs()
+    except BackendNotSupported as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@router.post("/ingest", response_model=IngestJob, status_code=202)
+async def start_ingestion(request: IngestRequest):
+    """
+    Start an ingestion job in a background worker process
+    """
+    try:
+        return await run_in_threadpool(ingestion_jobs().submit, request.sources)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except JobLimitReached as e:
+        raise HTTPException(status_code=429, detail=str(e))
+
+@router.get("/ingest", response_model=List[IngestJob])
+async def list_ingestion_jobs():
+    """
+    Running and recently finished ingestion jobs, newest first
+    """
+    return ingestion_jobs().list()
+
+@router.get("/ingest/{job_id}", response_model=IngestJob)
+async def get_ingestion_job(job_id: str):
+    """
+    Status and progress of an ingestion job
+    """
+    job = ingestion_jobs().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown ingestion job: {job_id}")
+    return job
+
+@router.delete("/ingest/{job_id}", response_model=IngestJob)
+async def cancel_ingestion_job(job_id: str):
+    """
+    Cancel an ingestion job; chunks already written stay indexed
+    """
+    job = ingestion_jobs().cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown ingestion job: {job_id}")
+    return job
+
 @router.get("/sources")
 async def get_sources():
     """
@@ -57,16 +175,34 @@ async def get_sources():
         ]
     }
 
+# A plain def: FastAPI runs it in the threadpool, so registry init and the
+# synchronous vector store count never block the event loop
 @router.get("/stats")
-async def get_stats():
+def get_stats():
     """
     Get system statistics
     """
-    # This is simplified - in production, get real stats
+    orchestrator = get_orchestrator()
+    ingested = get_manifest().summary()
+    queries = query_stats.snapshot()
+    
+    # Prefer the document_metadata counts, recounted in the background, once available
+    metadata_store = orchestrator.metadata_store
+    if metadata_store and settings.DOCUMENT_METADATA_ENABLED:
+        try:
+            by_source = metadata_store.count_documents()
+            if by_source:
+                ingested = {
+                    "total_documents": sum(t["documents"] for t in by_source.values()),
+                    "by_source": by_source
+                }
+        except Exception as e:
+            logger.error(f"Error reading document counts: {e}")
+    
     return {
-        "total_documents": 150,
-        "total_chunks": 450,
-        "sources_connected": 4,
-        "queries_today": 47,
-        "avg_latency_ms": 523
+        "total_documents": ingested["total_documents"],
+        "total_chunks": orchestrator.retrieval_agent.vector_store.count(),
+        "documents_by_source": ingested["by_source"],
+        "sources_connected": len(ingested["by_source"]),
+        **queries
     }
\ No newline at end of file
@@ -18,6 +18,8 @@ class DocumentMetadata:
         data = asdict(self)
         if self.created_at:
             data["created_at"] = self.created_at.isoformat()
+        if self.updated_at:
+            data["updated_at"] = self.updated_at.isoformat()
         return data
          
     # Optional, connector-specific fields
@@ -38,6 +40,10 @@ class Document:
 
 
 class BaseConnector(ABC):
+    # Recorded in the ingestion manifest (from metadata.extra["kind"]); after a
+    # successful full ingest, documents of any other kind are deleted
+    document_kind: Optional[str] = None
+
     def __init__(self, source_name: str):
         self.source_name = source_name
 
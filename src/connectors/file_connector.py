@@ -0,0 +1,143 @@
+from typing import Any, Iterator, List, Optional, Tuple
+from abc import abstractmethod
+from collections import OrderedDict
+from .base import BaseConnector, Document
+from .index import DocumentIndex
+from config.settings import settings
+from loguru import logger
+import os
+import threading
+
+
+class FileConnector(BaseConnector):
+    """Connector over files in a local directory, answering search from an in-memory index
+
+    Files may hold one record (.json, .txt) or one record per line (.jsonl).
+    Every record's byte range is indexed by document id and persisted next to
+    the data, so fetch_document is a single seek plus an LRU of parsed documents.
+    """
+
+    extensions: tuple = (".json", ".jsonl")
+
+    def __init__(self, source_name: str, data_dir: str):
+        super().__init__(source_name)
+        self.data_dir = data_dir
+        self.index = DocumentIndex(self._parse_file)
+        self.location_index_path = os.path.join(data_dir, f".{source_name}_locations.json")
+        self.index.load_locations(self.location_index_path)
+        self._cache: "OrderedDict[str, Tuple[str, Document]]" = OrderedDict()
+        self._cache_size = settings.CONNECTOR_DOCUMENT_CACHE_SIZE
+        self._cache_lock = threading.Lock()
+
+    def _list_files(self) -> List[str]:
+        if not os.path.exists(self.data_dir):
+            return []
+        return [
+            os.path.join(self.data_dir, filename)
+            for filename in os.listdir(self.data_dir)
+            if filename.endswith(self.extensions) and not filename.startswith(".")
+        ]
+
+    def _read_records(self, filepath: str) -> Iterator[Tuple[int, int, bytes]]:
+        """Yield (byte offset, byte length, raw bytes) for each record in a file"""
+        with open(filepath, 'rb') as f:
+            if filepath.endswith(".jsonl"):
+                offset = 0
+                for line in f:
+                    if line.strip():
+                        yield offset, len(line), line
+                    offset += len(line)
+            else:
+                raw = f.read()
+                yield 0, len(raw), raw
+
+    @abstractmethod
+    def _decode(self, raw: bytes) -> Any:
+        """Decode one raw record"""
+        pass
+
+    @abstractmethod
+    def _to_document(self, record: Any, filepath: str) -> Document:
+        """Build a Document from one decoded record"""
+        pass
+
+    def _parse_file(self, filepath: str) -> List[Tuple[Document, int, int]]:
+        return [
+            (self._to_document(self._decode(raw), filepath), offset, length)
+            for offset, length, raw in self._read_records(filepath)
+        ]
+
+    def refresh(self):
+        """Re-read files changed since the last call; returns (changed, removed, removed_ids)"""
+        changed, removed, removed_ids = self.index.refresh(self._list_files())
+        if changed or removed:
+            self._evict(set(changed) | set(removed))
+            try:
+                self.index.save_locations(self.location_index_path)
+            except OSError as e:
+                logger.error(f"Error saving location index {self.location_index_path}: {e}")
+        return changed, removed, removed_ids
+
+    async def fetch_documents(self) -> List[Document]:
+        self.refresh()
+        return self.index.documents()
+
+    async def fetch_changes(self) -> Tuple[List[Document], List[str]]:
+        """Documents from files changed since the last call, and ids of removed documents"""
+        changed, _, removed_ids = self.refresh()
+        return self.index.documents(changed), removed_ids
+
+    async def fetch_document(self, document_id: str) -> Optional[Document]:
+        with self._cache_lock:
+            cached = self._cache.get(document_id)
+            if cached is not None:
+                self._cache.move_to_end(document_id)
+                return cached[1]
+
+        document, path = self._read_at(document_id)
+        if document is None:
+            # The location may be stale; rescan changed files once and retry
+            self.refresh()
+            document, path = self._read_at(document_id)
+        if document is None:
+            return None
+
+        with self._cache_lock:
+            # Keyed by the path actually read: a refresh may have dropped the location since
+            self._cache[document_id] = (path, document)
+            self._cache.move_to_end(document_id)
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return document
+
+    async def search(self, query: str) -> List[Document]:
+        self.refresh()
+        return self.index.search(query)
+
+    def member_ids(self, document_id: str) -> List[str]:
+        """Ids of the indexed records a document is built from"""
+        return [document_id]
+
+    def _read_at(self, document_id: str) -> Tuple[Optional[Document], Optional[str]]:
+        """(document, path it was read from), or (None, None)"""
+        location = self.index.location(document_id)
+        if location is None:
+            return None, None
+
+        filepath, offset, length = location
+        try:
+            with open(filepath, 'rb') as f:
+                f.seek(offset)
+                raw = f.read(length)
+            document = self._to_document(self._decode(raw), filepath)
+        except Exception:
+            return None, None
+        if document.metadata.source_id != document_id:
+            return None, None
+        return document, filepath
+
+    def _evict(self, paths: set):
+        """Drop cached documents that came from changed or removed files"""
+        with self._cache_lock:
+            for document_id in [key for key, (path, _) in self._cache.items() if path in paths]:
+                del self._cache[document_id]
@@ -0,0 +1,186 @@
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+from collections import defaultdict
+from .base import Document
+from loguru import logger
+import json
+import os
+import re
+import threading
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class DocumentIndex:
+    """Parsed documents cached per file (validated by mtime/size) with an inverted token index
+
+    parse_file returns (document, byte offset, byte length) for every record
+    in a file, which also gives an id -> location map for single lookups.
+    """
+
+    def __init__(self, parse_file: Callable[[str], List[Tuple[Document, int, int]]]):
+        self._parse_file = parse_file
+        self._lock = threading.Lock()
+        self._files: Dict[str, Tuple[float, int, List[str]]] = {}
+        self._locations: Dict[str, Tuple[str, int, int]] = {}
+        self._file_ids: Dict[str, List[str]] = {}
+        self._documents: Dict[str, Document] = {}
+        self._lowered: Dict[str, str] = {}
+        self._postings: Dict[str, Set[str]] = defaultdict(set)
+        self._order: Dict[str, int] = {}
+        self._sequence = 0
+
+    def refresh(self, paths: Iterable[str]) -> Tuple[List[str], List[str], List[str]]:
+        """Re-read only files that changed since the last call
+
+        Returns (changed paths, removed paths, ids of documents that disappeared).
+        """
+        changed, removed, removed_ids = [], [], []
+
+        with self._lock:
+            seen = set()
+            for path in paths:
+                seen.add(path)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+
+                cached = self._files.get(path)
+                if cached and cached[0] == stat.st_mtime and cached[1] == stat.st_size:
+                    continue
+
+                try:
+                    records = self._parse_file(path)
+                except Exception as e:
+                    logger.error(f"Error parsing {path}: {e}")
+                    continue
+
+                previous_ids = self._file_ids.get(path, [])
+                self._drop_file(path)
+                keys, ids = [], []
+                for i, (document, offset, length) in enumerate(records):
+                    key = f"{path}#{i}"
+                    self._add_document(key, document)
+                    keys.append(key)
+                    ids.append(document.metadata.source_id)
+                    self._locations[document.metadata.source_id] = (path, offset, length)
+                self._files[path] = (stat.st_mtime, stat.st_size, keys)
+                self._file_ids[path] = ids
+                removed_ids.extend(set(previous_ids) - set(ids))
+                changed.append(path)
+
+            for path in list(self._files):
+                if path not in seen:
+                    removed_ids.extend(self._file_ids.get(path, []))
+                    self._drop_file(path)
+                    del self._files[path]
+                    removed.append(path)
+
+            if changed or removed:
+                # Drop locations seeded from disk for files that no longer exist
+                for document_id, location in list(self._locations.items()):
+                    if location[0] not in seen:
+                        del self._locations[document_id]
+
+        return changed, removed, removed_ids
+
+    def documents(self, paths: Iterable[str] | None = None) -> List[Document]:
+        with self._lock:
+            if paths is None:
+                return list(self._documents.values())
+            return [
+                self._documents[key]
+                for path in paths if path in self._files
+                for key in self._files[path][2]
+            ]
+
+    def search(self, query: str) -> List[Document]:
+        """Documents containing the query as a substring, in index order
+
+        Any document containing the query has a token containing each query
+        token ("auth" sits inside "authentication"), so candidates come from
+        the postings of vocabulary tokens containing the longest query token,
+        scanning the distinct tokens instead of every document's text.
+        """
+        query_lower = query.lower()
+        tokens = tokenize(query_lower)
+
+        with self._lock:
+            if not tokens:
+                return list(self._documents.values()) if not query_lower.strip() else []
+
+            anchor = max(tokens, key=len)
+            candidates = set()
+            for token, posting in self._postings.items():
+                if anchor in token:
+                    candidates |= posting
+
+            # Candidates are a superset of the matches; confirm on the cached text
+            matches = [key for key in candidates if query_lower in self._lowered[key]]
+            matches.sort(key=self._order.get)
+            return [self._documents[key] for key in matches]
+
+    def location(self, document_id: str) -> Optional[Tuple[str, int, int]]:
+        """(path, byte offset, byte length) of a document's record"""
+        return self._locations.get(document_id)
+
+    def document_ids(self, paths: Iterable[str]) -> List[str]:
+        with self._lock:
+            return [document_id for path in paths for document_id in self._file_ids.get(path, [])]
+
+    def save_locations(self, path: str):
+        with self._lock:
+            locations = dict(self._locations)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(locations, f)
+        os.replace(tmp_path, path)
+
+    def load_locations(self, path: str):
+        """Seed id -> location from a previous run so lookups work before the first refresh"""
+        if not os.path.exists(path):
+            return
+        try:
+            with open(path) as f:
+                locations = json.load(f)
+        except Exception as e:
+            logger.error(f"Error loading location index {path}: {e}")
+            return
+        with self._lock:
+            for document_id, (file_path, offset, length) in locations.items():
+                self._locations.setdefault(document_id, (file_path, offset, length))
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def _add_document(self, key: str, document: Document):
+        lowered = document.content.lower()
+        self._documents[key] = document
+        self._lowered[key] = lowered
+        self._order[key] = self._sequence
+        self._sequence += 1
+        for token in set(tokenize(lowered)):
+            self._postings[token].add(key)
+
+    def _drop_file(self, path: str):
+        cached = self._files.get(path)
+        if not cached:
+            return
+        for document_id in self._file_ids.pop(path, []):
+            location = self._locations.get(document_id)
+            if location and location[0] == path:
+                del self._locations[document_id]
+        for key in cached[2]:
+            lowered = self._lowered.pop(key, "")
+            for token in set(tokenize(lowered)):
+                posting = self._postings.get(token)
+                if posting is not None:
+                    posting.discard(key)
+                    if not posting:
+                        del self._postings[token]
+            self._documents.pop(key, None)
+            self._order.pop(key, None)
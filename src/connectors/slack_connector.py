@@ -1,47 +1,163 @@
-from typing import List
+from typing import Any, Dict, List, Optional, Set, Tuple
 from datetime import datetime
-from .base import BaseConnector, Document, DocumentMetadata
+from .base import Document, DocumentMetadata
+from .file_connector import FileConnector
+from config.settings import settings
 import json
 import os
 
-class SlackConnector(BaseConnector):
-    def __init__(self):
-        super().__init__("slack")
-        self.data_dir = "data/slack"
-        
+class SlackConnector(FileConnector):
+    def __init__(self, aggregation: str | None = None, data_dir: str = "data/slack"):
+        super().__init__("slack", data_dir)
+        # "message" keeps one document per message; "conversation" groups
+        # messages by thread, or by time window in unthreaded channels
+        self.aggregation = aggregation or settings.SLACK_AGGREGATION
+        self.document_kind = "conversation" if self.aggregation == "conversation" else None
+        self.window_seconds = settings.SLACK_CONVERSATION_WINDOW_MINUTES * 60
+        self._conversations: Dict[str, Dict[str, Document]] = {}
+        self._message_conversation: Dict[str, str] = {}
+        self._dirty: Set[str] = set()
+
+    def _decode(self, raw: bytes) -> Any:
+        return json.loads(raw)
+
+    def _to_document(self, data: Any, filepath: str) -> Document:
+        filename = os.path.basename(filepath)
+
+        metadata = DocumentMetadata(
+            source="slack",
+            source_id=data.get("id", filename),
+            title=f"#{data.get('channel', 'general')} - {data.get('timestamp', '')}",
+            author=data.get("user", "Unknown"),
+            created_at=datetime.fromisoformat(data.get("timestamp", datetime.now().isoformat())),
+            updated_at=datetime.fromisoformat(data.get("timestamp", datetime.now().isoformat())),
+            url=data.get("permalink"),
+            tags=[],
+            channel=data.get("channel", "general"),
+            thread_ts=data.get("thread_ts")
+        )
+
+        return Document(content=data.get("text", ""), metadata=metadata)
+
+    def refresh(self):
+        changed, removed, removed_ids = super().refresh()
+        if self.aggregation == "conversation":
+            self._sync_conversations(changed, removed_ids)
+        return changed, removed, removed_ids
+
     async def fetch_documents(self) -> List[Document]:
-        documents = []
-        
-        if not os.path.exists(self.data_dir):
-            return documents
-            
-        for filename in os.listdir(self.data_dir):
-            if filename.endswith('.json'):
-                filepath = os.path.join(self.data_dir, filename)
-                with open(filepath, 'r') as f:
-                    data = json.load(f)
-                    
-                    metadata = DocumentMetadata(
-                        source="slack",
-                        source_id=data.get("id", filename),
-                        title=f"#{data.get('channel', 'general')} - {data.get('timestamp', '')}",
-                        author=data.get("user", "Unknown"),
-                        created_at=datetime.fromisoformat(data.get("timestamp", datetime.now().isoformat())),
-                        updated_at=datetime.fromisoformat(data.get("timestamp", datetime.now().isoformat())),
-                        url=data.get("permalink"),
-                        tags=[],
-                        channel=data.get("channel", "general"),
-                        thread_ts=data.get("thread_ts")
-                    )
-                    
-                    document = Document(content=data.get("text", ""), metadata=metadata)
-                    documents.append(document)
-        
-        return documents
-    
-    async def fetch_document(self, document_id: str) -> Document:
-        return None
-    
+        if self.aggregation != "conversation":
+            return await super().fetch_documents()
+
+        self.refresh()
+        self._dirty.clear()
+        return [self._build_conversation(key) for key in self._conversations]
+
+    async def fetch_changes(self) -> Tuple[List[Document], List[str]]:
+        if self.aggregation == "conversation":
+            return await self.fetch_updated_conversations()
+        return await super().fetch_changes()
+
+    async def fetch_updated_conversations(self) -> Tuple[List[Document], List[str]]:
+        """Conversations touched since the last call, and ids of conversations that emptied out"""
+        self.refresh()
+        updated, deleted = [], []
+        for key in self._dirty:
+            if key in self._conversations:
+                updated.append(self._build_conversation(key))
+            else:
+                deleted.append(key)
+        self._dirty.clear()
+        return updated, deleted
+
+    async def fetch_document(self, document_id: str) -> Optional[Document]:
+        if self.aggregation == "conversation":
+            if not self._conversations:
+                # Nothing fetched yet in this process; build the groups first
+                self.refresh()
+            if document_id in self._conversations:
+                return self._build_conversation(document_id)
+        return await super().fetch_document(document_id)
+
+    def member_ids(self, document_id: str) -> List[str]:
+        if self.aggregation == "conversation" and document_id in self._conversations:
+            return list(self._conversations[document_id])
+        return super().member_ids(document_id)
+
     async def search(self, query: str) -> List[Document]:
-        all_docs = await self.fetch_documents()
-        return [doc for doc in all_docs if query.lower() in doc.content.lower()]
\ No newline at end of file
+        messages = await super().search(query)
+        if self.aggregation != "conversation":
+            return messages
+
+        keys = dict.fromkeys(
+            self._message_conversation[message.metadata.source_id]
+            for message in messages
+            if message.metadata.source_id in self._message_conversation
+        )
+        return [self._build_conversation(key) for key in keys]
+
+    def _conversation_key(self, message: Document) -> str:
+        metadata = message.metadata
+        if metadata.thread_ts:
+            return f"slack-{metadata.channel}-{metadata.thread_ts}"
+
+        window_start = int(metadata.created_at.timestamp() // self.window_seconds) * self.window_seconds
+        return f"slack-{metadata.channel}-{datetime.fromtimestamp(window_start):%Y%m%dT%H%M}"
+
+    def _sync_conversations(self, changed: List[str], removed_ids: List[str]):
+        """Apply new, edited and deleted messages to the conversation groups"""
+        for message_id in removed_ids:
+            self._remove_message(message_id)
+
+        for message in self.index.documents(changed):
+            message_id = message.metadata.source_id
+            key = self._conversation_key(message)
+            if self._message_conversation.get(message_id) not in (None, key):
+                self._remove_message(message_id)
+
+            self._conversations.setdefault(key, {})[message_id] = message
+            self._message_conversation[message_id] = key
+            self._dirty.add(key)
+
+    def _remove_message(self, message_id: str):
+        key = self._message_conversation.pop(message_id, None)
+        if key is None:
+            return
+        conversation = self._conversations.get(key, {})
+        conversation.pop(message_id, None)
+        if not conversation:
+            self._conversations.pop(key, None)
+        self._dirty.add(key)
+
+    def _build_conversation(self, key: str) -> Document:
+        messages = sorted(self._conversations[key].values(), key=lambda m: m.metadata.created_at)
+        first, last = messages[0].metadata, messages[-1].metadata
+
+        content = "\n".join(
+            f"[{m.metadata.created_at:%Y-%m-%d %H:%M}] {m.metadata.author}: {m.content}"
+            for m in messages
+        )
+        title = (
+            f"#{first.channel} thread {first.thread_ts}"
+            if first.thread_ts
+            else f"#{first.channel} - {first.created_at:%Y-%m-%d %H:%M}"
+        )
+
+        metadata = DocumentMetadata(
+            source="slack",
+            source_id=key,
+            title=title,
+            author=first.author,
+            created_at=first.created_at,
+            updated_at=last.updated_at,
+            url=first.url,
+            tags=[],
+            channel=first.channel,
+            thread_ts=first.thread_ts,
+            extra={
+                "kind": "conversation",
+                "message_count": len(messages),
+                "participants": sorted({m.metadata.author for m in messages if m.metadata.author})
+            }
+        )
+        return Document(content=content, metadata=metadata)
@@ -0,0 +1,60 @@
+from typing import Dict, List
+from dataclasses import dataclass, field, asdict
+from ..connectors.base import Document
+import json
+import random
+import re
+
+# Words too common in the synthetic corpus to identify a document on their own
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "in", "is",
+    "it", "its", "of", "on", "or", "that", "the", "this", "to", "was", "were", "will", "with"
+}
+
+
+@dataclass
+class LabelledQuery:
+    query: str
+    kind: str
+    relevant: Dict[str, int] = field(default_factory=dict)  # source_id -> graded relevance
+
+
+def build_queries(documents: List[Document], seed: int = 0) -> List[LabelledQuery]:
+    """Known-item queries: each document contributes a verbatim sentence and a bag of its keywords
+
+    The sentence query measures exact-match retrieval; the keyword query,
+    shuffled and without stopwords, leans on the embedding instead.
+    """
+    rng = random.Random(seed)
+    queries = []
+    for document in sorted(documents, key=lambda d: d.metadata.source_id):
+        # Drop field labels and bullets ("Description: ", "- ") that every document shares
+        sentences = [
+            re.sub(r"^(-\s*|[A-Z][\w ]{0,20}:\s*)", "", s.strip())
+            for s in re.split(r"(?<=[.!?])\s+|\n", document.content)
+        ]
+        sentences = [s for s in sentences if len(s.split()) >= 5]
+        if not sentences:
+            continue
+
+        sentence = rng.choice(sentences)
+        relevant = {document.metadata.source_id: 2}
+        queries.append(LabelledQuery(query=sentence, kind="sentence", relevant=relevant))
+
+        keywords = [w for w in re.findall(r"[a-zA-Z]+", sentence.lower()) if w not in STOPWORDS]
+        if len(keywords) >= 3:
+            rng.shuffle(keywords)
+            queries.append(LabelledQuery(query=" ".join(keywords[:6]), kind="keywords", relevant=relevant))
+
+    return queries
+
+
+def save_queries(queries: List[LabelledQuery], path: str):
+    with open(path, "w") as f:
+        for query in queries:
+            f.write(json.dumps(asdict(query)) + "\n")
+
+
+def load_queries(path: str) -> List[LabelledQuery]:
+    with open(path, "r") as f:
+        return [LabelledQuery(**json.loads(line)) for line in f if line.strip()]
@@ -0,0 +1,173 @@
+from typing import Any, Callable, Dict, List
+from collections import defaultdict
+from datetime import datetime
+from .dataset import LabelledQuery
+from .ranking import dedupe, recall_at_k, reciprocal_rank, ndcg_at_k, percentiles
+from ..connectors.base import Document
+from ..monitoring.metrics import add_stage_observer, remove_stage_observer
+from config.settings import settings
+from loguru import logger
+import os
+import time
+
+
+def configure_isolated_settings(workdir: str):
+    """Point every store at workdir and stub the LLM so a benchmark never touches live data
+
+    Must run before anything is built through the registry.
+    """
+    settings.CHROMA_PERSIST_DIR = os.path.join(workdir, "chroma")
+    settings.CHROMA_COLLECTION = "benchmark"
+    settings.INGESTION_MANIFEST_PATH = os.path.join(workdir, "ingestion_manifest.json")
+    settings.LLM_PROVIDER = "stub"
+    settings.LLM_CACHE_ENABLED = False
+    settings.QUERY_LOG_ENABLED = False
+    settings.DOCUMENT_METADATA_ENABLED = False
+    settings.SEARCH_COALESCING_ENABLED = False
+
+
+async def ingest_corpus(data_dir: str) -> List[Document]:
+    """Index the synthetic corpus under data_dir and return the documents that were ingested"""
+    from ..connectors.jira_connector import JiraConnector
+    from ..connectors.slack_connector import SlackConnector
+    from ..connectors.document_connector import DocumentConnector
+    from ..ingestion.pipeline import IngestionPipeline
+
+    pipeline = IngestionPipeline()
+    connectors = [
+        JiraConnector(data_dir=os.path.join(data_dir, "jira")),
+        SlackConnector(data_dir=os.path.join(data_dir, "slack")),
+        DocumentConnector(data_dir=os.path.join(data_dir, "documents")),
+    ]
+
+    documents = []
+    for connector in connectors:
+        fetched = await connector.fetch_documents()
+        if fetched:
+            await pipeline.ingest_documents(fetched)
+        documents.extend(fetched)
+        logger.info(f"Indexed {len(fetched)} {connector.source_name} documents")
+    return documents
+
+
+def chunk_source_id(chunk_id: str) -> str:
+    return chunk_id.rsplit("_chunk_", 1)[0]
+
+
+class RetrievalBenchmark:
+    """Score a search function on labelled queries for ranking quality and per-stage latency"""
+
+    def __init__(self, queries: List[LabelledQuery], k: int = 10):
+        self.queries = queries
+        self.k = k
+
+    def run(self, name: str, search: Callable[[str], List[str]]) -> Dict[str, Any]:
+        """search maps a query to ranked source ids"""
+        stage_seconds = defaultdict(list)
+        observer = lambda stage, elapsed: stage_seconds[stage].append(elapsed)
+
+        per_kind = defaultdict(lambda: defaultdict(list))
+        end_to_end_ms = []
+
+        add_stage_observer(observer)
+        try:
+            for labelled in self.queries:
+                start = time.perf_counter()
+                ranked = dedupe(search(labelled.query))
+                end_to_end_ms.append((time.perf_counter() - start) * 1000)
+
+                scores = per_kind[labelled.kind]
+                scores[f"recall@{self.k}"].append(recall_at_k(ranked, labelled.relevant, self.k))
+                scores["mrr"].append(reciprocal_rank(ranked, labelled.relevant))
+                scores[f"ndcg@{self.k}"].append(ndcg_at_k(ranked, labelled.relevant, self.k))
+        finally:
+            remove_stage_observer(observer)
+
+        overall = defaultdict(list)
+        for scores in per_kind.values():
+            for metric, values in scores.items():
+                overall[metric].extend(values)
+
+        result = {
+            "queries": len(self.queries),
+            **self._means(overall),
+            "by_kind": {kind: self._means(scores) for kind, scores in per_kind.items()},
+            "latency_ms": {
+                "end_to_end": self._rounded(percentiles(end_to_end_ms)),
+                "stages": {
+                    stage: self._rounded(percentiles([s * 1000 for s in values]))
+                    for stage, values in sorted(stage_seconds.items())
+                }
+            }
+        }
+        logger.info(f"{name}: {({key: value for key, value in result.items() if key != 'by_kind'})}")
+        return result
+
+    @staticmethod
+    def _means(scores: Dict[str, List[float]]) -> Dict[str, float]:
+        return {metric: round(sum(values) / len(values), 4) for metric, values in scores.items() if values}
+
+    @staticmethod
+    def _rounded(values: Dict[str, float]) -> Dict[str, float]:
+        return {key: round(value, 2) for key, value in values.items()}
+
+
+def run_benchmark(queries: List[LabelledQuery], k: int = 10) -> Dict[str, Any]:
+    """Benchmark RetrievalAgent alone and the full orchestrator with the stub LLM"""
+    from .. import registry
+    from ..agents.retrieval_agent import RetrievalAgent
+
+    benchmark = RetrievalBenchmark(queries, k=k)
+    retrieval_agent = RetrievalAgent()
+    orchestrator = registry.get_orchestrator()
+
+    # One throwaway query so model loading is not counted as query latency
+    retrieval_agent.retrieve("warm up", max_results=k)
+
+    results = {
+        "retrieval": benchmark.run(
+            "retrieval",
+            lambda query: [
+                doc["metadata"]["source_id"] for doc in retrieval_agent.retrieve(query, max_results=k)
+            ]
+        ),
+        "orchestrator": benchmark.run(
+            "orchestrator",
+            lambda query: [
+                chunk_source_id(doc["id"]) for doc in orchestrator.search(query, max_results=k)["documents"]
+            ]
+        )
+    }
+
+    return {
+        "created_at": datetime.utcnow().isoformat(),
+        "config": {
+            "k": k,
+            "embedding_model": settings.EMBEDDING_MODEL,
+            "embedding_runtime": settings.EMBEDDING_RUNTIME,
+            "chroma_distance": settings.CHROMA_DISTANCE,
+            "hnsw_m": settings.HNSW_M,
+            "hnsw_construction_ef": settings.HNSW_CONSTRUCTION_EF,
+            "hnsw_search_ef": settings.HNSW_SEARCH_EF,
+            "chunks": registry.get_vector_store().count()
+        },
+        "results": results
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> Dict[str, Dict[str, float]]:
+    """Per-run deltas (current - baseline) for quality metrics and end-to-end p95"""
+    deltas = {}
+    for name, result in current["results"].items():
+        previous = baseline.get("results", {}).get(name)
+        if not previous:
+            continue
+        deltas[name] = {
+            metric: round(value - previous[metric], 4)
+            for metric, value in result.items()
+            if isinstance(value, float) and metric in previous
+        }
+        deltas[name]["p95_ms"] = round(
+            result["latency_ms"]["end_to_end"]["p95"] - previous["latency_ms"]["end_to_end"]["p95"], 2
+        )
+    return deltas
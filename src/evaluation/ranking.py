@@ -0,0 +1,43 @@
+from typing import Dict, Iterable, List
+import math
+
+
+def dedupe(ranked_ids: Iterable[str]) -> List[str]:
+    """Keep the first occurrence of each id; several chunks of one document count once"""
+    return list(dict.fromkeys(ranked_ids))
+
+
+def recall_at_k(ranked_ids: List[str], relevant: Dict[str, int], k: int) -> float:
+    if not relevant:
+        return 0.0
+    hits = sum(1 for doc_id in ranked_ids[:k] if doc_id in relevant)
+    return hits / len(relevant)
+
+
+def reciprocal_rank(ranked_ids: List[str], relevant: Dict[str, int]) -> float:
+    for rank, doc_id in enumerate(ranked_ids, 1):
+        if doc_id in relevant:
+            return 1.0 / rank
+    return 0.0
+
+
+def ndcg_at_k(ranked_ids: List[str], relevant: Dict[str, int], k: int) -> float:
+    """nDCG with graded relevance (gain 2^rel - 1)"""
+    dcg = sum(
+        (2 ** relevant.get(doc_id, 0) - 1) / math.log2(rank + 1)
+        for rank, doc_id in enumerate(ranked_ids[:k], 1)
+    )
+    ideal = sorted(relevant.values(), reverse=True)[:k]
+    idcg = sum((2 ** rel - 1) / math.log2(rank + 1) for rank, rel in enumerate(ideal, 1))
+    return dcg / idcg if idcg else 0.0
+
+
+def percentiles(values: List[float], points=(50, 95, 99)) -> Dict[str, float]:
+    """Nearest-rank percentiles"""
+    if not values:
+        return {f"p{p}": 0.0 for p in points}
+    ordered = sorted(values)
+    return {
+        f"p{p}": ordered[min(len(ordered) - 1, max(0, math.ceil(p / 100 * len(ordered)) - 1))]
+        for p in points
+    }
@@ -1,10 +1,11 @@
 from typing import List
-from sentence_transformers import SentenceTransformer
 from config.settings import settings
 
 
 class Embedder:
     def __init__(self, model_name: str | None = None):
+        from sentence_transformers import SentenceTransformer
+
         self.model_name = model_name or settings.EMBEDDING_MODEL
         self.model = SentenceTransformer(self.model_name)
         self.dimension = settings.EMBEDDING_DIMENSION
@@ -24,3 +25,11 @@ class Embedder:
 
     def get_dimension(self) -> int:
         return self.dimension
+
+
+def create_embedder(model_name: str | None = None):
+    """Build an in-process embedder for the configured runtime"""
+    if settings.EMBEDDING_RUNTIME == "onnx":
+        from .onnx_embedder import OnnxEmbedder
+        return OnnxEmbedder(model_name)
+    return Embedder(model_name)
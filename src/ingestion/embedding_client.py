@@ -0,0 +1,86 @@
+from typing import List
+from array import array
+from config.settings import settings
+from .embedding_server import HEADER, RESPONSE_HEADER
+import json
+import socket
+import threading
+
+
+class RemoteEmbedder:
+    """Embedder that delegates to the shared embedding server over a Unix socket"""
+
+    def __init__(self, socket_path: str | None = None, timeout: float = 30.0):
+        self.socket_path = socket_path or settings.EMBEDDING_SOCKET_PATH
+        self.model_name = settings.EMBEDDING_MODEL
+        self.dimension = settings.EMBEDDING_DIMENSION
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def embed_text(self, text: str) -> List[float]:
+        return self._request([text])[0]
+
+    def embed_batch(self, texts: List[str], batch_size: int = 32) -> List[List[float]]:
+        # The server does its own batching; batch_size only bounds request size
+        embeddings = []
+        for start in range(0, len(texts), max(batch_size, 1)):
+            embeddings.extend(self._request(texts[start:start + batch_size]))
+        return embeddings
+
+    def get_dimension(self) -> int:
+        return self.dimension
+
+    def _request(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        payload = json.dumps(texts).encode("utf-8")
+        frame = HEADER.pack(len(payload)) + payload
+
+        try:
+            return self._roundtrip(frame)
+        except (ConnectionError, socket.timeout, OSError):
+            # One reconnect covers a restarted server
+            self._close()
+            return self._roundtrip(frame)
+
+    def _roundtrip(self, frame: bytes) -> List[List[float]]:
+        conn = self._connection()
+        conn.sendall(frame)
+        (length,) = HEADER.unpack(self._recv_exactly(conn, HEADER.size))
+        body = self._recv_exactly(conn, length)
+
+        count, dimension = RESPONSE_HEADER.unpack_from(body)
+        if count < 0:
+            raise RuntimeError(f"Embedding server error: {body[RESPONSE_HEADER.size:].decode('utf-8')}")
+
+        values = array("f")
+        values.frombytes(body[RESPONSE_HEADER.size:])
+        return [values[i * dimension:(i + 1) * dimension].tolist() for i in range(count)]
+
+    def _connection(self) -> socket.socket:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            conn.settimeout(self.timeout)
+            conn.connect(self.socket_path)
+            self._local.conn = conn
+        return conn
+
+    def _close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            try:
+                conn.close()
+            finally:
+                self._local.conn = None
+
+    @staticmethod
+    def _recv_exactly(conn: socket.socket, size: int) -> bytes:
+        chunks = []
+        while size:
+            chunk = conn.recv(size)
+            if not chunk:
+                raise ConnectionError("Embedding server closed the connection")
+            chunks.append(chunk)
+            size -= len(chunk)
+        return b"".join(chunks)
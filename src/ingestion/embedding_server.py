@@ -0,0 +1,147 @@
+from typing import List, Tuple
+from array import array
+from config.settings import settings
+from loguru import logger
+import asyncio
+import json
+import os
+import struct
+import sys
+import time
+
+# Frames are a 4-byte big-endian length followed by the payload.
+# Requests carry a JSON list of texts; responses carry a (count, dimension)
+# header followed by the float32 vectors, or a negative count and an error.
+HEADER = struct.Struct("!I")
+RESPONSE_HEADER = struct.Struct("!iI")
+
+
+async def read_frame(reader: asyncio.StreamReader) -> bytes:
+    (length,) = HEADER.unpack(await reader.readexactly(HEADER.size))
+    return await reader.readexactly(length)
+
+
+def encode_vectors(vectors: List[List[float]], dimension: int) -> bytes:
+    payload = array("f")
+    for vector in vectors:
+        payload.extend(vector)
+    body = RESPONSE_HEADER.pack(len(vectors), dimension) + payload.tobytes()
+    return HEADER.pack(len(body)) + body
+
+
+def encode_error(message: str) -> bytes:
+    body = RESPONSE_HEADER.pack(-1, 0) + message.encode("utf-8")
+    return HEADER.pack(len(body)) + body
+
+
+class MicroBatcher:
+    """Gather concurrent embedding requests for a few ms and encode them as one batch"""
+
+    def __init__(self, embedder, max_wait_ms: float | None = None, max_batch_size: int | None = None):
+        self.embedder = embedder
+        self.max_wait = (max_wait_ms if max_wait_ms is not None else settings.EMBEDDING_BATCH_WAIT_MS) / 1000
+        self.max_batch_size = max_batch_size or settings.EMBEDDING_MAX_BATCH_SIZE
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self.batches = 0
+        self.texts = 0
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((texts, future))
+        return await future
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            pending: List[Tuple[List[str], asyncio.Future]] = [await self._queue.get()]
+            size = len(pending[0][0])
+            deadline = loop.time() + self.max_wait
+
+            while size < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                pending.append(item)
+                size += len(item[0])
+
+            texts = [text for request_texts, _ in pending for text in request_texts]
+            try:
+                # The model call blocks, so keep it off the event loop
+                vectors = await loop.run_in_executor(None, self.embedder.embed_batch, texts, len(texts))
+            except Exception as e:
+                logger.error(f"Error embedding batch of {len(texts)} texts: {e}")
+                for _, future in pending:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.texts += len(texts)
+            offset = 0
+            for request_texts, future in pending:
+                if not future.done():
+                    future.set_result(vectors[offset:offset + len(request_texts)])
+                offset += len(request_texts)
+
+
+class EmbeddingServer:
+    """Single process that owns the embedding model and serves it over a Unix socket"""
+
+    def __init__(self, embedder, socket_path: str | None = None):
+        self.embedder = embedder
+        self.socket_path = socket_path or settings.EMBEDDING_SOCKET_PATH
+        self.batcher = MicroBatcher(embedder)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    texts = json.loads(await read_frame(reader))
+                except asyncio.IncompleteReadError:
+                    break
+
+                try:
+                    vectors = await self.batcher.embed(texts)
+                    writer.write(encode_vectors(vectors, self.embedder.get_dimension()))
+                except Exception as e:
+                    writer.write(encode_error(str(e)))
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve(self):
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        os.makedirs(os.path.dirname(self.socket_path) or ".", exist_ok=True)
+
+        batcher_task = asyncio.create_task(self.batcher.run())
+        server = await asyncio.start_unix_server(self.handle, path=self.socket_path)
+        logger.info(f"Embedding server listening on {self.socket_path} | model={self.embedder.model_name}")
+
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            batcher_task.cancel()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+
+def main():
+    from .embedder import create_embedder
+
+    start = time.perf_counter()
+    embedder = create_embedder()
+    embedder.embed_text("warm up")
+    logger.info(f"Embedding model loaded in {time.perf_counter() - start:.2f}s")
+
+    socket_path = sys.argv[1] if len(sys.argv) > 1 else None
+    asyncio.run(EmbeddingServer(embedder, socket_path).serve())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+from typing import Any, Dict, List, Optional
+from config.settings import settings
+from loguru import logger
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import uuid
+
+INGEST_SOURCES = ("jira", "slack", "documents")
+
+
+class JobLimitReached(RuntimeError):
+    """Too many ingestion jobs are already running"""
+
+
+class BackendNotSupported(RuntimeError):
+    """Ingestion jobs are disabled, or their writes would not reach the API's searches"""
+
+
+def check_job_backend():
+    """Raise BackendNotSupported unless jobs are enabled on a store the API shares with them
+
+    Only a Chroma server works: an embedded Chroma client keeps its HNSW
+    segment in process memory, and the sharded, tiered and IVF-PQ backends
+    hold shard handles, hot-tier matrices or list row counters there too, so
+    a job process's writes would never become searchable in the API.
+    """
+    if not settings.INGEST_JOBS_ENABLED:
+        raise BackendNotSupported("Ingestion jobs are disabled; set INGEST_JOBS_ENABLED")
+    if settings.VECTOR_STORE_BACKEND != "chroma":
+        raise BackendNotSupported(
+            f"Ingestion jobs cannot write to the {settings.VECTOR_STORE_BACKEND} backend from a separate "
+            f"process; use VECTOR_STORE_BACKEND=chroma, or scripts/ingest_data.py with the API stopped"
+        )
+    if not settings.CHROMA_HOST:
+        raise BackendNotSupported(
+            "Ingestion jobs need a Chroma server (CHROMA_HOST); an embedded client only sees its own writes"
+        )
+
+
+def _limit_worker_resources():
+    """Keep a job's embedding off the cores serving query embeddings"""
+    threads = str(settings.INGEST_EMBED_THREADS)
+    # Must be set before torch / onnxruntime are imported in this process
+    for name in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[name] = threads
+    settings.EMBEDDING_ONNX_THREADS = settings.INGEST_EMBED_THREADS
+    if settings.INGEST_WORKER_NICE:
+        try:
+            os.nice(settings.INGEST_WORKER_NICE)
+        except OSError as e:
+            logger.warning(f"Could not lower ingestion worker priority: {e}")
+
+
+def _run_job(job_id: str, sources: List[str], events, cancel):
+    """Worker process entry point: ingest the sources, reporting through the events queue"""
+    _limit_worker_resources()
+    import asyncio
+
+    try:
+        if settings.EMBEDDING_BACKEND == "local" and settings.EMBEDDING_RUNTIME == "torch":
+            import torch
+            torch.set_num_threads(settings.INGEST_EMBED_THREADS)
+
+        from ..connectors.jira_connector import JiraConnector
+        from ..connectors.slack_connector import SlackConnector
+        from ..connectors.document_connector import DocumentConnector
+        from .pipeline import IngestionPipeline
+
+        connector_classes = {"jira": JiraConnector, "slack": SlackConnector, "documents": DocumentConnector}
+        pipeline = IngestionPipeline()
+        result = asyncio.run(pipeline.ingest_sources(
+            [connector_classes[source]() for source in sources],
+            on_progress=lambda report: events.put((job_id, "progress", report)),
+            cancel=cancel
+        ))
+        events.put((job_id, result["status"], result))
+    except Exception as e:
+        logger.error(f"Ingestion job {job_id} failed: {e}")
+        events.put((job_id, "failed", {"error": str(e)}))
+
+
+class IngestionJobManager:
+    """Run ingestion jobs in spawned worker processes and track their progress
+
+    Each job is its own process, so parsing and embedding never hold the API's
+    GIL or event loop; it runs with INGEST_EMBED_THREADS threads at lowered
+    priority. At most INGEST_MAX_JOBS run at once. Workers report progress
+    over a multiprocessing queue that a listener thread folds into the job table.
+    Jobs and the API both talk to the Chroma server, so a job's chunks are
+    searchable as soon as they are written; see check_job_backend.
+    """
+
+    def __init__(self, max_jobs: int | None = None, history: int | None = None):
+        check_job_backend()
+        self.max_jobs = max_jobs or settings.INGEST_MAX_JOBS
+        self.history = history or settings.INGEST_JOB_HISTORY
+        self._context = multiprocessing.get_context("spawn")
+        self._events = self._context.Queue()
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._processes: Dict[str, Any] = {}
+        self._cancels: Dict[str, Any] = {}
+        self._closed = threading.Event()
+        self._listener = threading.Thread(target=self._listen, name="ingestion-jobs", daemon=True)
+        self._listener.start()
+
+    def submit(self, sources: List[str] | None = None) -> Dict[str, Any]:
+        sources = list(sources or INGEST_SOURCES)
+        unknown = [source for source in sources if source not in INGEST_SOURCES]
+        if unknown:
+            raise ValueError(f"Unknown sources: {unknown}")
+
+        with self._lock:
+            self._reap()
+            running = sum(1 for job in self._jobs.values() if job["status"] in ("running", "cancelling"))
+            if running >= self.max_jobs:
+                raise JobLimitReached(f"{running} ingestion jobs already running (limit {self.max_jobs})")
+
+            job_id = uuid.uuid4().hex[:12]
+            cancel = self._context.Event()
+            process = self._context.Process(
+                target=_run_job,
+                args=(job_id, sources, self._events, cancel),
+                name=f"ingest-{job_id}",
+                daemon=True
+            )
+            process.start()
+            self._processes[job_id] = process
+            self._cancels[job_id] = cancel
+            self._jobs[job_id] = {
+                "job_id": job_id,
+                "status": "running",
+                "sources": sources,
+                "created_at": time.time(),
+                "finished_at": None,
+                "progress": None,
+                "error": None
+            }
+            self._prune()
+            logger.info(f"Started ingestion job {job_id} for {sources} (pid {process.pid})")
+            return dict(self._jobs[job_id])
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            self._reap()
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def list(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            self._reap()
+            return [dict(job) for job in sorted(self._jobs.values(), key=lambda job: job["created_at"], reverse=True)]
+
+    def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Ask a running job to stop; it finishes the batch in flight and reports "cancelled" """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            if job["status"] == "running":
+                self._cancels[job_id].set()
+                job["status"] = "cancelling"
+            return dict(job)
+
+    def shutdown(self, timeout: float = 10.0):
+        """Cancel running jobs, then terminate any that do not stop in time"""
+        with self._lock:
+            processes = list(self._processes.items())
+            for job_id, _ in processes:
+                self._cancels[job_id].set()
+        deadline = time.monotonic() + timeout
+        for job_id, process in processes:
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                logger.warning(f"Terminating ingestion job {job_id}")
+                process.terminate()
+        self._closed.set()
+
+    def _listen(self):
+        while not self._closed.is_set():
+            try:
+                job_id, kind, payload = self._events.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                return
+            with self._lock:
+                job = self._jobs.get(job_id)
+                if job is None:
+                    continue
+                if kind == "progress":
+                    job["progress"] = payload
+                    continue
+                job["status"] = kind
+                job["finished_at"] = time.time()
+                if kind == "failed":
+                    job["error"] = payload.get("error")
+                else:
+                    job["progress"] = payload
+                process = self._forget_process(job_id)
+            logger.info(f"Ingestion job {job_id} {kind}")
+            if process is not None:
+                # The final event is sent just before the worker exits
+                process.join(5.0)
+
+    def _reap(self):
+        """Mark jobs whose process died without reporting (e.g. killed) as failed"""
+        for job_id, process in list(self._processes.items()):
+            job = self._jobs[job_id]
+            if process.is_alive() or job["finished_at"]:
+                continue
+            # A clean exit means the final event is still on its way to the listener
+            if process.exitcode == 0:
+                continue
+            job.update(
+                status="failed",
+                finished_at=time.time(),
+                error=f"Worker exited with code {process.exitcode}"
+            )
+            self._forget_process(job_id).join(0)
+
+    def _forget_process(self, job_id: str):
+        self._cancels.pop(job_id, None)
+        return self._processes.pop(job_id, None)
+
+    def _prune(self):
+        finished = sorted(
+            (job for job in self._jobs.values() if job["finished_at"]),
+            key=lambda job: job["finished_at"]
+        )
+        for job in finished[:max(0, len(finished) - self.history)]:
+            del self._jobs[job["job_id"]]
@@ -0,0 +1,113 @@
+from typing import Dict, Any, List
+from datetime import datetime, timezone
+from config.settings import settings
+from loguru import logger
+import json
+import os
+import threading
+
+
+class IngestionManifest:
+    """Record of ingested documents with per-source totals kept up to date on write"""
+
+    def __init__(self, path: str | None = None):
+        self.path = path or settings.INGESTION_MANIFEST_PATH
+        self._lock = threading.Lock()
+        self._mtime = None
+        self.documents: Dict[str, Dict[str, Any]] = {}
+        self.totals: Dict[str, Dict[str, int]] = {}
+        self._load()
+
+    def record(
+        self,
+        source: str,
+        source_id: str,
+        chunk_count: int,
+        updated_ts: float | None = None,
+        kind: str | None = None
+    ):
+        """Register a document, replacing any previous entry for the same id
+
+        updated_ts is the update time its chunks were filed under, which a
+        tiered vector store needs to find them again on re-ingest. kind tells
+        apart documents a connector builds differently (e.g. Slack messages
+        and conversations); None is a plain record.
+        """
+        with self._lock:
+            previous = self.documents.get(source_id)
+            if previous:
+                self._adjust(previous["source"], -1, -previous["chunks"])
+
+            self.documents[source_id] = {
+                "source": source,
+                "chunks": chunk_count,
+                "updated_ts": updated_ts,
+                "kind": kind,
+                "ingested_at": datetime.now(timezone.utc).isoformat()
+            }
+            self._adjust(source, 1, chunk_count)
+
+    def chunk_count(self, source_id: str) -> int:
+        entry = self.documents.get(source_id)
+        return entry["chunks"] if entry else 0
+
+    def ids_of_other_kinds(self, source: str, kind: str | None) -> List[str]:
+        """Ids of a source's documents recorded with a kind other than the given one"""
+        with self._lock:
+            return [
+                source_id for source_id, entry in self.documents.items()
+                if entry["source"] == source and entry.get("kind") != kind
+            ]
+
+    def remove(self, source_id: str):
+        with self._lock:
+            previous = self.documents.pop(source_id, None)
+            if previous:
+                self._adjust(previous["source"], -1, -previous["chunks"])
+
+    def save(self):
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"documents": self.documents, "totals": self.totals}, f)
+            os.replace(tmp_path, self.path)
+            self._mtime = os.stat(self.path).st_mtime
+
+    def summary(self) -> Dict[str, Any]:
+        """Totals per source; reloads only if another process rewrote the file"""
+        self._reload_if_changed()
+        with self._lock:
+            return {
+                "total_documents": sum(t["documents"] for t in self.totals.values()),
+                "total_chunks": sum(t["chunks"] for t in self.totals.values()),
+                "by_source": {source: dict(t) for source, t in self.totals.items()}
+            }
+
+    def _adjust(self, source: str, documents: int, chunks: int):
+        totals = self.totals.setdefault(source, {"documents": 0, "chunks": 0})
+        totals["documents"] += documents
+        totals["chunks"] += chunks
+        if totals["documents"] <= 0:
+            self.totals.pop(source, None)
+
+    def _reload_if_changed(self):
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except FileNotFoundError:
+            return
+        if mtime != self._mtime:
+            self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            with self._lock:
+                self.documents = data.get("documents", {})
+                self.totals = data.get("totals", {})
+                self._mtime = os.stat(self.path).st_mtime
+        except Exception as e:
+            logger.error(f"Error loading ingestion manifest {self.path}: {e}")
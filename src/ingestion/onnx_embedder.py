@@ -0,0 +1,189 @@
+from typing import List, Dict
+from config.settings import settings
+from loguru import logger
+import json
+import os
+import re
+import shutil
+import tempfile
+
+
+def _require_onnx():
+    try:
+        import onnxruntime  # noqa: F401
+    except ImportError as e:
+        raise ImportError(
+            "The ONNX embedding runtime needs onnxruntime and onnx: pip install onnx onnxruntime"
+        ) from e
+
+
+def model_dir(model_name: str, export_dir: str | None = None) -> str:
+    safe_name = re.sub(r"[^A-Za-z0-9_.-]+", "__", model_name)
+    return os.path.join(export_dir or settings.EMBEDDING_ONNX_DIR, safe_name)
+
+
+def export_onnx(model_name: str, export_dir: str | None = None, quantize: bool = False) -> str:
+    """Export the SentenceTransformer encoder to ONNX (once) and return the model path
+
+    The export is written to a temporary directory and moved into place whole;
+    embedding_config.json is written last and marks a complete export, so an
+    interrupted run is redone instead of loading a truncated model.
+    """
+    output_dir = model_dir(model_name, export_dir)
+    fp32_path = os.path.join(output_dir, "model.onnx")
+    int8_path = os.path.join(output_dir, "model.int8.onnx")
+
+    if not os.path.exists(os.path.join(output_dir, "embedding_config.json")):
+        _export_fp32(model_name, output_dir)
+
+    if not quantize:
+        return fp32_path
+
+    if not os.path.exists(int8_path):
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+
+        logger.info(f"Quantizing {fp32_path} to int8")
+        tmp_path = os.path.join(output_dir, f".model.int8.{os.getpid()}.onnx")
+        try:
+            quantize_dynamic(fp32_path, tmp_path, weight_type=QuantType.QInt8)
+            os.replace(tmp_path, int8_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    return int8_path
+
+
+def _export_fp32(model_name: str, output_dir: str):
+    import torch
+    from sentence_transformers import SentenceTransformer
+    from sentence_transformers.models import Normalize
+
+    logger.info(f"Exporting {model_name} to ONNX in {output_dir}")
+    parent = os.path.dirname(output_dir)
+    os.makedirs(parent, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix=f".{os.path.basename(output_dir)}.", dir=parent)
+    try:
+        st_model = SentenceTransformer(model_name, device="cpu")
+        transformer = st_model[0].auto_model.eval()
+        tokenizer = st_model.tokenizer
+        dummy = tokenizer(["warm up export"], return_tensors="pt")
+        input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in dummy]
+
+        with torch.no_grad():
+            torch.onnx.export(
+                transformer,
+                tuple(dummy[name] for name in input_names),
+                os.path.join(tmp_dir, "model.onnx"),
+                input_names=input_names,
+                output_names=["last_hidden_state"],
+                dynamic_axes={
+                    **{name: {0: "batch", 1: "sequence"} for name in input_names},
+                    "last_hidden_state": {0: "batch", 1: "sequence"}
+                },
+                opset_version=14
+            )
+
+        tokenizer.save_pretrained(tmp_dir)
+        with open(os.path.join(tmp_dir, "embedding_config.json"), "w") as f:
+            json.dump({
+                "model_name": model_name,
+                "max_seq_length": st_model.max_seq_length,
+                "normalize": any(isinstance(module, Normalize) for module in st_model),
+                "dimension": st_model.get_sentence_embedding_dimension()
+            }, f, indent=2)
+
+        if os.path.exists(os.path.join(output_dir, "embedding_config.json")):
+            # Another process finished the same export first
+            return
+        # Leftovers of an interrupted export have no config; clear them so the rename succeeds
+        shutil.rmtree(output_dir, ignore_errors=True)
+        os.replace(tmp_dir, output_dir)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+class OnnxEmbedder:
+    """Mean-pooled sentence embeddings from an exported ONNX encoder on onnxruntime"""
+
+    def __init__(
+        self,
+        model_name: str | None = None,
+        quantize: bool | None = None,
+        export_dir: str | None = None
+    ):
+        _require_onnx()
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        self.model_name = model_name or settings.EMBEDDING_MODEL
+        self.quantize = settings.EMBEDDING_ONNX_QUANTIZE if quantize is None else quantize
+        self.model_path = export_onnx(self.model_name, export_dir, self.quantize)
+
+        output_dir = os.path.dirname(self.model_path)
+        with open(os.path.join(output_dir, "embedding_config.json")) as f:
+            config = json.load(f)
+        self.max_seq_length = config["max_seq_length"]
+        self.normalize = config["normalize"]
+        self.dimension = config["dimension"]
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if settings.EMBEDDING_ONNX_THREADS:
+            options.intra_op_num_threads = settings.EMBEDDING_ONNX_THREADS
+        self.session = ort.InferenceSession(self.model_path, options, providers=["CPUExecutionProvider"])
+        self.input_names = {node.name for node in self.session.get_inputs()}
+        self.tokenizer = AutoTokenizer.from_pretrained(output_dir)
+
+        logger.info(f"Loaded ONNX embedder {self.model_path} | quantized={self.quantize}")
+
+    def embed_text(self, text: str) -> List[float]:
+        return self.embed_batch([text])[0]
+
+    def embed_batch(self, texts: List[str], batch_size: int = 32) -> List[List[float]]:
+        import numpy as np
+
+        embeddings = []
+        for start in range(0, len(texts), batch_size):
+            encoded = self.tokenizer(
+                texts[start:start + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=self.max_seq_length,
+                return_tensors="np"
+            )
+            feed = {
+                name: value.astype(np.int64)
+                for name, value in encoded.items()
+                if name in self.input_names
+            }
+            token_embeddings = self.session.run(None, feed)[0]
+
+            # Mean pooling over real tokens, matching sentence-transformers
+            mask = encoded["attention_mask"][..., None].astype(np.float32)
+            pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            if self.normalize:
+                pooled = pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+            embeddings.append(pooled.astype(np.float32))
+
+        if not embeddings:
+            return []
+        return np.concatenate(embeddings).tolist()
+
+    def get_dimension(self) -> int:
+        return self.dimension
+
+
+def parity_check(reference, candidate, texts: List[str]) -> Dict[str, float]:
+    """Cosine similarity between two embedders' outputs for the same texts"""
+    import numpy as np
+
+    a = np.asarray(reference.embed_batch(texts), dtype=np.float32)
+    b = np.asarray(candidate.embed_batch(texts), dtype=np.float32)
+    a /= np.linalg.norm(a, axis=1, keepdims=True)
+    b /= np.linalg.norm(b, axis=1, keepdims=True)
+    cosine = (a * b).sum(axis=1)
+    return {
+        "min_cosine": float(cosine.min()),
+        "mean_cosine": float(cosine.mean()),
+        "texts": len(texts)
+    }
@@ -1,65 +1,215 @@
-from typing import List, Dict, Any
+from typing import Any, Callable, Dict, List, Optional
 from .preprocessor import TextPreprocessor
-from .embedder import Embedder
-from ..connectors.base import Document
-from ..storage.vector_store import VectorStore
+from .stages import StagedIngestion
+from .manifest import IngestionManifest
+from ..connectors.base import BaseConnector, Document
+from .. import registry
+from ..agents.llm_cache import get_llm_cache
+from ..monitoring.metrics import record_ingestion, INGESTION_DELETED_DOCUMENTS
+from config.settings import settings
 from loguru import logger
-import asyncio
+from datetime import timezone
+import threading
+import time
 
 class IngestionPipeline:
     def __init__(self):
         self.preprocessor = TextPreprocessor()
-        self.embedder = Embedder()
-        self.vector_store = VectorStore()
+        self.embedder = registry.get_embedder()
+        self.vector_store = registry.get_vector_store()
+        self.llm_cache = get_llm_cache()
+        self.manifest = IngestionManifest()
+        self.metadata_store = registry.get_metadata_store() if settings.DOCUMENT_METADATA_ENABLED else None
+    
+    def prepare_document(self, document: Document) -> Dict[str, Any]:
+        """Chunk stage: split a document into chunk texts"""
+        return {"document": document, "chunks": self.preprocessor.chunk_text(document.content)}
+    
+    def build_chunks(self, prepared: Dict[str, Any], embeddings: List[List[float]]) -> Dict[str, Any]:
+        """Attach embeddings and metadata to a prepared document's chunks"""
+        document = prepared["document"]
+        
+        # Numeric update time, so stores can filter and partition by range; naive times are UTC
+        updated = document.metadata.updated_at or document.metadata.created_at
+        if updated and updated.tzinfo is None:
+            updated = updated.replace(tzinfo=timezone.utc)
+        # Where the previous version was filed, so a tiered store need not search every month
+        previous = self.manifest.documents.get(document.metadata.source_id)
+        
+        processed_chunks = []
+        for idx, (chunk, embedding) in enumerate(zip(prepared["chunks"], embeddings)):
+            chunk_metadata = {
+                **document.metadata.to_dict(),
+                "chunk_index": idx,
+                "chunk_total": len(prepared["chunks"]),
+                "updated_ts": updated.timestamp() if updated else None,
+                **self.preprocessor.extract_metadata(chunk)
+            }
+            
+            processed_chunk = {
+                "id": f"{document.metadata.source_id}_chunk_{idx}",
+                "content": chunk,
+                "embedding": embedding,
+                "metadata": chunk_metadata
+            }
+            # None for a new document; absent when the manifest entry predates
+            # updated_ts, and the store then checks everywhere
+            if previous is None:
+                processed_chunk["previous_updated_ts"] = None
+            elif "updated_ts" in previous:
+                # Undated documents are filed as the oldest possible
+                processed_chunk["previous_updated_ts"] = previous["updated_ts"] or 0.0
+            processed_chunks.append(processed_chunk)
+        
+        return {"document": document, "chunks": processed_chunks}
     
     async def process_document(self, document: Document) -> List[Dict[str, Any]]:
         """Process a single document through the pipeline"""
         try:
-            # Chunk the document
-            chunks = self.preprocessor.chunk_text(document.content)
-            
-            # Generate embeddings
-            embeddings = self.embedder.embed_batch(chunks)
-            
-            # Prepare chunks with metadata
-            processed_chunks = []
-            for idx, (chunk, embedding) in enumerate(zip(chunks, embeddings)):
-                chunk_metadata = {
-                    **document.metadata.to_dict(),
-                    "chunk_index": idx,
-                    "chunk_total": len(chunks),
-                    **self.preprocessor.extract_metadata(chunk)
-                }
-                
-                processed_chunks.append({
-                    "id": f"{document.metadata.source_id}_chunk_{idx}",
-                    "content": chunk,
-                    "embedding": embedding,
-                    "metadata": chunk_metadata
-                })
-            
-            return processed_chunks
+            prepared = self.prepare_document(document)
+            embeddings = self.embedder.embed_batch(prepared["chunks"])
+            return self.build_chunks(prepared, embeddings)["chunks"]
             
         except Exception as e:
             logger.error(f"Error processing document {document.metadata.source_id}: {e}")
             return []
     
-    async def ingest_documents(self, documents: List[Document]) -> Dict[str, Any]:
-        """Ingest multiple documents"""
-        logger.info(f"Starting ingestion of {len(documents)} documents")
-        
+    def store_batch(self, batch: List[Dict[str, Any]]):
+        """Store stage: write built documents and update the manifest, metadata table and LLM cache"""
         all_chunks = []
-        for document in documents:
-            chunks = await self.process_document(document)
+        metadata_rows = []
+        stale_chunk_ids = []
+        for entry in batch:
+            document, chunks = entry["document"], entry["chunks"]
             all_chunks.extend(chunks)
+            # A re-ingested document that shrank leaves trailing chunks behind
+            source_id = document.metadata.source_id
+            previous_count = self.manifest.chunk_count(source_id)
+            stale_chunk_ids.extend(
+                f"{source_id}_chunk_{idx}" for idx in range(len(chunks), previous_count)
+            )
+            metadata_rows.append(self._metadata_row(document, len(chunks)))
+        
+        if not all_chunks:
+            return
         
         # Store in vector database
-        if all_chunks:
-            self.vector_store.add_documents(all_chunks)
-            logger.info(f"Ingested {len(all_chunks)} chunks from {len(documents)} documents")
+        self.vector_store.add_documents(all_chunks)
+        if stale_chunk_ids:
+            self.vector_store.delete_chunks(stale_chunk_ids)
+        
+        # Recorded only once written, so a failed batch is retried on the next run
+        for entry in batch:
+            metadata = entry["document"].metadata
+            updated_ts = entry["chunks"][0]["metadata"]["updated_ts"] if entry["chunks"] else None
+            kind = (metadata.extra or {}).get("kind")
+            self.manifest.record(metadata.source, metadata.source_id, len(entry["chunks"]), updated_ts, kind)
+        
+        # Cached answers built from re-ingested chunks are stale
+        if self.llm_cache:
+            self.llm_cache.invalidate_chunks(
+                [chunk["id"] for chunk in all_chunks] + stale_chunk_ids
+            )
+        
+        self.manifest.save()
+        
+        if self.metadata_store and metadata_rows:
+            try:
+                self.metadata_store.upsert_documents(metadata_rows)
+            except Exception as e:
+                logger.error(f"Error upserting document metadata: {e}")
+    
+    async def ingest_documents(
+        self,
+        documents: List[Document],
+        on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+        cancel: Optional[threading.Event] = None
+    ) -> Dict[str, Any]:
+        """Ingest multiple documents"""
+        logger.info(f"Starting ingestion of {len(documents)} documents")
+        return await self.ingest_sources([documents], on_progress=on_progress, cancel=cancel)
+    
+    async def ingest_sources(
+        self,
+        sources: List[Any],
+        on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+        cancel: Optional[threading.Event] = None
+    ) -> Dict[str, Any]:
+        """Fetch from connectors (or document lists) and ingest through the staged pipeline"""
+        start_time = time.perf_counter()
+        report = await StagedIngestion(self, on_progress=on_progress, cancel=cancel).run(sources)
+        if report["status"] == "success":
+            await self._delete_superseded(sources)
+        record_ingestion(report["documents"], report["chunks"], time.perf_counter() - start_time)
+        
+        return {
+            **report,
+            "documents_processed": report["documents"],
+            "chunks_created": report["chunks"]
+        }
+    
+    async def delete_documents(self, source: str, source_ids: List[str]) -> int:
+        """Remove documents whose source files were deleted"""
+        if not source_ids:
+            return 0
+        
+        chunk_ids = [
+            f"{source_id}_chunk_{idx}"
+            for source_id in source_ids
+            for idx in range(self.manifest.chunk_count(source_id))
+        ]
+        self.vector_store.delete_documents(source_ids)
+        
+        if self.llm_cache:
+            self.llm_cache.invalidate_chunks(chunk_ids)
+        
+        if self.metadata_store:
+            try:
+                self.metadata_store.delete_documents([f"{source}:{source_id}" for source_id in source_ids])
+            except Exception as e:
+                logger.error(f"Error deleting document metadata: {e}")
+        
+        for source_id in source_ids:
+            self.manifest.remove(source_id)
+        self.manifest.save()
+        
+        INGESTION_DELETED_DOCUMENTS.inc(len(source_ids))
+        logger.info(f"Deleted {len(source_ids)} {source} documents")
+        return len(source_ids)
+    
+    async def _delete_superseded(self, sources: List[Any]):
+        """Remove documents of a kind a connector no longer produces, e.g. after a Slack aggregation change"""
+        for source in sources:
+            if not isinstance(source, BaseConnector):
+                continue
+            stale = self.manifest.ids_of_other_kinds(source.source_name, source.document_kind)
+            if stale:
+                logger.info(f"Removing {len(stale)} superseded {source.source_name} documents")
+                await self.delete_documents(source.source_name, stale)
+    
+    @staticmethod
+    def _metadata_row(document: Document, chunk_count: int) -> Dict[str, Any]:
+        """Build a document_metadata row from connector metadata"""
+        metadata = document.metadata
+        extra = {
+            key: getattr(metadata, key)
+            for key in ("issue_type", "priority", "channel", "thread_ts", "file_type")
+            if getattr(metadata, key) is not None
+        }
+        if metadata.extra:
+            extra.update(metadata.extra)
         
         return {
-            "documents_processed": len(documents),
-            "chunks_created": len(all_chunks),
-            "status": "success"
-        }
\ No newline at end of file
+            "id": f"{metadata.source}:{metadata.source_id}",
+            "source": metadata.source,
+            "source_id": metadata.source_id,
+            "title": metadata.title,
+            "author": metadata.author,
+            "created_at": metadata.created_at,
+            "updated_at": metadata.updated_at,
+            "url": metadata.url,
+            "status": metadata.status,
+            "tags": metadata.tags or [],
+            "extra_metadata": extra,
+            "chunk_count": chunk_count
+        }
@@ -0,0 +1,272 @@
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from dataclasses import dataclass, field
+from ..monitoring.metrics import INGESTION_STAGE_BUSY_SECONDS, INGESTION_STAGE_UTILISATION
+from config.settings import settings
+from loguru import logger
+import asyncio
+import threading
+import time
+
+# End-of-stream marker, one per downstream worker
+_DONE = object()
+
+
+@dataclass
+class StageStats:
+    name: str
+    workers: int
+    items: int = 0
+    busy_seconds: float = 0.0
+
+    def utilisation(self, wall_seconds: float) -> float:
+        """Share of the stage's worker time spent working rather than waiting on a queue"""
+        if wall_seconds <= 0:
+            return 0.0
+        return min(1.0, self.busy_seconds / (self.workers * wall_seconds))
+
+
+@dataclass
+class IngestionProgress:
+    documents: int = 0
+    chunks: int = 0
+    failed_documents: int = 0
+    started: float = field(default_factory=time.perf_counter)
+
+    def snapshot(self, stages: List[StageStats]) -> Dict[str, Any]:
+        elapsed = time.perf_counter() - self.started
+        return {
+            "documents": self.documents,
+            "chunks": self.chunks,
+            "failed_documents": self.failed_documents,
+            "elapsed_seconds": round(elapsed, 3),
+            "documents_per_second": round(self.documents / elapsed, 2) if elapsed > 0 else 0.0,
+            "chunks_per_second": round(self.chunks / elapsed, 2) if elapsed > 0 else 0.0,
+            "stages": {
+                stage.name: {
+                    "workers": stage.workers,
+                    "items": stage.items,
+                    "busy_seconds": round(stage.busy_seconds, 3),
+                    "utilisation": round(stage.utilisation(elapsed), 3)
+                }
+                for stage in stages
+            }
+        }
+
+
+class StagedIngestion:
+    """fetch -> chunk -> embed -> store, connected by bounded queues
+
+    Each stage has its own workers, so reading, chunking, embedding and
+    writing overlap and the slowest stage (normally embedding) sets the pace;
+    full queues push back on the stages before it. Embedding and storing run
+    in threads because the model and the stores block.
+
+    A source is either a connector (anything with an async fetch_documents)
+    or an iterable of Documents. cancel is checked between items; a cancelled
+    run drains its queues without processing and reports status "cancelled".
+    """
+
+    def __init__(
+        self,
+        pipeline,
+        chunk_workers: int | None = None,
+        embed_workers: int | None = None,
+        queue_size: int | None = None,
+        embed_batch_size: int | None = None,
+        store_batch_size: int | None = None,
+        on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+        cancel: Optional[threading.Event] = None
+    ):
+        self.pipeline = pipeline
+        self.queue_size = queue_size or settings.INGEST_QUEUE_SIZE
+        self.embed_batch_size = embed_batch_size or settings.INGEST_EMBED_BATCH_SIZE
+        self.store_batch_size = store_batch_size or settings.INGEST_STORE_BATCH_SIZE
+        self.on_progress = on_progress
+        self.cancel = cancel or threading.Event()
+        self.progress = IngestionProgress()
+        self.stages = {
+            "fetch": StageStats("fetch", 0),
+            "chunk": StageStats("chunk", chunk_workers or settings.INGEST_CHUNK_WORKERS),
+            "embed": StageStats("embed", embed_workers or settings.INGEST_EMBED_WORKERS),
+            # One writer keeps manifest updates and upserts ordered
+            "store": StageStats("store", 1)
+        }
+
+    async def run(self, sources: Iterable[Any]) -> Dict[str, Any]:
+        sources = list(sources)
+        self.progress = IngestionProgress()
+        self.stages["fetch"].workers = max(1, len(sources))
+        chunk_queue = asyncio.Queue(maxsize=self.queue_size)
+        embed_queue = asyncio.Queue(maxsize=self.queue_size)
+        store_queue = asyncio.Queue(maxsize=self.queue_size)
+
+        stages = [
+            ([self._fetch(source, chunk_queue) for source in sources], chunk_queue),
+            ([self._chunk_worker(chunk_queue, embed_queue) for _ in range(self.stages["chunk"].workers)], embed_queue),
+            ([self._embed_worker(embed_queue, store_queue) for _ in range(self.stages["embed"].workers)], store_queue),
+            ([self._store_worker(store_queue)], None)
+        ]
+        tasks = [[asyncio.create_task(worker) for worker in workers] for workers, _ in stages]
+
+        async def close_after(index: int, outbox: asyncio.Queue):
+            # Close a stage once every worker of the stage feeding it has finished
+            await asyncio.gather(*tasks[index])
+            for _ in tasks[index + 1]:
+                await outbox.put(_DONE)
+
+        closers = [
+            asyncio.create_task(close_after(index, outbox))
+            for index, (_, outbox) in enumerate(stages) if outbox is not None
+        ]
+        everything = [task for stage_tasks in tasks for task in stage_tasks] + closers
+
+        # A worker dying unexpectedly would leave its neighbours blocked on a full
+        # or empty queue, so fail the whole run as soon as any task raises
+        try:
+            done, pending = await asyncio.wait(everything, return_when=asyncio.FIRST_EXCEPTION)
+        except BaseException:
+            for task in everything:
+                task.cancel()
+            raise
+        failed = [task for task in done if not task.cancelled() and task.exception() is not None]
+        if failed:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            raise failed[0].exception()
+
+        report = self.report()
+        self._publish_metrics(report)
+        return report
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            **self.progress.snapshot(list(self.stages.values())),
+            "status": "cancelled" if self.cancel.is_set() else "success"
+        }
+
+    async def _timed(self, stage: str, fn, *args, items: int = 1):
+        start = time.perf_counter()
+        try:
+            return await fn(*args)
+        finally:
+            stats = self.stages[stage]
+            stats.busy_seconds += time.perf_counter() - start
+            stats.items += items
+
+    async def _fetch(self, source: Any, outbox: asyncio.Queue):
+        if hasattr(source, "fetch_documents"):
+            name = getattr(source, "source_name", type(source).__name__)
+            try:
+                documents = await self._timed("fetch", source.fetch_documents, items=0)
+            except Exception as e:
+                logger.error(f"Error fetching from {name}: {e}")
+                return
+            logger.info(f"Fetched {len(documents)} documents from {name}")
+        else:
+            documents = source
+
+        for document in documents:
+            if self.cancel.is_set():
+                return
+            self.stages["fetch"].items += 1
+            await outbox.put(document)
+
+    async def _chunk_worker(self, inbox: asyncio.Queue, outbox: asyncio.Queue):
+        while (document := await inbox.get()) is not _DONE:
+            if self.cancel.is_set():
+                continue
+            start = time.perf_counter()
+            try:
+                # In a thread so several chunk workers really run side by side
+                prepared = await asyncio.to_thread(self.pipeline.prepare_document, document)
+            except Exception as e:
+                logger.error(f"Error chunking document {document.metadata.source_id}: {e}")
+                self.progress.failed_documents += 1
+                continue
+            finally:
+                self.stages["chunk"].busy_seconds += time.perf_counter() - start
+                self.stages["chunk"].items += 1
+            if not prepared["chunks"]:
+                continue
+            await outbox.put(prepared)
+
+    async def _embed_worker(self, inbox: asyncio.Queue, outbox: asyncio.Queue):
+        done = False
+        while not done:
+            # Fill a batch across documents: small documents alone make tiny, slow model calls
+            batch = [await inbox.get()]
+            while batch[-1] is not _DONE and sum(len(p["chunks"]) for p in batch) < self.embed_batch_size:
+                try:
+                    batch.append(inbox.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            if batch[-1] is _DONE:
+                batch.pop()
+                done = True
+            if not batch or self.cancel.is_set():
+                continue
+
+            texts = [text for prepared in batch for text in prepared["chunks"]]
+            try:
+                embeddings = await self._timed(
+                    "embed",
+                    asyncio.to_thread,
+                    self.pipeline.embedder.embed_batch,
+                    texts,
+                    items=len(texts)
+                )
+                built = []
+                offset = 0
+                for prepared in batch:
+                    count = len(prepared["chunks"])
+                    built.append(self.pipeline.build_chunks(prepared, embeddings[offset:offset + count]))
+                    offset += count
+            except Exception as e:
+                logger.error(f"Error embedding {len(batch)} documents: {e}")
+                self.progress.failed_documents += len(batch)
+                continue
+
+            for entry in built:
+                await outbox.put(entry)
+
+    async def _store_worker(self, inbox: asyncio.Queue):
+        pending: List[Dict[str, Any]] = []
+        while True:
+            item = await inbox.get()
+            if item is not _DONE and not self.cancel.is_set():
+                pending.append(item)
+            pending_chunks = sum(len(entry["chunks"]) for entry in pending)
+            if pending and (item is _DONE or pending_chunks >= self.store_batch_size):
+                await self._store(pending)
+                pending = []
+            if item is _DONE:
+                return
+
+    async def _store(self, batch: List[Dict[str, Any]]):
+        chunks = sum(len(entry["chunks"]) for entry in batch)
+        try:
+            await self._timed("store", asyncio.to_thread, self.pipeline.store_batch, batch, items=chunks)
+        except Exception as e:
+            logger.error(f"Error storing {chunks} chunks: {e}")
+            self.progress.failed_documents += len(batch)
+            return
+
+        self.progress.documents += len(batch)
+        self.progress.chunks += chunks
+        if self.on_progress:
+            try:
+                self.on_progress(self.report())
+            except Exception as e:
+                logger.warning(f"Ingestion progress callback failed: {e}")
+
+    @staticmethod
+    def _publish_metrics(report: Dict[str, Any]):
+        for name, stage in report["stages"].items():
+            INGESTION_STAGE_BUSY_SECONDS.labels(stage=name).inc(stage["busy_seconds"])
+            INGESTION_STAGE_UTILISATION.labels(stage=name).set(stage["utilisation"])
+        logger.info(
+            f"Ingestion {report['status']}: {report['documents']} documents, {report['chunks']} chunks "
+            f"in {report['elapsed_seconds']}s | utilisation "
+            + ", ".join(f"{name}={stage['utilisation']:.0%}" for name, stage in report["stages"].items())
+        )
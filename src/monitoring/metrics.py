@@ -0,0 +1,128 @@
+from typing import Callable, List
+from contextlib import contextmanager
+from prometheus_client import Counter, Gauge, Histogram
+import time
+
+STAGE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+SEARCH_STAGE_LATENCY = Histogram(
+    "search_stage_latency_seconds",
+    "Latency of each search pipeline stage",
+    ["stage"],
+    buckets=STAGE_BUCKETS
+)
+
+SEARCH_LATENCY = Histogram(
+    "search_latency_seconds",
+    "End-to-end search latency",
+    buckets=STAGE_BUCKETS
+)
+
+CACHE_EVENTS = Counter(
+    "search_cache_events_total",
+    "Cache lookups by cache and result",
+    ["cache", "result"]
+)
+
+ERRORS = Counter(
+    "search_errors_total",
+    "Errors raised or swallowed by a pipeline stage",
+    ["stage"]
+)
+
+FALLBACKS = Counter(
+    "search_fallbacks_total",
+    "Times a component returned its fallback response",
+    ["component"]
+)
+
+INGESTION_DOCUMENTS = Counter(
+    "ingestion_documents_total",
+    "Documents processed by the ingestion pipeline"
+)
+
+INGESTION_CHUNKS = Counter(
+    "ingestion_chunks_total",
+    "Chunks written by the ingestion pipeline"
+)
+
+INGESTION_DOCUMENTS_PER_SECOND = Gauge(
+    "ingestion_documents_per_second",
+    "Document throughput of the last ingestion run"
+)
+
+INGESTION_CHUNKS_PER_SECOND = Gauge(
+    "ingestion_chunks_per_second",
+    "Chunk throughput of the last ingestion run"
+)
+
+INGESTION_STAGE_BUSY_SECONDS = Counter(
+    "ingestion_stage_busy_seconds_total",
+    "Worker time each ingestion stage spent processing rather than waiting",
+    ["stage"]
+)
+
+INGESTION_STAGE_UTILISATION = Gauge(
+    "ingestion_stage_utilisation",
+    "Busy share of each ingestion stage's workers over the last run",
+    ["stage"]
+)
+
+INGESTION_FRESHNESS_LAG = Histogram(
+    "ingestion_freshness_lag_seconds",
+    "Delay between a source file changing and its chunks becoming searchable",
+    buckets=(0.5, 1, 2, 5, 10, 30, 60, 120, 300, 900, 3600)
+)
+
+INGESTION_DELETED_DOCUMENTS = Counter(
+    "ingestion_deleted_documents_total",
+    "Documents removed from the index because their source disappeared"
+)
+
+QUERY_LOG_ROWS = Counter(
+    "query_log_rows_total",
+    "Query log rows by outcome: enqueued, written, dropped (queue full) or failed (write error)",
+    ["result"]
+)
+
+STARTUP_SECONDS = Gauge(
+    "app_startup_seconds",
+    "Seconds spent in the startup hook before the app reported ready"
+)
+
+# Extra consumers of raw stage timings (e.g. the offline benchmark harness,
+# which needs exact percentiles rather than histogram buckets)
+_stage_observers: List[Callable[[str, float], None]] = []
+
+
+def add_stage_observer(observer: Callable[[str, float], None]):
+    _stage_observers.append(observer)
+
+
+def remove_stage_observer(observer: Callable[[str, float], None]):
+    if observer in _stage_observers:
+        _stage_observers.remove(observer)
+
+
+@contextmanager
+def track_stage(stage: str):
+    """Time a block of work as a search stage, counting it as an error if it raises"""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        ERRORS.labels(stage=stage).inc()
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        SEARCH_STAGE_LATENCY.labels(stage=stage).observe(elapsed)
+        for observer in _stage_observers:
+            observer(stage, elapsed)
+
+
+def record_ingestion(documents: int, chunks: int, elapsed_seconds: float):
+    INGESTION_DOCUMENTS.inc(documents)
+    INGESTION_CHUNKS.inc(chunks)
+    if elapsed_seconds > 0:
+        INGESTION_DOCUMENTS_PER_SECOND.set(documents / elapsed_seconds)
+        INGESTION_CHUNKS_PER_SECOND.set(chunks / elapsed_seconds)
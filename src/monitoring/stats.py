@@ -0,0 +1,131 @@
+from typing import Dict, List, Any
+from datetime import date
+from config.settings import settings
+import bisect
+import threading
+import time
+
+
+def _latency_buckets(start_ms: float = 1.0, factor: float = 1.25, max_ms: float = 120000.0) -> List[float]:
+    """Geometric bucket upper bounds in milliseconds"""
+    bounds = []
+    bound = start_ms
+    while bound < max_ms:
+        bounds.append(round(bound, 2))
+        bound *= factor
+    bounds.append(max_ms)
+    return bounds
+
+
+LATENCY_BUCKETS_MS = _latency_buckets()
+
+
+class _Slot:
+    __slots__ = ("minute", "count", "latency_sum", "buckets")
+
+    def __init__(self, n_buckets: int):
+        self.minute = -1
+        self.count = 0
+        self.latency_sum = 0
+        self.buckets = [0] * n_buckets
+
+
+class QueryStatsAggregator:
+    """Rolling in-memory query statistics, updated incrementally on every search
+
+    Latencies are kept in fixed histogram buckets over a ring of per-minute
+    slots, so both recording and reading are independent of query volume.
+    """
+
+    def __init__(self, window_minutes: int | None = None):
+        self.window_minutes = window_minutes or settings.STATS_WINDOW_MINUTES
+        self._n_buckets = len(LATENCY_BUCKETS_MS) + 1
+        self._slots = [_Slot(self._n_buckets) for _ in range(self.window_minutes)]
+        self._lock = threading.Lock()
+
+        # Running totals over the window
+        self._window_count = 0
+        self._window_latency_sum = 0
+        self._window_buckets = [0] * self._n_buckets
+
+        self._day = date.today()
+        self._queries_today = 0
+        self._sources_today: Dict[str, int] = {}
+        self._total_queries = 0
+
+    def record(self, latency_ms: int, sources: List[str] | None = None):
+        bucket = bisect.bisect_left(LATENCY_BUCKETS_MS, latency_ms)
+        minute = int(time.time() // 60)
+
+        with self._lock:
+            self._expire(minute)
+            slot = self._slots[minute % self.window_minutes]
+            if slot.minute != minute:
+                slot.minute = minute
+
+            slot.count += 1
+            slot.latency_sum += latency_ms
+            slot.buckets[bucket] += 1
+            self._window_count += 1
+            self._window_latency_sum += latency_ms
+            self._window_buckets[bucket] += 1
+
+            self._roll_day()
+            self._queries_today += 1
+            self._total_queries += 1
+            for source in sources or []:
+                self._sources_today[source] = self._sources_today.get(source, 0) + 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            self._expire(int(time.time() // 60))
+            self._roll_day()
+            count = self._window_count
+            return {
+                "queries_today": self._queries_today,
+                "queries_total": self._total_queries,
+                "queries_by_source_today": dict(self._sources_today),
+                "window_minutes": self.window_minutes,
+                "window_queries": count,
+                "avg_latency_ms": int(self._window_latency_sum / count) if count else 0,
+                "p50_latency_ms": self._percentile(0.50),
+                "p95_latency_ms": self._percentile(0.95),
+                "p99_latency_ms": self._percentile(0.99)
+            }
+
+    def _expire(self, minute: int):
+        """Subtract slots that have fallen out of the window (lock held)"""
+        for slot in self._slots:
+            if slot.minute >= 0 and slot.minute <= minute - self.window_minutes:
+                self._window_count -= slot.count
+                self._window_latency_sum -= slot.latency_sum
+                for i, n in enumerate(slot.buckets):
+                    if n:
+                        self._window_buckets[i] -= n
+                slot.minute = -1
+                slot.count = 0
+                slot.latency_sum = 0
+                slot.buckets = [0] * self._n_buckets
+
+    def _roll_day(self):
+        today = date.today()
+        if today != self._day:
+            self._day = today
+            self._queries_today = 0
+            self._sources_today = {}
+
+    def _percentile(self, q: float) -> int:
+        if not self._window_count:
+            return 0
+        target = q * self._window_count
+        seen = 0
+        for i, n in enumerate(self._window_buckets):
+            seen += n
+            if seen >= target:
+                if i < len(LATENCY_BUCKETS_MS):
+                    return int(LATENCY_BUCKETS_MS[i])
+                return int(LATENCY_BUCKETS_MS[-1])
+        return int(LATENCY_BUCKETS_MS[-1])
+
+
+query_stats = QueryStatsAggregator()
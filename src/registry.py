@@ -0,0 +1,107 @@
+from typing import Any, Callable, Dict, Hashable, Optional
+from config.settings import settings
+from loguru import logger
+import threading
+import time
+
+# Process-wide registry of heavy shared objects (models, stores, LLM clients).
+# Everything is built lazily on first use so importing a module never loads a
+# model or opens a database; warm_up() pays that cost up front.
+_lock = threading.RLock()
+_instances: Dict[Hashable, Any] = {}
+_UNAVAILABLE = object()
+
+
+def _get_or_create(key: Hashable, factory: Callable[[], Any]) -> Any:
+    instance = _instances.get(key)
+    if instance is not None:
+        return instance
+
+    with _lock:
+        instance = _instances.get(key)
+        if instance is None:
+            start = time.perf_counter()
+            instance = factory()
+            _instances[key] = instance
+            logger.info(f"Registry built {key} in {time.perf_counter() - start:.2f}s")
+        return instance
+
+
+def get_embedder():
+    if settings.EMBEDDING_BACKEND == "server":
+        from .ingestion.embedding_client import RemoteEmbedder
+        return _get_or_create("embedder", RemoteEmbedder)
+
+    from .ingestion.embedder import create_embedder
+    return _get_or_create("embedder", create_embedder)
+
+
+def get_vector_store():
+    if settings.VECTOR_STORE_BACKEND == "sharded":
+        from .storage.sharded_vector_store import ShardedVectorStore
+        return _get_or_create("vector_store", ShardedVectorStore)
+    if settings.VECTOR_STORE_BACKEND == "tiered":
+        from .storage.tiered_vector_store import TieredVectorStore
+        return _get_or_create("vector_store", TieredVectorStore)
+    if settings.VECTOR_STORE_BACKEND == "ivfpq":
+        from .storage.ivfpq_store import IVFPQVectorStore
+        return _get_or_create("vector_store", IVFPQVectorStore)
+
+    from .storage.vector_store import VectorStore
+    return _get_or_create("vector_store", VectorStore)
+
+
+def get_metadata_store():
+    """Shared MetadataStore, or None if the database is unreachable"""
+    if not (settings.QUERY_LOG_ENABLED or settings.DOCUMENT_METADATA_ENABLED):
+        return None
+
+    def factory():
+        from .storage.metadata_store import MetadataStore
+        try:
+            return MetadataStore()
+        except Exception as e:
+            logger.warning(f"Metadata store unavailable, query logging and document lookups disabled: {e}")
+            return _UNAVAILABLE
+
+    store = _get_or_create("metadata_store", factory)
+    return None if store is _UNAVAILABLE else store
+
+
+def get_manifest():
+    """Shared read view of the ingestion manifest; summary() reloads it when another process saves"""
+    from .ingestion.manifest import IngestionManifest
+    return _get_or_create("manifest", IngestionManifest)
+
+
+def get_llm(temperature: float = 0.2):
+    from .agents.llm_factory import get_llm as build_llm
+    return _get_or_create(("llm", temperature), lambda: build_llm(temperature=temperature))
+
+
+def get_ingestion_jobs():
+    from .ingestion.jobs import IngestionJobManager
+    return _get_or_create("ingestion_jobs", IngestionJobManager)
+
+
+def get_orchestrator():
+    from .agents.orchestrator import SearchOrchestrator
+    return _get_or_create("orchestrator", SearchOrchestrator)
+
+
+def warm_up() -> Dict[str, Any]:
+    """Build the search stack and run a dummy encode so the first query is fast"""
+    start = time.perf_counter()
+    get_orchestrator()
+    get_embedder().embed_text("warm up")
+    chunks = get_vector_store().count()
+    return {
+        "warm_up_seconds": round(time.perf_counter() - start, 3),
+        "chunks": chunks
+    }
+
+
+def peek(key: Hashable) -> Optional[Any]:
+    """Return an instance only if it has already been built"""
+    instance = _instances.get(key)
+    return None if instance is _UNAVAILABLE else instance
@@ -0,0 +1,97 @@
+from typing import Any, Dict, List, Optional
+import numpy as np
+import operator
+
+COMPARISONS = {
+    "$eq": operator.eq,
+    "$ne": operator.ne,
+    "$gt": operator.gt,
+    "$gte": operator.ge,
+    "$lt": operator.lt,
+    "$lte": operator.le,
+}
+
+
+def matches_where(metadata: Dict[str, Any], where: Dict[str, Any] | None) -> bool:
+    """Evaluate a Chroma-style metadata filter in Python, for stores that search outside Chroma"""
+    if not where:
+        return True
+
+    for key, condition in where.items():
+        if key == "$and":
+            if not all(matches_where(metadata, clause) for clause in condition):
+                return False
+        elif key == "$or":
+            if not any(matches_where(metadata, clause) for clause in condition):
+                return False
+        elif not _matches_condition(metadata.get(key), condition):
+            return False
+    return True
+
+
+def _matches_condition(value: Any, condition: Any) -> bool:
+    if not isinstance(condition, dict):
+        return value == condition
+
+    for op, expected in condition.items():
+        if op == "$in":
+            if value not in expected:
+                return False
+        elif op == "$nin":
+            if value in expected:
+                return False
+        elif op in COMPARISONS:
+            if value is None:
+                return False
+            try:
+                if not COMPARISONS[op](value, expected):
+                    return False
+            except TypeError:
+                return False
+        else:
+            raise ValueError(f"Unsupported filter operator: {op}")
+    return True
+
+
+def column_mask(
+    where: Dict[str, Any] | None,
+    source_names: List[str],
+    sources: np.ndarray,
+    updated_ts: np.ndarray
+) -> Optional[np.ndarray]:
+    """Vectorized source/updated_ts conditions over per-row columns; None if nothing applies
+
+    Other conditions are ignored here and must be checked on the candidates
+    with matches_where.
+    """
+    if not where:
+        return None
+    if "$and" in where:
+        masks = [
+            mask
+            for mask in (column_mask(clause, source_names, sources, updated_ts) for clause in where["$and"])
+            if mask is not None
+        ]
+        return np.logical_and.reduce(masks) if masks else None
+
+    mask = None
+    for key, condition in where.items():
+        if key == "source":
+            if not isinstance(condition, dict):
+                condition = {"$eq": condition}
+            # Only inclusions are masked; $ne, $nin and the rest are left to matches_where
+            if not condition or set(condition) - {"$eq", "$in"}:
+                continue
+            clause = np.ones(len(sources), dtype=bool)
+            for op, expected in condition.items():
+                values = expected if op == "$in" else [expected]
+                clause &= np.isin(sources, [source_names.index(v) for v in values if v in source_names])
+        elif key == "updated_ts" and isinstance(condition, dict):
+            clause = np.ones(len(updated_ts), dtype=bool)
+            for op, bound in condition.items():
+                if op in ("$gte", "$gt", "$lte", "$lt"):
+                    clause &= COMPARISONS[op](updated_ts, bound)
+        else:
+            continue
+        mask = clause if mask is None else mask & clause
+    return mask
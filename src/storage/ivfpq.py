@@ -0,0 +1,104 @@
+from typing import Tuple
+from loguru import logger
+import numpy as np
+
+BATCH_ROWS = 65536
+
+
+def nearest_centroids(data: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Index of the closest centroid (L2) for every row, in batches"""
+    centroid_norms = (centroids ** 2).sum(axis=1)
+    assignments = np.empty(len(data), dtype=np.int64)
+    for start in range(0, len(data), BATCH_ROWS):
+        batch = data[start:start + BATCH_ROWS]
+        # |x - c|^2 = |x|^2 - 2x.c + |c|^2, and |x|^2 does not change the argmin
+        assignments[start:start + len(batch)] = np.argmin(centroid_norms - 2 * batch @ centroids.T, axis=1)
+    return assignments
+
+
+def kmeans(data: np.ndarray, k: int, iterations: int = 20, seed: int = 0) -> np.ndarray:
+    """Lloyd's k-means; empty clusters are reseeded from random points"""
+    rng = np.random.default_rng(seed)
+    centroids = data[rng.choice(len(data), size=k, replace=False)].astype(np.float32)
+    for _ in range(iterations):
+        assignments = nearest_centroids(data, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, data)
+        counts = np.bincount(assignments, minlength=k)
+        empty = counts == 0
+        centroids[~empty] = sums[~empty] / counts[~empty, None]
+        if empty.any():
+            centroids[empty] = data[rng.choice(len(data), size=int(empty.sum()), replace=False)]
+    return centroids
+
+
+class IVFPQCodec:
+    """Inverted-file coarse quantizer with product-quantized residuals
+
+    A vector is stored as its coarse list plus m one-byte codes, one per
+    subspace of the residual from that list's centroid. Inner products are
+    estimated as q.centroid + sum_j LUT[j, code_j], so a query costs one
+    (m x 256) lookup table regardless of how many rows it scores.
+    """
+
+    def __init__(self, coarse: np.ndarray, codebooks: np.ndarray):
+        self.coarse = coarse.astype(np.float32)  # (nlist, d)
+        self.codebooks = codebooks.astype(np.float32)  # (m, 256, d / m)
+        self.nlist = len(coarse)
+        self.m, self.ksub, self.dsub = codebooks.shape
+
+    @classmethod
+    def train(cls, sample: np.ndarray, nlist: int, m: int, iterations: int = 20) -> "IVFPQCodec":
+        dimension = sample.shape[1]
+        if dimension % m:
+            raise ValueError(f"Dimension {dimension} is not divisible into {m} subspaces")
+        # k-means needs a few dozen points per centroid to be meaningful
+        nlist = max(1, min(nlist, len(sample) // 39))
+        ksub = min(256, len(sample))
+
+        logger.info(f"Training IVF coarse quantizer: {nlist} lists on {len(sample)} vectors")
+        coarse = kmeans(sample, nlist, iterations)
+        residuals = sample - coarse[nearest_centroids(sample, coarse)]
+
+        dsub = dimension // m
+        codebooks = np.zeros((m, 256, dsub), dtype=np.float32)
+        for j in range(m):
+            codebooks[j, :ksub] = kmeans(residuals[:, j * dsub:(j + 1) * dsub], ksub, iterations, seed=j)
+        logger.info(f"Trained {m} PQ codebooks of {ksub} centroids x {dsub} dims")
+        return cls(coarse, codebooks)
+
+    def encode(self, vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(coarse list per row, (n, m) uint8 residual codes)"""
+        lists = nearest_centroids(vectors, self.coarse)
+        residuals = vectors - self.coarse[lists]
+        codes = np.empty((len(vectors), self.m), dtype=np.uint8)
+        for j in range(self.m):
+            codes[:, j] = nearest_centroids(residuals[:, j * self.dsub:(j + 1) * self.dsub], self.codebooks[j])
+        return lists.astype(np.int32), codes
+
+    def decode(self, lists: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        """Approximate vectors back from their codes"""
+        residuals = np.concatenate([self.codebooks[j][codes[:, j]] for j in range(self.m)], axis=1)
+        return self.coarse[lists] + residuals
+
+    def probe(self, query: np.ndarray, nprobe: int) -> Tuple[np.ndarray, np.ndarray]:
+        """The nprobe lists with the highest q.centroid, and all q.centroid scores"""
+        coarse_scores = self.coarse @ query
+        nprobe = min(nprobe, self.nlist)
+        return np.argpartition(-coarse_scores, nprobe - 1)[:nprobe], coarse_scores
+
+    def lookup_table(self, query: np.ndarray) -> np.ndarray:
+        """(m, 256) inner products of each query subvector with each codeword"""
+        return np.einsum("jkd,jd->jk", self.codebooks, query.reshape(self.m, self.dsub))
+
+    def score(self, lut: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        """Residual part of q.x for every row of codes"""
+        return lut[np.arange(self.m), codes].sum(axis=1)
+
+    def save(self, path: str):
+        np.savez(path, coarse=self.coarse, codebooks=self.codebooks)
+
+    @classmethod
+    def load(cls, path: str) -> "IVFPQCodec":
+        data = np.load(path)
+        return cls(data["coarse"], data["codebooks"])
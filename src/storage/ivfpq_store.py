@@ -0,0 +1,361 @@
+from typing import Any, Dict, Iterator, List, Optional
+from .ivfpq import IVFPQCodec
+from .filters import matches_where, column_mask
+from config.settings import settings
+from loguru import logger
+import json
+import numpy as np
+import os
+import shutil
+import sqlite3
+import threading
+
+INITIAL_CAPACITY = 1024
+
+
+class IVFPQVectorStore:
+    """Compressed vector store: IVF coarse lists, PQ codes on disk, content in SQLite
+
+    Per chunk, RAM holds only a liveness flag, a source code and an update
+    time; the m-byte PQ codes live in a memory-mapped file, and optional
+    float16 full vectors (for refining the final shortlist) stay on disk.
+    Rows are append-only: an upsert or delete marks the old row dead, and
+    dead rows are reclaimed by re-importing (scripts/train_ivfpq.py).
+    """
+
+    def __init__(self, path: str | None = None):
+        self.path = path or settings.IVFPQ_INDEX_DIR
+        self.nprobe = settings.IVFPQ_NPROBE
+        self.refine_factor = settings.IVFPQ_REFINE_FACTOR
+        os.makedirs(self.path, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self.db = sqlite3.connect(os.path.join(self.path, "chunks.sqlite3"), check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS chunks ("
+            "row INTEGER PRIMARY KEY, id TEXT NOT NULL, list INTEGER NOT NULL, source TEXT, "
+            "source_id TEXT, updated_ts REAL, content TEXT, metadata TEXT, live INTEGER NOT NULL DEFAULT 1)"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS idx_chunks_live_id ON chunks (id) WHERE live = 1")
+        self.db.execute("CREATE INDEX IF NOT EXISTS idx_chunks_live_source_id ON chunks (source_id) WHERE live = 1")
+        self.db.commit()
+
+        self.codec: Optional[IVFPQCodec] = None
+        if os.path.exists(self.codec_path):
+            self.codec = IVFPQCodec.load(self.codec_path)
+        self._load()
+
+    @property
+    def codec_path(self) -> str:
+        return os.path.join(self.path, "codec.npz")
+
+    @property
+    def trained(self) -> bool:
+        return self.codec is not None
+
+    def _load(self):
+        """Rebuild the in-memory lists and columns from SQLite"""
+        self.size = 0
+        self.live = np.zeros(INITIAL_CAPACITY, dtype=bool)
+        self.sources = np.zeros(INITIAL_CAPACITY, dtype=np.uint16)
+        # float32 seconds are precise to a couple of minutes, plenty for time filters
+        self.updated_ts = np.zeros(INITIAL_CAPACITY, dtype=np.float32)
+        self.source_names: List[str] = []
+        self.list_rows: List[np.ndarray] = []
+        self.codes = None
+        self.vectors = None
+        if not self.trained:
+            return
+
+        self.list_rows = [np.zeros(0, dtype=np.int32) for _ in range(self.codec.nlist)]
+        pending: Dict[int, List[int]] = {}
+        cursor = self.db.execute("SELECT row, list, source, updated_ts, live FROM chunks ORDER BY row")
+        while True:
+            batch = cursor.fetchmany(100000)
+            if not batch:
+                break
+            rows = [r[0] for r in batch]
+            self._ensure_capacity(rows[-1] + 1)
+            self.size = rows[-1] + 1
+            self.live[rows] = [bool(r[4]) for r in batch]
+            self.sources[rows] = [self._source_code(r[2]) for r in batch]
+            self.updated_ts[rows] = [r[3] or 0.0 for r in batch]
+            for row, list_id, *_ in batch:
+                pending.setdefault(list_id, []).append(row)
+        for list_id, rows in pending.items():
+            self.list_rows[list_id] = np.asarray(rows, dtype=np.int32)
+
+        self._open_files(truncate=True)
+        logger.info(
+            f"Loaded IVF-PQ store: {int(self.live[:self.size].sum())} live of {self.size} rows, "
+            f"{self.codec.nlist} lists, {self.codec.m} bytes per code"
+        )
+
+    def _open_files(self, truncate: bool = False):
+        """Map the code and vector files; truncate drops bytes written past the last committed row"""
+        for name, row_bytes in (("codes.u8", self.codec.m), ("vectors.f16", self.codec.coarse.shape[1] * 2)):
+            file_path = os.path.join(self.path, name)
+            if truncate and os.path.exists(file_path) and os.path.getsize(file_path) > self.size * row_bytes:
+                with open(file_path, "r+b") as f:
+                    f.truncate(self.size * row_bytes)
+
+        codes_path = os.path.join(self.path, "codes.u8")
+        self.codes = (
+            np.memmap(codes_path, dtype=np.uint8, mode="r", shape=(self.size, self.codec.m))
+            if self.size and os.path.exists(codes_path) else None
+        )
+        vectors_path = os.path.join(self.path, "vectors.f16")
+        dimension = self.codec.coarse.shape[1]
+        self.vectors = (
+            np.memmap(vectors_path, dtype=np.float16, mode="r", shape=(self.size, dimension))
+            if self.size and os.path.exists(vectors_path)
+            and os.path.getsize(vectors_path) == self.size * dimension * 2 else None
+        )
+
+    def _ensure_capacity(self, size: int):
+        capacity = len(self.live)
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        for name in ("live", "sources", "updated_ts"):
+            array = getattr(self, name)
+            grown = np.zeros(capacity, dtype=array.dtype)
+            grown[:len(array)] = array
+            setattr(self, name, grown)
+
+    def _source_code(self, source: Optional[str]) -> int:
+        source = source or ""
+        if source not in self.source_names:
+            self.source_names.append(source)
+        return self.source_names.index(source)
+
+    def train(self, sample: np.ndarray, nlist: int | None = None, m: int | None = None):
+        """Fit the coarse quantizer and PQ codebooks; only allowed while the store is empty"""
+        if self.size:
+            raise RuntimeError("IVF-PQ store already holds data; train into an empty directory")
+        sample = sample / (np.linalg.norm(sample, axis=1, keepdims=True) + 1e-12)
+        self.codec = IVFPQCodec.train(
+            sample.astype(np.float32),
+            nlist=nlist or settings.IVFPQ_NLIST,
+            m=m or settings.IVFPQ_M
+        )
+        self.codec.save(self.codec_path)
+        self._load()
+
+    def add_documents(self, chunks: List[Dict[str, Any]]):
+        """Encode and append chunks; an existing id is replaced"""
+        if not chunks:
+            return
+        if not self.trained:
+            raise RuntimeError("IVF-PQ index is not trained; run scripts/train_ivfpq.py")
+
+        vectors = np.asarray([chunk["embedding"] for chunk in chunks], dtype=np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True) + 1e-12
+        lists, codes = self.codec.encode(vectors)
+
+        with self._lock:
+            replaced = self._live_rows("id", [chunk["id"] for chunk in chunks])
+
+            start = self.size
+            rows = np.arange(start, start + len(chunks), dtype=np.int32)
+            records = []
+            for row, list_id, chunk in zip(rows, lists, chunks):
+                metadata = {
+                    k: v for k, v in chunk["metadata"].items()
+                    if v is not None and isinstance(v, (str, int, float, bool))
+                }
+                records.append((
+                    int(row), chunk["id"], int(list_id), metadata.get("source"), metadata.get("source_id"),
+                    metadata.get("updated_ts"), chunk["content"], json.dumps(metadata)
+                ))
+            try:
+                with open(os.path.join(self.path, "codes.u8"), "ab") as f:
+                    f.write(codes.tobytes())
+                if self.refine_factor > 0:
+                    with open(os.path.join(self.path, "vectors.f16"), "ab") as f:
+                        f.write(vectors.astype(np.float16).tobytes())
+                # Tombstones and replacements commit together, so a crash cannot leave an id with neither
+                with self.db:
+                    self.db.executemany("UPDATE chunks SET live = 0 WHERE row = ?", [(row,) for row in replaced])
+                    self.db.executemany(
+                        "INSERT INTO chunks (row, id, list, source, source_id, updated_ts, content, metadata) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        records
+                    )
+            except Exception:
+                # Drop the bytes appended for rows that were never committed
+                self._open_files(truncate=True)
+                raise
+            self.live[replaced] = False
+
+            self._ensure_capacity(start + len(chunks))
+            self.live[rows] = True
+            self.sources[rows] = [self._source_code(record[3]) for record in records]
+            self.updated_ts[rows] = [record[5] or 0.0 for record in records]
+            for list_id in np.unique(lists):
+                self.list_rows[list_id] = np.concatenate([self.list_rows[list_id], rows[lists == list_id]])
+            self.size = start + len(chunks)
+            self._open_files()
+
+        logger.info(f"Added {len(chunks)} chunks to IVF-PQ store")
+
+    def search(
+        self,
+        query_embedding: List[float],
+        n_results: int = 10,
+        where: Dict[str, Any] = None
+    ) -> List[Dict[str, Any]]:
+        """Probe the nprobe nearest lists, score PQ codes with a lookup table, refine the shortlist"""
+        if not self.trained or not self.size:
+            return []
+
+        query = np.asarray(query_embedding, dtype=np.float32)
+        query /= np.linalg.norm(query) + 1e-12
+
+        with self._lock:
+            codes_file, vectors_file = self.codes, self.vectors
+            probed, coarse_scores = self.codec.probe(query, self.nprobe)
+            rows = np.concatenate([self.list_rows[l] for l in probed])
+            row_lists = np.repeat(probed, [len(self.list_rows[l]) for l in probed])
+
+            keep = self.live[rows]
+            mask = column_mask(where, self.source_names, self.sources[rows], self.updated_ts[rows])
+            if mask is not None:
+                keep &= mask
+        rows, row_lists = rows[keep], row_lists[keep]
+        if not len(rows):
+            return []
+
+        # Sorting the rows turns the memmap gather into mostly sequential reads
+        order = np.argsort(rows)
+        rows, row_lists = rows[order], row_lists[order]
+        scores = coarse_scores[row_lists] + self.codec.score(self.codec.lookup_table(query), codes_file[rows])
+
+        # Oversample: refinement reorders the shortlist and filters the index cannot check drop rows
+        shortlist = min(len(rows), n_results * max(self.refine_factor, 2))
+        top = np.argpartition(-scores, shortlist - 1)[:shortlist]
+        candidates, candidate_scores = rows[top], scores[top]
+        if self.refine_factor > 0 and vectors_file is not None:
+            candidates = np.sort(candidates)
+            candidate_scores = vectors_file[candidates].astype(np.float32) @ query
+
+        ranked = candidates[np.argsort(-candidate_scores)]
+        score_by_row = dict(zip(candidates.tolist(), candidate_scores.tolist()))
+
+        results = []
+        for row, chunk in zip(ranked.tolist(), self._fetch_rows(ranked.tolist())):
+            if chunk is None or not matches_where(chunk["metadata"], where):
+                continue
+            results.append({**chunk, "score": float(score_by_row[row])})
+            if len(results) == n_results:
+                break
+        return results
+
+    def _fetch_rows(self, rows: List[int]) -> List[Optional[Dict[str, Any]]]:
+        """Content and metadata for rows, in the given order"""
+        found = {}
+        with self._lock:
+            for start in range(0, len(rows), 500):
+                batch = rows[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                for row, chunk_id, content, metadata in self.db.execute(
+                    f"SELECT row, id, content, metadata FROM chunks WHERE row IN ({placeholders})", batch
+                ):
+                    found[row] = {"id": chunk_id, "content": content, "metadata": json.loads(metadata)}
+        return [found.get(row) for row in rows]
+
+    def _live_rows(self, column: str, values: List[str]) -> List[int]:
+        rows = []
+        for start in range(0, len(values), 500):
+            batch = values[start:start + 500]
+            placeholders = ",".join("?" * len(batch))
+            rows.extend(
+                row for (row,) in self.db.execute(
+                    f"SELECT row FROM chunks WHERE live = 1 AND {column} IN ({placeholders})", batch
+                )
+            )
+        return rows
+
+    def _mark_dead(self, column: str, values: List[str]) -> int:
+        dead = self._live_rows(column, values)
+        if dead:
+            with self.db:
+                self.db.executemany("UPDATE chunks SET live = 0 WHERE row = ?", [(row,) for row in dead])
+            self.live[dead] = False
+        return len(dead)
+
+    def delete_chunks(self, ids: List[str]):
+        if not ids:
+            return
+        with self._lock:
+            self._mark_dead("id", list(ids))
+
+    def delete_documents(self, source_ids: List[str]):
+        if not source_ids:
+            return
+        with self._lock:
+            self._mark_dead("source_id", list(source_ids))
+
+    def count(self) -> int:
+        with self._lock:
+            return int(self.live[:self.size].sum())
+
+    def iter_chunks(self, batch_size: int = 1000) -> Iterator[List[Dict[str, Any]]]:
+        """Live chunks in row order, with stored float16 vectors or, failing that, PQ reconstructions"""
+        last_row = -1
+        while True:
+            with self._lock:
+                batch = self.db.execute(
+                    "SELECT row, id, list, content, metadata FROM chunks WHERE live = 1 AND row > ? "
+                    "ORDER BY row LIMIT ?",
+                    (last_row, batch_size)
+                ).fetchall()
+            if not batch:
+                return
+            last_row = batch[-1][0]
+            yield self._with_embeddings(batch)
+
+    def get_chunks(self, ids: List[str]) -> List[Dict[str, Any]]:
+        if not ids:
+            return []
+        placeholders = ",".join("?" * len(ids))
+        with self._lock:
+            batch = self.db.execute(
+                f"SELECT row, id, list, content, metadata FROM chunks WHERE live = 1 AND id IN ({placeholders})",
+                list(ids)
+            ).fetchall()
+        return self._with_embeddings(batch)
+
+    def _with_embeddings(self, batch) -> List[Dict[str, Any]]:
+        rows = np.asarray([r[0] for r in batch], dtype=np.int64)
+        if self.vectors is not None:
+            embeddings = self.vectors[rows].astype(np.float32)
+        else:
+            lists = np.asarray([r[2] for r in batch], dtype=np.int64)
+            embeddings = self.codec.decode(lists, np.asarray(self.codes[rows]))
+        return [
+            {"id": chunk_id, "embedding": embedding.tolist(), "content": content, "metadata": json.loads(metadata)}
+            for (_, chunk_id, _, content, metadata), embedding in zip(batch, embeddings)
+        ]
+
+    def memory_bytes(self) -> Dict[str, int]:
+        """Resident index structures versus what stays on disk"""
+        return {
+            "in_memory": int(
+                self.live.nbytes + self.sources.nbytes + self.updated_ts.nbytes
+                + sum(rows.nbytes for rows in self.list_rows)
+                + (self.codec.coarse.nbytes + self.codec.codebooks.nbytes if self.codec else 0)
+            ),
+            "codes_on_disk": int(self.size * self.codec.m) if self.codec else 0,
+            "vectors_on_disk": int(self.vectors.nbytes) if self.vectors is not None else 0
+        }
+
+    def delete_collection(self):
+        """Delete the whole store, codebooks included"""
+        with self._lock:
+            self.db.close()
+            self.codes = self.vectors = None
+            shutil.rmtree(self.path, ignore_errors=True)
+            logger.info(f"Deleted IVF-PQ store at {self.path}")
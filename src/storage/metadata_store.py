@@ -1,8 +1,13 @@
-from sqlalchemy import create_engine, Column, String, DateTime, Integer, JSON, Text
+from sqlalchemy import create_engine, insert, inspect, select, func, text, Column, String, DateTime, Integer, JSON, Text, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from typing import List, Dict, Any, Optional
 from datetime import datetime
 from config.settings import settings
+from loguru import logger
+import os
+import threading
+import time
 
 Base = declarative_base()
 
@@ -15,12 +20,18 @@ class DocumentMetadataModel(Base):
     title = Column(String)
     author = Column(String)
     created_at = Column(DateTime)
-    updated_at = Column(DateTime)
+    updated_at = Column(DateTime, index=True)
     url = Column(String, nullable=True)
+    status = Column(String, nullable=True, index=True)
     tags = Column(JSON)
     extra_metadata = Column(JSON)
+    chunk_count = Column(Integer, default=0)
     indexed_at = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        Index("ix_document_metadata_source_updated_at", "source", "updated_at"),
+    )
+
 class QueryLog(Base):
     __tablename__ = "query_logs"
     
@@ -32,11 +43,62 @@ class QueryLog(Base):
     latency_ms = Column(Integer)
     sources_used = Column(JSON)
 
+def get_database_url() -> str:
+    """Resolve the database URL, using a local SQLite file in sqlite mode"""
+    if settings.DATABASE_BACKEND == "sqlite":
+        os.makedirs(os.path.dirname(settings.SQLITE_PATH) or ".", exist_ok=True)
+        return f"sqlite:///{settings.SQLITE_PATH}"
+    return settings.DATABASE_URL
+
+def create_db_engine(url: str | None = None):
+    """Create a pooled engine for the configured backend"""
+    url = url or get_database_url()
+    if url.startswith("sqlite"):
+        return create_engine(
+            url,
+            connect_args={"check_same_thread": False},
+            pool_pre_ping=True
+        )
+    return create_engine(
+        url,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_pre_ping=True
+    )
+
 class MetadataStore:
     def __init__(self):
-        self.engine = create_engine(settings.DATABASE_URL)
+        self.engine = create_db_engine()
         Base.metadata.create_all(self.engine)
+        self._add_missing_columns()
         self.SessionLocal = sessionmaker(bind=self.engine)
+        self._counts: Dict[str, Dict[str, int]] = {}
+        self._counts_thread: Optional[threading.Thread] = None
+        self._counts_lock = threading.Lock()
+
+    def _add_missing_columns(self):
+        """Bring a document_metadata table created by an older version up to the model
+
+        create_all skips existing tables, so columns and indexes added since
+        (status, chunk_count and their indexes) are added here.
+        """
+        table = DocumentMetadataModel.__table__
+        inspector = inspect(self.engine)
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        existing_indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+
+        with self.engine.begin() as conn:
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                column_type = column.type.compile(dialect=self.engine.dialect)
+                default = f" DEFAULT {column.default.arg}" if column.default is not None and column.default.is_scalar else ""
+                logger.info(f"Adding column {table.name}.{column.name}")
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}{default}"))
+            for index in table.indexes:
+                if index.name not in existing_indexes:
+                    logger.info(f"Creating index {index.name}")
+                    index.create(bind=conn)
     
     def get_session(self):
         return self.SessionLocal()
@@ -53,4 +115,148 @@ class MetadataStore:
             session.add(log)
             session.commit()
         finally:
-            session.close()
\ No newline at end of file
+            session.close()
+
+    def log_queries(self, rows: list):
+        """Bulk insert query log rows in a single transaction"""
+        session = self.get_session()
+        try:
+            session.execute(insert(QueryLog), rows)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def upsert_documents(self, rows: List[Dict[str, Any]], batch_size: int | None = None) -> int:
+        """Insert or update document rows in batches, one statement per batch"""
+        if not rows:
+            return 0
+
+        batch_size = batch_size or settings.METADATA_UPSERT_BATCH_SIZE
+        dialect = self.engine.dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            dialect_insert = None
+
+        if dialect_insert is None:
+            with self.get_session() as session:
+                for row in rows:
+                    session.merge(DocumentMetadataModel(**row))
+                session.commit()
+            return len(rows)
+
+        written = 0
+        with self.engine.begin() as conn:
+            for start in range(0, len(rows), batch_size):
+                batch = rows[start:start + batch_size]
+                stmt = dialect_insert(DocumentMetadataModel).values(batch)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=["id"],
+                    set_={
+                        column: stmt.excluded[column]
+                        for column in batch[0].keys()
+                        if column != "id"
+                    }
+                )
+                conn.execute(stmt)
+                written += len(batch)
+
+        return written
+
+    def delete_documents(self, ids: List[str]):
+        if not ids:
+            return
+        with self.engine.begin() as conn:
+            conn.execute(
+                DocumentMetadataModel.__table__.delete().where(DocumentMetadataModel.id.in_(ids))
+            )
+
+    def get_documents(self, source_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Look up document rows by source id with a single indexed query"""
+        if not source_ids:
+            return {}
+
+        with self.get_session() as session:
+            rows = session.execute(
+                select(DocumentMetadataModel).where(DocumentMetadataModel.source_id.in_(set(source_ids)))
+            ).scalars().all()
+            return {row.source_id: self._to_dict(row) for row in rows}
+
+    def find_documents(
+        self,
+        source: Optional[str] = None,
+        status: Optional[str] = None,
+        updated_after: Optional[datetime] = None,
+        limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        """Filter documents on the indexed source/status/updated_at columns"""
+        stmt = select(DocumentMetadataModel)
+        if source:
+            stmt = stmt.where(DocumentMetadataModel.source == source)
+        if status:
+            stmt = stmt.where(DocumentMetadataModel.status == status)
+        if updated_after:
+            stmt = stmt.where(DocumentMetadataModel.updated_at >= updated_after)
+        stmt = stmt.order_by(DocumentMetadataModel.updated_at.desc()).limit(limit)
+
+        with self.get_session() as session:
+            return [self._to_dict(row) for row in session.execute(stmt).scalars().all()]
+
+    def count_documents(self) -> Dict[str, Dict[str, int]]:
+        """Document and chunk totals per source, as of the last background recount
+
+        Never queries on the caller's thread: the first call starts a thread
+        that recounts every STATS_COUNTS_REFRESH_SECONDS, and until its first
+        pass finishes the result is empty.
+        """
+        if self._counts_thread is None:
+            with self._counts_lock:
+                if self._counts_thread is None:
+                    self._counts_thread = threading.Thread(
+                        target=self._refresh_counts, name="metadata-counts", daemon=True
+                    )
+                    self._counts_thread.start()
+        return self._counts
+
+    def _refresh_counts(self):
+        while True:
+            try:
+                # Swapped in whole, so readers never see a half-built dict
+                self._counts = self._count_documents()
+            except Exception as e:
+                logger.error(f"Error counting documents: {e}")
+            time.sleep(settings.STATS_COUNTS_REFRESH_SECONDS)
+
+    def _count_documents(self) -> Dict[str, Dict[str, int]]:
+        stmt = select(
+            DocumentMetadataModel.source,
+            func.count(DocumentMetadataModel.id),
+            func.coalesce(func.sum(DocumentMetadataModel.chunk_count), 0)
+        ).group_by(DocumentMetadataModel.source)
+
+        with self.get_session() as session:
+            return {
+                source: {"documents": documents, "chunks": int(chunks)}
+                for source, documents, chunks in session.execute(stmt).all()
+            }
+
+    @staticmethod
+    def _to_dict(row: DocumentMetadataModel) -> Dict[str, Any]:
+        return {
+            "id": row.id,
+            "source": row.source,
+            "source_id": row.source_id,
+            "title": row.title,
+            "author": row.author,
+            "created_at": row.created_at.isoformat() if row.created_at else None,
+            "updated_at": row.updated_at.isoformat() if row.updated_at else None,
+            "url": row.url,
+            "status": row.status,
+            "tags": row.tags,
+            "chunk_count": row.chunk_count
+        }
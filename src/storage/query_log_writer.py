@@ -0,0 +1,129 @@
+from typing import Dict, Any, List
+from datetime import datetime
+from ..monitoring.metrics import QUERY_LOG_ROWS
+from config.settings import settings
+from loguru import logger
+import atexit
+import queue
+import threading
+import time
+
+
+class QueryLogWriter:
+    """Bounded queue of query log rows drained by a background bulk writer"""
+
+    def __init__(
+        self,
+        metadata_store,
+        max_queue_size: int | None = None,
+        batch_size: int | None = None,
+        flush_interval_ms: int | None = None
+    ):
+        self.metadata_store = metadata_store
+        self.batch_size = batch_size or settings.QUERY_LOG_BATCH_SIZE
+        self.flush_interval = (flush_interval_ms or settings.QUERY_LOG_FLUSH_INTERVAL_MS) / 1000
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue_size or settings.QUERY_LOG_QUEUE_SIZE)
+        self._stop = threading.Event()
+
+        # Bumped from request threads and the writer thread alike
+        self._counts_lock = threading.Lock()
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+
+        self._thread = threading.Thread(target=self._run, name="query-log-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def submit(
+        self,
+        query: str,
+        results_count: int,
+        latency_ms: int,
+        sources: list,
+        user_id: str | None = None
+    ) -> bool:
+        """Enqueue a row without blocking; returns False if it was dropped"""
+        row = {
+            "query": query,
+            "user_id": user_id,
+            "timestamp": datetime.utcnow(),
+            "results_count": results_count,
+            "latency_ms": latency_ms,
+            "sources_used": sources
+        }
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            dropped = self._count("dropped", 1)
+            if dropped % 1000 == 1:
+                logger.warning(f"Query log queue full, dropped {dropped} rows so far")
+            return False
+        self._count("enqueued", 1)
+        return True
+
+    def close(self, timeout: float = 5.0):
+        """Stop the writer and flush whatever is still queued"""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._thread.join(timeout=timeout)
+        self._write(self._drain(limit=None))
+        logger.info(
+            f"Query log writer stopped | written={self.written} dropped={self.dropped} failed={self.failed}"
+        )
+
+    def stats(self) -> Dict[str, int]:
+        with self._counts_lock:
+            return {
+                "enqueued": self.enqueued,
+                "written": self.written,
+                "dropped": self.dropped,
+                "failed": self.failed,
+                "queued": self._queue.qsize()
+            }
+
+    def _count(self, result: str, rows: int) -> int:
+        """Add to a per-writer count and the matching Prometheus counter; returns the new count"""
+        QUERY_LOG_ROWS.labels(result=result).inc(rows)
+        with self._counts_lock:
+            total = getattr(self, result) + rows
+            setattr(self, result, total)
+            return total
+
+    def _run(self):
+        while not self._stop.is_set():
+            batch: List[Dict[str, Any]] = []
+            deadline = time.monotonic() + self.flush_interval
+
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self._stop.is_set():
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            self._write(batch)
+
+    def _drain(self, limit: int | None) -> List[Dict[str, Any]]:
+        rows = []
+        while limit is None or len(rows) < limit:
+            try:
+                rows.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return rows
+
+    def _write(self, rows: List[Dict[str, Any]]):
+        if not rows:
+            return
+        try:
+            self.metadata_store.log_queries(rows)
+        except Exception as e:
+            self._count("failed", len(rows))
+            logger.error(f"Error writing {len(rows)} query log rows: {e}")
+            return
+        self._count("written", len(rows))
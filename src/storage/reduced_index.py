@@ -0,0 +1,256 @@
+from typing import Any, Dict, List, Optional
+from .filters import matches_where, column_mask
+from ..monitoring.metrics import track_stage
+from config.settings import settings
+from loguru import logger
+import json
+import numpy as np
+import os
+import shutil
+
+# Rows scored per block in the coarse pass, bounding the float32 scratch space
+BLOCK_ROWS = 65536
+
+
+class ReducedIndex:
+    """Low-dimension, low-precision copy of every chunk vector, for a coarse first search stage
+
+    Vectors are reduced by a PCA projection fitted on the corpus or by
+    truncation, then stored as float16 or per-dimension scaled int8 in
+    memory-mapped .npy files. Source and update time are kept alongside so
+    the common filters can be applied before scoring.
+    """
+
+    def __init__(self, path: str | None = None):
+        self.path = path or settings.REDUCED_INDEX_DIR
+        self.ids: List[str] = []
+        self.codes: Optional[np.ndarray] = None
+        self.scales: Optional[np.ndarray] = None
+        self.mean: Optional[np.ndarray] = None
+        self.components: Optional[np.ndarray] = None
+        self.sources: Optional[np.ndarray] = None
+        self.source_names: List[str] = []
+        self.updated_ts: Optional[np.ndarray] = None
+        self.config: Dict[str, Any] = {}
+
+    @classmethod
+    def load(cls, path: str | None = None) -> Optional["ReducedIndex"]:
+        """Open a built index, or None if there is none"""
+        index = cls(path)
+        config_path = os.path.join(index.path, "config.json")
+        if not os.path.exists(config_path):
+            return None
+
+        with open(config_path, "r") as f:
+            index.config = json.load(f)
+        with open(os.path.join(index.path, "ids.json"), "r") as f:
+            index.ids = json.load(f)
+        index.source_names = index.config["source_names"]
+
+        def array(name):
+            return np.load(os.path.join(index.path, f"{name}.npy"), mmap_mode="r")
+
+        index.codes = array("codes")
+        index.sources = array("sources")
+        index.updated_ts = array("updated_ts")
+        if index.config["dtype"] == "int8":
+            index.scales = np.asarray(array("scales"))
+        if index.config["method"] == "pca":
+            index.mean = np.asarray(array("mean"))
+            index.components = np.asarray(array("components"))
+
+        logger.info(
+            f"Loaded reduced index: {len(index.ids)} vectors, {index.config['method']} "
+            f"{index.config['dimension']}d {index.config['dtype']}, {index.codes.nbytes / 1e6:.1f}MB"
+        )
+        return index
+
+    @classmethod
+    def build(
+        cls,
+        vector_store,
+        path: str | None = None,
+        dimension: int | None = None,
+        method: str | None = None,
+        dtype: str | None = None,
+        sample_size: int = 50000,
+        batch_size: int = 1000
+    ) -> "ReducedIndex":
+        """Reduce every vector in the store and write the index files"""
+        index = cls(path)
+        dimension = dimension or settings.REDUCED_DIMENSION
+        method = method or settings.REDUCED_METHOD
+        dtype = dtype or settings.REDUCED_DTYPE
+
+        # Fill one preallocated float32 matrix batch by batch: a list of Python
+        # float lists costs several times the matrix itself at corpus size
+        full = None
+        ids, sources, updated_ts = [], [], []
+        for chunks in vector_store.iter_chunks(batch_size):
+            if not chunks:
+                continue
+            batch = np.asarray([chunk["embedding"] for chunk in chunks], dtype=np.float32)
+            if full is None:
+                full = np.empty((max(vector_store.count(), len(batch)), batch.shape[1]), dtype=np.float32)
+            elif len(ids) + len(batch) > len(full):
+                # Chunks were added since count(); grow rather than fail
+                grown = np.empty((max(2 * len(full), len(ids) + len(batch)), full.shape[1]), dtype=np.float32)
+                grown[:len(ids)] = full[:len(ids)]
+                full = grown
+            full[len(ids):len(ids) + len(batch)] = batch
+            for chunk in chunks:
+                ids.append(chunk["id"])
+                sources.append(chunk["metadata"].get("source", ""))
+                updated_ts.append(chunk["metadata"].get("updated_ts", 0.0))
+        if not ids:
+            raise ValueError("Vector store is empty, nothing to index")
+
+        # Trim rows left over if chunks were deleted since count()
+        full = full[:len(ids)]
+        full /= np.linalg.norm(full, axis=1, keepdims=True) + 1e-12
+
+        if method == "pca":
+            rng = np.random.default_rng(0)
+            sample = full[rng.choice(len(full), size=min(sample_size, len(full)), replace=False)]
+            index.mean = sample.mean(axis=0)
+            # Rows of vt are the principal axes, largest variance first
+            _, _, vt = np.linalg.svd(sample - index.mean, full_matrices=False)
+            index.components = vt[:dimension].astype(np.float32)
+            reduced = (full - index.mean) @ index.components.T
+        elif method == "truncate":
+            reduced = full[:, :dimension]
+        else:
+            raise ValueError(f"Unsupported reduction method: {method}")
+
+        if dtype == "int8":
+            index.scales = (np.abs(reduced).max(axis=0) / 127.0 + 1e-12).astype(np.float32)
+            codes = np.clip(np.round(reduced / index.scales), -127, 127).astype(np.int8)
+        elif dtype == "float16":
+            codes = reduced.astype(np.float16)
+        else:
+            raise ValueError(f"Unsupported reduced dtype: {dtype}")
+
+        index.ids = ids
+        index.source_names = sorted(set(sources))
+        source_codes = {name: code for code, name in enumerate(index.source_names)}
+        index.codes = codes
+        index.sources = np.asarray([source_codes[s] for s in sources], dtype=np.uint16)
+        index.updated_ts = np.asarray(updated_ts, dtype=np.float64)
+        index.config = {
+            "method": method,
+            "dimension": int(reduced.shape[1]),
+            "dtype": dtype,
+            "source_names": index.source_names
+        }
+        index.save()
+        logger.info(
+            f"Built reduced index of {len(ids)} vectors: {full.nbytes / 1e6:.1f}MB -> {codes.nbytes / 1e6:.1f}MB"
+        )
+        return index
+
+    def save(self):
+        """Write to a sibling directory and swap it in, so serving processes keep their mmaps valid"""
+        tmp_path = f"{self.path}.tmp"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+
+        arrays = {"codes": self.codes, "sources": self.sources, "updated_ts": self.updated_ts}
+        if self.scales is not None:
+            arrays["scales"] = self.scales
+        if self.components is not None:
+            arrays.update(mean=self.mean, components=self.components)
+        for name, array in arrays.items():
+            np.save(os.path.join(tmp_path, f"{name}.npy"), array)
+        with open(os.path.join(tmp_path, "ids.json"), "w") as f:
+            json.dump(self.ids, f)
+        with open(os.path.join(tmp_path, "config.json"), "w") as f:
+            json.dump(self.config, f)
+
+        old_path = f"{self.path}.old"
+        shutil.rmtree(old_path, ignore_errors=True)
+        if os.path.exists(self.path):
+            os.replace(self.path, old_path)
+        os.replace(tmp_path, self.path)
+        shutil.rmtree(old_path, ignore_errors=True)
+
+    def project_query(self, query_embedding: List[float]) -> np.ndarray:
+        """Query in code space: PCA-projected, truncated, and scaled for int8 codes"""
+        query = np.asarray(query_embedding, dtype=np.float32)
+        query /= np.linalg.norm(query) + 1e-12
+        if self.components is not None:
+            # x.q = (x - mean).q + mean.q, and the second term is the same for every x
+            query = self.components @ query
+        else:
+            query = query[:self.config["dimension"]]
+        if self.scales is not None:
+            query = query * self.scales
+        return query.astype(np.float32)
+
+    def shortlist(self, query_embedding: List[float], size: int, where: Dict[str, Any] = None) -> List[str]:
+        """Ids of the best `size` candidates by approximate score"""
+        query = self.project_query(query_embedding)
+        mask = column_mask(where, self.source_names, self.sources, self.updated_ts)
+
+        scores = np.empty(len(self.ids), dtype=np.float32)
+        for start in range(0, len(self.ids), BLOCK_ROWS):
+            block = self.codes[start:start + BLOCK_ROWS]
+            scores[start:start + len(block)] = block.astype(np.float32) @ query
+        if mask is not None:
+            scores[~mask] = -np.inf
+
+        size = min(size, len(scores))
+        if size == 0:
+            return []
+        top = np.argpartition(-scores, size - 1)[:size]
+        return [self.ids[row] for row in top if np.isfinite(scores[row])]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+class TwoStageSearcher:
+    """Coarse search over the reduced index, then exact rescoring of the shortlist"""
+
+    def __init__(self, vector_store, index: ReducedIndex, shortlist_size: int | None = None):
+        self.vector_store = vector_store
+        self.index = index
+        self.shortlist_size = shortlist_size or settings.TWO_STAGE_SHORTLIST
+        stored = vector_store.count()
+        if stored and abs(stored - len(index)) > 0.01 * stored:
+            logger.warning(
+                f"Reduced index covers {len(index)} of {stored} chunks; "
+                f"rebuild it with scripts/build_reduced_index.py"
+            )
+
+    def search(
+        self,
+        query_embedding: List[float],
+        n_results: int = 10,
+        where: Dict[str, Any] = None
+    ) -> List[Dict[str, Any]]:
+        with track_stage("coarse_search"):
+            candidates = self.index.shortlist(query_embedding, max(self.shortlist_size, n_results), where)
+
+        with track_stage("rescore"):
+            chunks = [
+                chunk for chunk in self.vector_store.get_chunks(candidates)
+                if matches_where(chunk["metadata"], where)
+            ]
+            if not chunks:
+                return []
+
+            query = np.asarray(query_embedding, dtype=np.float32)
+            query /= np.linalg.norm(query) + 1e-12
+            full = np.asarray([chunk["embedding"] for chunk in chunks], dtype=np.float32)
+            scores = (full @ query) / (np.linalg.norm(full, axis=1) + 1e-12)
+
+            order = np.argsort(-scores)[:n_results]
+            return [
+                {
+                    "id": chunks[i]["id"],
+                    "content": chunks[i]["content"],
+                    "metadata": chunks[i]["metadata"],
+                    "score": float(scores[i])
+                }
+                for i in order
+            ]
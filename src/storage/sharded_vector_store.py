@@ -0,0 +1,172 @@
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from .vector_store import VectorStore, create_chroma_client, REBUILD_SUFFIX
+from config.settings import settings
+from loguru import logger
+import heapq
+import re
+import threading
+
+# Distinct from the tiered store's "__hot"/"__cold_" and rebuild "__rebuild"
+# collections, which share the base name and must not load as shards
+SHARD_PREFIX = "__shard_"
+
+
+class ShardedVectorStore:
+    """One Chroma collection per value of a partition key (the source by default)
+
+    Searches fan out concurrently to the shards a filter selects and merge
+    the per-shard top-k with a heap, so a Jira-only query never scans the
+    Slack collection. Each shard is an ordinary VectorStore and can be
+    rebuilt on its own.
+    """
+
+    def __init__(self, base_name: str | None = None, shard_key: str | None = None):
+        self.base_name = base_name or settings.CHROMA_COLLECTION
+        self.shard_key = shard_key or settings.VECTOR_SHARD_KEY
+        self.shards: Dict[str, VectorStore] = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(
+            max_workers=settings.VECTOR_SHARD_SEARCH_WORKERS,
+            thread_name_prefix="shard-search"
+        )
+        self._load_shards()
+
+    def _load_shards(self):
+        """Open every existing shard collection"""
+        prefix = f"{self.base_name}{SHARD_PREFIX}"
+        for collection in create_chroma_client().list_collections():
+            name = collection.name
+            # Skip half-finished rebuilds left behind by rebuild_collection
+            if name.startswith(prefix) and not name.endswith(REBUILD_SUFFIX):
+                self.shards[name[len(prefix):]] = VectorStore(collection_name=name)
+        logger.info(f"Sharded vector store {self.base_name} by {self.shard_key}: {sorted(self.shards)}")
+
+    @staticmethod
+    def shard_id(value: Any) -> str:
+        # Chroma collection names allow only [a-zA-Z0-9._-]
+        return re.sub(r"[^a-zA-Z0-9._-]", "_", str(value))
+
+    def shard_name(self, value: Any) -> str:
+        return f"{self.base_name}{SHARD_PREFIX}{self.shard_id(value)}"
+
+    def shard(self, value: Any) -> VectorStore:
+        """The shard for a partition value, created on first write"""
+        value = self.shard_id(value)
+        store = self.shards.get(value)
+        if store is not None:
+            return store
+        with self._lock:
+            if value not in self.shards:
+                self.shards[value] = VectorStore(collection_name=self.shard_name(value))
+            return self.shards[value]
+
+    def add_documents(self, chunks: List[Dict[str, Any]]):
+        """Route each chunk to the shard for its partition value"""
+        by_shard: Dict[str, List[Dict[str, Any]]] = {}
+        for chunk in chunks:
+            value = chunk["metadata"].get(self.shard_key)
+            if value is None:
+                raise ValueError(f"Chunk {chunk['id']} has no '{self.shard_key}' to shard by")
+            by_shard.setdefault(self.shard_id(value), []).append(chunk)
+
+        for value, shard_chunks in by_shard.items():
+            self.shard(value).add_documents(shard_chunks)
+
+    def search(
+        self,
+        query_embedding: List[float],
+        n_results: int = 10,
+        where: Dict[str, Any] = None
+    ) -> List[Dict[str, Any]]:
+        """Search the selected shards concurrently and merge their top-k"""
+        targets = [
+            self.shards[value]
+            for value in self._target_values(where)
+            if value in self.shards
+        ]
+        if not targets:
+            return []
+        if len(targets) == 1:
+            return targets[0].search(query_embedding, n_results=n_results, where=where)
+
+        futures = [
+            self._pool.submit(shard.search, query_embedding, n_results, where)
+            for shard in targets
+        ]
+        # Each shard returns results sorted by score, so a k-way heap merge suffices
+        merged = heapq.merge(*(future.result() for future in futures), key=lambda r: -r["score"])
+        return list(islice(merged, n_results))
+
+    def _target_values(self, where: Optional[Dict[str, Any]]) -> Iterable[str]:
+        """Partition values a filter can match; every shard if it does not constrain the key"""
+        values = self._constrained_values(where) if where else None
+        return list(self.shards) if values is None else values
+
+    def _constrained_values(self, where: Dict[str, Any]) -> Optional[List[str]]:
+        if "$and" in where:
+            for clause in where["$and"]:
+                values = self._constrained_values(clause)
+                if values is not None:
+                    return values
+            return None
+
+        condition = where.get(self.shard_key)
+        if condition is None:
+            return None
+        if not isinstance(condition, dict):
+            return [self.shard_id(condition)]
+        if "$eq" in condition:
+            return [self.shard_id(condition["$eq"])]
+        if "$in" in condition:
+            return [self.shard_id(value) for value in condition["$in"]]
+        return None
+
+    def delete_chunks(self, ids: List[str]):
+        """Delete chunks by id from every shard; chunk ids do not record their partition"""
+        for shard in list(self.shards.values()):
+            shard.delete_chunks(ids)
+
+    def delete_documents(self, source_ids: List[str]):
+        for shard in list(self.shards.values()):
+            shard.delete_documents(source_ids)
+
+    def count(self) -> int:
+        return sum(shard.count() for shard in list(self.shards.values()))
+
+    def count_by_shard(self) -> Dict[str, int]:
+        return {value: shard.count() for value, shard in list(self.shards.items())}
+
+    def rebuild_shard(self, value: str, batch_size: int = 1000) -> int:
+        """Rebuild one shard with the configured HNSW settings, leaving the others serving"""
+        value = self.shard_id(value)
+        if value not in self.shards:
+            raise KeyError(f"No shard for {self.shard_key}={value}")
+        return self.shards[value].rebuild_collection(batch_size=batch_size)
+
+    def import_collection(self, source: VectorStore, batch_size: int = 1000) -> int:
+        """Split an unsharded collection into shards"""
+        total = source.count()
+        copied = 0
+        for chunks in source.iter_chunks(batch_size):
+            self.add_documents(chunks)
+            copied += len(chunks)
+            logger.info(f"Sharding {source.collection_name}: copied {copied}/{total} chunks")
+        return copied
+
+    def iter_chunks(self, batch_size: int = 1000) -> Iterator[List[Dict[str, Any]]]:
+        for shard in list(self.shards.values()):
+            yield from shard.iter_chunks(batch_size)
+
+    def get_chunks(self, ids: List[str]) -> List[Dict[str, Any]]:
+        found = []
+        for shard in list(self.shards.values()):
+            found.extend(shard.get_chunks(ids))
+        return found
+
+    def delete_collection(self):
+        """Delete every shard"""
+        for shard in list(self.shards.values()):
+            shard.delete_collection()
+        self.shards.clear()
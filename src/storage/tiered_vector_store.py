@@ -0,0 +1,433 @@
+from typing import Any, Dict, Iterator, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from itertools import islice
+from .vector_store import VectorStore, create_chroma_client
+from .filters import matches_where, column_mask
+from config.settings import settings
+from loguru import logger
+import heapq
+import numpy as np
+import threading
+import time
+
+HOT_SUFFIX = "__hot"
+COLD_PREFIX = "__cold_"
+
+
+def chunk_timestamp(metadata: Dict[str, Any]) -> float:
+    """Update time of a chunk; chunks indexed before updated_ts existed fall back to the ISO fields
+
+    Undated chunks count as the oldest possible, so they live in a cold tier
+    instead of staying hot forever. Naive ISO times are read as UTC, matching
+    the pipeline's updated_ts and month_key.
+    """
+    if isinstance(metadata.get("updated_ts"), (int, float)):
+        return float(metadata["updated_ts"])
+    for key in ("updated_at", "created_at"):
+        value = metadata.get(key)
+        if isinstance(value, str):
+            try:
+                parsed = datetime.fromisoformat(value)
+            except ValueError:
+                continue
+            if parsed.tzinfo is None:
+                parsed = parsed.replace(tzinfo=timezone.utc)
+            return parsed.timestamp()
+    return 0.0
+
+
+def month_key(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime("%Y%m")
+
+
+class HotTier:
+    """Recent chunks held as a normalized in-memory matrix, persisted in a Chroma collection
+
+    Rows live in preallocated arrays that double when full, so appends are
+    amortized O(1). Source and updated_ts are kept as columns so filters are
+    applied vectorized, like the reduced and IVF-PQ indexes do.
+    """
+
+    def __init__(self, store: VectorStore):
+        self.store = store
+        self._lock = threading.RLock()
+        self.ids: List[str] = []
+        self.rows: Dict[str, int] = {}
+        self.contents: List[str] = []
+        self.metadatas: List[Dict[str, Any]] = []
+        self.source_names: List[str] = []
+        self._allocate(1024)
+        self._load()
+
+    def _allocate(self, capacity: int):
+        self.matrix = np.zeros((capacity, settings.EMBEDDING_DIMENSION), dtype=np.float32)
+        # Tier placement time, and the updated_ts filter column (NaN where the chunk has none,
+        # which no range condition matches, as in Chroma)
+        self.timestamps = np.zeros(capacity, dtype=np.float64)
+        self.updated_ts = np.full(capacity, np.nan, dtype=np.float64)
+        self.sources = np.zeros(capacity, dtype=np.uint16)
+
+    def _ensure_capacity(self, size: int):
+        capacity = len(self.matrix)
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        # New arrays are swapped in whole, so searches holding the old ones stay consistent
+        matrix, timestamps, updated_ts, sources = self.matrix, self.timestamps, self.updated_ts, self.sources
+        count = len(self.ids)
+        self._allocate(capacity)
+        self.matrix[:count] = matrix[:count]
+        self.timestamps[:count] = timestamps[:count]
+        self.updated_ts[:count] = updated_ts[:count]
+        self.sources[:count] = sources[:count]
+
+    def _load(self, batch_size: int = 1000):
+        for chunks in self.store.iter_chunks(batch_size):
+            self._put(chunks)
+        logger.info(f"Loaded {len(self.ids)} chunks into the hot tier")
+
+    def upsert(self, chunks: List[Dict[str, Any]]):
+        if not chunks:
+            return
+        self.store.add_documents(chunks)
+        self._put(chunks)
+
+    def _source_code(self, source: Optional[str]) -> int:
+        source = source or ""
+        if source not in self.source_names:
+            self.source_names.append(source)
+        return self.source_names.index(source)
+
+    def _set_row(self, row: int, chunk: Dict[str, Any]):
+        metadata = chunk["metadata"]
+        updated_ts = metadata.get("updated_ts")
+        self.matrix[row] = self._normalize(np.asarray([chunk["embedding"]], dtype=np.float32))[0]
+        self.timestamps[row] = chunk_timestamp(metadata)
+        self.updated_ts[row] = updated_ts if isinstance(updated_ts, (int, float)) else np.nan
+        self.sources[row] = self._source_code(metadata.get("source"))
+
+    def _put(self, chunks: List[Dict[str, Any]]):
+        with self._lock:
+            for chunk in chunks:
+                row = self.rows.get(chunk["id"])
+                if row is None:
+                    row = len(self.ids)
+                    self._ensure_capacity(row + 1)
+                    self._set_row(row, chunk)
+                    self.rows[chunk["id"]] = row
+                    self.ids.append(chunk["id"])
+                    self.contents.append(chunk["content"])
+                    self.metadatas.append(chunk["metadata"])
+                else:
+                    self._set_row(row, chunk)
+                    self.contents[row] = chunk["content"]
+                    self.metadatas[row] = chunk["metadata"]
+
+    def remove(self, ids: List[str]):
+        with self._lock:
+            present = [chunk_id for chunk_id in ids if chunk_id in self.rows]
+            if not present:
+                return
+            self.store.delete_chunks(present)
+            drop = {self.rows[chunk_id] for chunk_id in present}
+            keep = np.asarray([row for row in range(len(self.ids)) if row not in drop], dtype=np.int64)
+            matrix, timestamps, updated_ts, sources = (
+                self.matrix[keep], self.timestamps[keep], self.updated_ts[keep], self.sources[keep]
+            )
+            self.ids = [self.ids[row] for row in keep]
+            self.contents = [self.contents[row] for row in keep]
+            self.metadatas = [self.metadatas[row] for row in keep]
+            self.rows = {chunk_id: row for row, chunk_id in enumerate(self.ids)}
+            self._allocate(max(1024, len(self.matrix)))
+            self.matrix[:len(keep)] = matrix
+            self.timestamps[:len(keep)] = timestamps
+            self.updated_ts[:len(keep)] = updated_ts
+            self.sources[:len(keep)] = sources
+
+    def ids_for_documents(self, source_ids: List[str]) -> List[str]:
+        wanted = set(source_ids)
+        with self._lock:
+            return [
+                chunk_id for chunk_id, metadata in zip(self.ids, self.metadatas)
+                if metadata.get("source_id") in wanted
+            ]
+
+    def take_older_than(self, cutoff: float) -> List[Dict[str, Any]]:
+        """Chunks updated before cutoff, with their embeddings"""
+        with self._lock:
+            return self._chunks(np.nonzero(self.timestamps[:len(self.ids)] < cutoff)[0])
+
+    def get_chunks(self, ids: List[str]) -> List[Dict[str, Any]]:
+        with self._lock:
+            return self._chunks([self.rows[chunk_id] for chunk_id in ids if chunk_id in self.rows])
+
+    def all_chunks(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return self._chunks(range(len(self.ids)))
+
+    def _chunks(self, rows) -> List[Dict[str, Any]]:
+        return [
+            {
+                "id": self.ids[row],
+                "embedding": self.matrix[row].tolist(),
+                "content": self.contents[row],
+                "metadata": self.metadatas[row]
+            }
+            for row in rows
+        ]
+
+    def search(self, query: np.ndarray, n_results: int, where: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        # Writers append past the snapshot size or swap in new arrays, so a
+        # snapshot of the references is consistent without holding the lock while scoring
+        with self._lock:
+            count = len(self.ids)
+            ids, contents, metadatas = self.ids, self.contents, self.metadatas
+            matrix, sources, updated_ts = self.matrix[:count], self.sources[:count], self.updated_ts[:count]
+            source_names = list(self.source_names)
+        if not count or n_results <= 0:
+            return []
+
+        scores = matrix @ query
+        mask = column_mask(where, source_names, sources, updated_ts)
+        if mask is not None:
+            scores[~mask] = -np.inf
+
+        # Conditions column_mask cannot evaluate are checked on the best rows only
+        results = []
+        shortlist = min(count, n_results * 2)
+        while True:
+            top = np.argpartition(-scores, shortlist - 1)[:shortlist]
+            top = top[np.argsort(-scores[top])]
+            results = [
+                {
+                    "id": ids[row],
+                    "content": contents[row],
+                    "metadata": metadatas[row],
+                    "score": float(scores[row])
+                }
+                for row in top
+                if np.isfinite(scores[row]) and matches_where(metadatas[row], where)
+            ][:n_results]
+            if len(results) == n_results or shortlist == count or not np.isfinite(scores[top[-1]]):
+                return results
+            shortlist = min(count, shortlist * 4)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        return vectors / (np.linalg.norm(vectors, axis=1, keepdims=True) + 1e-12)
+
+
+class TieredVectorStore:
+    """Time-partitioned index: an in-memory hot tier of recent chunks and monthly cold collections
+
+    Queries search the hot tier first and touch cold months, newest first,
+    only when the time constraint reaches past the hot window or the hot
+    results are too few or score too low. A background thread rolls aged
+    chunks from hot to cold.
+    """
+
+    def __init__(self, base_name: str | None = None):
+        self.base_name = base_name or settings.CHROMA_COLLECTION
+        self.hot_seconds = settings.HOT_TIER_DAYS * 86400
+        self.min_score = settings.TIER_ESCALATION_MIN_SCORE
+        self.hot = HotTier(VectorStore(collection_name=f"{self.base_name}{HOT_SUFFIX}"))
+        self.cold: Dict[str, VectorStore] = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(
+            max_workers=settings.TIER_COLD_FANOUT,
+            thread_name_prefix="cold-search"
+        )
+        self._load_cold_tiers()
+
+        self._stop = threading.Event()
+        self._roller = None
+        if settings.TIER_ROLL_INTERVAL_SECONDS > 0:
+            self._roller = threading.Thread(target=self._roll_loop, name="tier-roller", daemon=True)
+            self._roller.start()
+
+    def _load_cold_tiers(self):
+        prefix = f"{self.base_name}{COLD_PREFIX}"
+        for collection in create_chroma_client().list_collections():
+            if collection.name.startswith(prefix) and not collection.name.endswith("__rebuild"):
+                self.cold[collection.name[len(prefix):]] = VectorStore(collection_name=collection.name)
+        logger.info(f"Tiered vector store {self.base_name}: {len(self.hot)} hot chunks, cold months {sorted(self.cold)}")
+
+    def cold_tier(self, month: str) -> VectorStore:
+        store = self.cold.get(month)
+        if store is not None:
+            return store
+        with self._lock:
+            if month not in self.cold:
+                self.cold[month] = VectorStore(collection_name=f"{self.base_name}{COLD_PREFIX}{month}")
+            return self.cold[month]
+
+    def hot_cutoff(self) -> float:
+        return time.time() - self.hot_seconds
+
+    def add_documents(self, chunks: List[Dict[str, Any]]):
+        """Write recent chunks to the hot tier and older ones to their month"""
+        cutoff = self.hot_cutoff()
+        hot, cold = [], {}
+        for chunk in chunks:
+            timestamp = chunk_timestamp(chunk["metadata"])
+            if timestamp >= cutoff:
+                hot.append(chunk)
+            else:
+                cold.setdefault(month_key(timestamp), []).append(chunk)
+
+        # A re-ingested chunk may change tier when its document's update time moves.
+        # The pipeline passes the previous update time, so only that one month is
+        # checked; chunks written without it fall back to checking every month
+        destination = {chunk["id"]: "hot" for chunk in hot}
+        for month, month_chunks in cold.items():
+            destination.update((chunk["id"], month) for chunk in month_chunks)
+        self.hot.remove([chunk_id for chunk_id, tier in destination.items() if tier != "hot"])
+
+        previous_months: Dict[str, List[str]] = {}
+        for chunk in chunks:
+            if "previous_updated_ts" not in chunk:
+                months = list(self.cold)
+            elif chunk["previous_updated_ts"] is None:
+                continue  # never indexed before
+            else:
+                months = [month_key(chunk["previous_updated_ts"])]
+            for month in months:
+                if month in self.cold and destination[chunk["id"]] != month:
+                    previous_months.setdefault(month, []).append(chunk["id"])
+        for month, candidates in previous_months.items():
+            store = self.cold[month]
+            moved = store.existing_ids(candidates)
+            if moved:
+                store.delete_chunks(moved)
+
+        self.hot.upsert(hot)
+        for month, month_chunks in cold.items():
+            self.cold_tier(month).add_documents(month_chunks)
+
+    def search(
+        self,
+        query_embedding: List[float],
+        n_results: int = 10,
+        where: Dict[str, Any] = None
+    ) -> List[Dict[str, Any]]:
+        """Hot tier first; cold months only when the time range or result quality needs them"""
+        query = np.asarray(query_embedding, dtype=np.float32)
+        query /= np.linalg.norm(query) + 1e-12
+
+        results = self.hot.search(query, n_results, where)
+        since_ts = self._since(where) if where else None
+        if since_ts is not None and since_ts >= self.hot_cutoff():
+            return results
+        if self._good_enough(results, n_results):
+            return results
+
+        months = sorted(self.cold, reverse=True)
+        if since_ts is not None:
+            oldest = month_key(since_ts)
+            months = [month for month in months if month >= oldest]
+
+        fanout = max(1, settings.TIER_COLD_FANOUT)
+        for start in range(0, len(months), fanout):
+            futures = [
+                self._pool.submit(self.cold[month].search, query_embedding, n_results, where)
+                for month in months[start:start + fanout]
+            ]
+            merged = heapq.merge(results, *(future.result() for future in futures), key=lambda r: -r["score"])
+            results = list(islice(merged, n_results))
+            # Without a time range, stop once older months could no longer improve the answer
+            if since_ts is None and self._good_enough(results, n_results):
+                break
+
+        return results
+
+    def _since(self, where: Dict[str, Any]) -> Optional[float]:
+        """Lower bound on updated_ts in a filter, which limits the months worth searching"""
+        if "$and" in where:
+            bounds = [self._since(clause) for clause in where["$and"]]
+            bounds = [bound for bound in bounds if bound is not None]
+            return max(bounds) if bounds else None
+
+        condition = where.get("updated_ts")
+        if isinstance(condition, dict):
+            bound = condition.get("$gte", condition.get("$gt"))
+            if isinstance(bound, (int, float)):
+                return float(bound)
+        return None
+
+    def _good_enough(self, results: List[Dict[str, Any]], n_results: int) -> bool:
+        return len(results) >= n_results and results[n_results - 1]["score"] >= self.min_score
+
+    def roll(self) -> int:
+        """Move chunks that aged out of the hot window into their monthly cold tier"""
+        aged = self.hot.take_older_than(self.hot_cutoff())
+        if not aged:
+            return 0
+
+        by_month: Dict[str, List[Dict[str, Any]]] = {}
+        for chunk in aged:
+            by_month.setdefault(month_key(chunk_timestamp(chunk["metadata"])), []).append(chunk)
+        # Copy before removing, so a crash in between leaves a duplicate rather than a gap
+        for month, chunks in by_month.items():
+            self.cold_tier(month).add_documents(chunks)
+        self.hot.remove([chunk["id"] for chunk in aged])
+
+        logger.info(f"Rolled {len(aged)} chunks from hot to cold months {sorted(by_month)}")
+        return len(aged)
+
+    def _roll_loop(self):
+        while not self._stop.wait(settings.TIER_ROLL_INTERVAL_SECONDS):
+            try:
+                self.roll()
+            except Exception as e:
+                logger.error(f"Error rolling hot tier: {e}")
+
+    def delete_chunks(self, ids: List[str]):
+        self.hot.remove(ids)
+        for store in list(self.cold.values()):
+            store.delete_chunks(ids)
+
+    def delete_documents(self, source_ids: List[str]):
+        self.hot.remove(self.hot.ids_for_documents(source_ids))
+        for store in list(self.cold.values()):
+            store.delete_documents(source_ids)
+
+    def iter_chunks(self, batch_size: int = 1000) -> Iterator[List[Dict[str, Any]]]:
+        hot = self.hot.all_chunks()
+        for start in range(0, len(hot), batch_size):
+            yield hot[start:start + batch_size]
+        for store in list(self.cold.values()):
+            yield from store.iter_chunks(batch_size)
+
+    def get_chunks(self, ids: List[str]) -> List[Dict[str, Any]]:
+        found = self.hot.get_chunks(ids)
+        missing = [chunk_id for chunk_id in ids if chunk_id not in {chunk["id"] for chunk in found}]
+        for store in list(self.cold.values()):
+            if not missing:
+                break
+            chunks = store.get_chunks(missing)
+            found.extend(chunks)
+            fetched = {chunk["id"] for chunk in chunks}
+            missing = [chunk_id for chunk_id in missing if chunk_id not in fetched]
+        return found
+
+    def count(self) -> int:
+        return len(self.hot) + sum(store.count() for store in list(self.cold.values()))
+
+    def count_by_tier(self) -> Dict[str, int]:
+        return {"hot": len(self.hot), **{month: store.count() for month, store in sorted(self.cold.items())}}
+
+    def close(self):
+        self._stop.set()
+
+    def delete_collection(self):
+        """Delete the hot collection and every cold month"""
+        self.close()
+        self.hot.store.delete_collection()
+        for store in list(self.cold.values()):
+            store.delete_collection()
+        self.cold.clear()
@@ -1,21 +1,58 @@
-import chromadb
-from chromadb.config import Settings as ChromaSettings
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator
 from config.settings import settings
 from loguru import logger
+import os
 
-class VectorStore:
-    def __init__(self):
-        self.client = chromadb.Client(
-            settings=ChromaSettings(
-                persist_directory=settings.CHROMA_PERSIST_DIR,
-                #allow_reset=False,
-                is_persistent=True,
-                anonymized_telemetry=False
-            )
+HNSW_BUILD_KEYS = ("hnsw:space", "hnsw:M", "hnsw:construction_ef")
+REBUILD_SUFFIX = "__rebuild"
+
+def hnsw_metadata() -> Dict[str, Any]:
+    """Collection metadata carrying the configured HNSW parameters"""
+    return {
+        "description": "Enterprise documents collection",
+        "hnsw:space": settings.CHROMA_DISTANCE,
+        "hnsw:M": settings.HNSW_M,
+        "hnsw:construction_ef": settings.HNSW_CONSTRUCTION_EF,
+        "hnsw:search_ef": settings.HNSW_SEARCH_EF
+    }
+
+def distance_to_similarity(distance: float, space: str) -> float:
+    """Turn a Chroma distance into a cosine similarity (embeddings are unit length)"""
+    if space == "l2":
+        # Chroma reports squared L2, and |a - b|^2 = 2 - 2cos for unit vectors
+        return 1 - distance / 2
+    # cosine distance is 1 - cos; ip distance is 1 - dot, which equals cos here
+    return 1 - distance
+
+def create_chroma_client():
+    """Client for the Chroma server if CHROMA_HOST is set, else the persistent directory
+
+    Embedded clients share one system per path, but only within a process;
+    a server is what lets separate processes see each other's writes.
+    """
+    import chromadb
+    from chromadb.config import Settings as ChromaSettings
+
+    if settings.CHROMA_HOST:
+        return chromadb.HttpClient(
+            host=settings.CHROMA_HOST,
+            port=settings.CHROMA_PORT,
+            settings=ChromaSettings(anonymized_telemetry=False)
+        )
+    return chromadb.Client(
+        settings=ChromaSettings(
+            persist_directory=settings.CHROMA_PERSIST_DIR,
+            #allow_reset=False,
+            is_persistent=True,
+            anonymized_telemetry=False
         )
+    )
+
+class VectorStore:
+    def __init__(self, collection_name: str | None = None):
+        self.client = create_chroma_client()
         
-        self.collection_name = settings.CHROMA_COLLECTION
+        self.collection_name = collection_name or settings.CHROMA_COLLECTION
         self._initialize_collection()
     
     def _initialize_collection(self):
@@ -24,17 +61,70 @@ class VectorStore:
             try:
                 self.collection = self.client.get_collection(name=self.collection_name)
             except Exception:
-                self.collection = self.client.create_collection(
+                self.collection = self._recover_rebuild() or self.client.create_collection(
                     name=self.collection_name,
-                    metadata={"description": "Enterprise documents collection"}
+                    metadata=hnsw_metadata()
+                )
+            
+            current = self.collection.metadata or {}
+            self._apply_search_ef(current)
+            # Collections created before these settings existed use Chroma's L2 default
+            self.space = current.get("hnsw:space", "l2")
+            mismatched = {
+                key: (current.get(key), value)
+                for key, value in hnsw_metadata().items()
+                if key in HNSW_BUILD_KEYS and current.get(key) != value
+            }
+            if mismatched:
+                logger.warning(
+                    f"Collection {self.collection_name} was built with different HNSW settings "
+                    f"(current, configured): {mismatched}; run scripts/migrate_vector_index.py to rebuild"
                 )
-            logger.info(f"Initialized collection: {self.collection_name} | count={self.collection.count()}")
+            logger.info(
+                f"Initialized collection: {self.collection_name} | count={self.collection.count()} | space={self.space}"
+            )
         except Exception as e:
             logger.error(f"Error initializing collection: {e}")
             raise
     
+    def _apply_search_ef(self, current: Dict[str, Any]):
+        """search_ef is a query-time setting, so bring an existing collection in line with config"""
+        configured = settings.HNSW_SEARCH_EF
+        if current.get("hnsw:search_ef") == configured:
+            return
+        # Keep every other key: the HNSW segment reads hnsw:space from this metadata on load
+        metadata = {**current, "hnsw:search_ef": configured}
+        try:
+            self.collection.modify(metadata=metadata)
+            logger.info(
+                f"Set hnsw:search_ef={configured} on {self.collection_name} "
+                f"(was {current.get('hnsw:search_ef')}); it applies once the index is reloaded"
+            )
+        except Exception as e:
+            logger.warning(
+                f"Could not change hnsw:search_ef on {self.collection_name} to {configured} ({e}); "
+                f"run scripts/migrate_vector_index.py to rebuild with it"
+            )
+    
+    def _rebuild_marker(self) -> str:
+        """File written once a rebuild copy holds every chunk, so an interrupted swap can be finished"""
+        return os.path.join(settings.CHROMA_PERSIST_DIR, f"{self.collection_name}{REBUILD_SUFFIX}.complete")
+    
+    def _recover_rebuild(self):
+        """Finish a rebuild that crashed between dropping the old collection and renaming the copy"""
+        if not os.path.exists(self._rebuild_marker()):
+            return None
+        try:
+            target = self.client.get_collection(name=f"{self.collection_name}{REBUILD_SUFFIX}")
+        except Exception:
+            return None
+        target.modify(name=self.collection_name)
+        os.remove(self._rebuild_marker())
+        logger.warning(f"Recovered {self.collection_name} from its completed rebuild copy")
+        return self.client.get_collection(name=self.collection_name)
+    
     def add_documents(self, chunks: List[Dict[str, Any]]):
-        """Add document chunks to the vector store"""
+        """Add or replace document chunks in the vector store"""
         try:
             ids = [chunk["id"] for chunk in chunks]
             embeddings = [chunk["embedding"] for chunk in chunks]
@@ -49,7 +139,7 @@ class VectorStore:
                 }
                 metadatas.append(clean_metadata)
 
-            self.collection.add(
+            self.collection.upsert(
                 ids=ids,
                 embeddings=embeddings,
                 documents=documents,
@@ -86,7 +176,7 @@ class VectorStore:
                     "id": results['ids'][0][i],
                     "content": results['documents'][0][i],
                     "metadata": results['metadatas'][0][i],
-                    "score": 1 - results['distances'][0][i]  # Convert distance to similarity
+                    "score": distance_to_similarity(results['distances'][0][i], self.space)
                 })
             
             return formatted_results
@@ -95,6 +185,111 @@ class VectorStore:
             logger.error(f"Error searching: {e}")
             return []
     
+    def delete_chunks(self, ids: List[str]):
+        """Delete chunks by id"""
+        if not ids:
+            return
+        try:
+            self.collection.delete(ids=ids)
+            logger.info(f"Deleted {len(ids)} chunks from vector store")
+        except Exception as e:
+            logger.error(f"Error deleting chunks: {e}")
+            raise
+    
+    def delete_documents(self, source_ids: List[str]):
+        """Delete every chunk belonging to the given documents"""
+        if not source_ids:
+            return
+        try:
+            self.collection.delete(where={"source_id": {"$in": list(source_ids)}})
+            logger.info(f"Deleted chunks of {len(source_ids)} documents from vector store")
+        except Exception as e:
+            logger.error(f"Error deleting documents: {e}")
+            raise
+    
+    def count(self) -> int:
+        """Number of chunks in the collection"""
+        try:
+            return self.collection.count()
+        except Exception as e:
+            logger.error(f"Error counting collection: {e}")
+            return 0
+    
+    def iter_chunks(self, batch_size: int = 1000) -> Iterator[List[Dict[str, Any]]]:
+        """Yield every stored chunk, with its embedding, in batches"""
+        total = self.collection.count()
+        for offset in range(0, total, batch_size):
+            batch = self.collection.get(
+                limit=batch_size,
+                offset=offset,
+                include=["embeddings", "documents", "metadatas"]
+            )
+            if not batch["ids"]:
+                break
+            yield [
+                {"id": chunk_id, "embedding": embedding, "content": content, "metadata": metadata}
+                for chunk_id, embedding, content, metadata in zip(
+                    batch["ids"], batch["embeddings"], batch["documents"], batch["metadatas"]
+                )
+            ]
+    
+    def get_chunks(self, ids: List[str]) -> List[Dict[str, Any]]:
+        """Fetch chunks by id, with embeddings; unknown ids are skipped"""
+        if not ids:
+            return []
+        batch = self.collection.get(ids=list(ids), include=["embeddings", "documents", "metadatas"])
+        return [
+            {"id": chunk_id, "embedding": embedding, "content": content, "metadata": metadata}
+            for chunk_id, embedding, content, metadata in zip(
+                batch["ids"], batch["embeddings"], batch["documents"], batch["metadatas"]
+            )
+        ]
+    
+    def existing_ids(self, ids: List[str]) -> List[str]:
+        """Which of the given ids are stored, without fetching embeddings or documents"""
+        if not ids:
+            return []
+        return self.collection.get(ids=list(ids), include=[])["ids"]
+    
+    def rebuild_collection(self, batch_size: int = 1000) -> int:
+        """Copy every chunk into a collection built with the configured HNSW settings
+
+        The copy is marked complete before the old collection is dropped, and
+        the next VectorStore to open a missing collection finishes the rename,
+        so a crash at any point loses nothing. Other running processes keep a
+        handle to the dropped collection: restart them after a rebuild.
+        """
+        tmp_name = f"{self.collection_name}{REBUILD_SUFFIX}"
+        if os.path.exists(self._rebuild_marker()):
+            os.remove(self._rebuild_marker())
+        try:
+            self.client.delete_collection(name=tmp_name)
+        except Exception:
+            pass
+        target = self.client.create_collection(name=tmp_name, metadata=hnsw_metadata())
+        
+        total = self.collection.count()
+        copied = 0
+        for chunks in self.iter_chunks(batch_size):
+            target.add(
+                ids=[chunk["id"] for chunk in chunks],
+                embeddings=[chunk["embedding"] for chunk in chunks],
+                documents=[chunk["content"] for chunk in chunks],
+                metadatas=[chunk["metadata"] for chunk in chunks]
+            )
+            copied += len(chunks)
+            logger.info(f"Rebuild {self.collection_name}: copied {copied}/{total} chunks")
+        
+        # Swap only once the copy is complete
+        with open(self._rebuild_marker(), "w") as f:
+            f.write(str(copied))
+        self.client.delete_collection(name=self.collection_name)
+        target.modify(name=self.collection_name)
+        os.remove(self._rebuild_marker())
+        self._initialize_collection()
+        logger.warning(f"Rebuilt {self.collection_name}; restart API and watcher processes to pick it up")
+        return copied
+    
     def delete_collection(self):
         """Delete the entire collection"""
         try:
@@ -63,16 +63,19 @@ API_BASE_URL = "http://localhost:8000/api/v1"
 # Initialize session state
 if 'search_history' not in st.session_state:
     st.session_state.search_history = []
+if 'current_result' not in st.session_state:
+    st.session_state.current_result = None
 
-def call_search_api(query, sources=None, max_results=10):
-    """Call the search API"""
+def call_search_api(query, sources=None, max_results=10, cursor=None):
+    """Call the search API; a cursor fetches the next page of an earlier search"""
     try:
         response = requests.post(
             f"{API_BASE_URL}/search",
             json={
                 "query": query,
                 "sources": sources,
-                "max_results": max_results
+                "max_results": max_results,
+                "cursor": cursor
             },
             timeout=30
         )
@@ -185,72 +188,84 @@ if search_button and query:
                 "timestamp": datetime.now(),
                 "result": result
             })
-            
-            # Display results
-            st.markdown("---")
-            
-            # Answer section
-            st.markdown("### 💬 Answer")
-            
-            # Confidence indicator
-            confidence = result.get("confidence", 0)
-            confidence_color = "green" if confidence > 0.7 else "orange" if confidence > 0.4 else "red"
-            
-            col1, col2, col3 = st.columns([3, 1, 1])
-            with col2:
-                st.metric("Confidence", f"{confidence*100:.0f}%")
-            with col3:
-                st.metric("Latency", f"{result.get('latency_ms', 0)}ms")
-            
-            # Answer text
-            st.markdown(f"""
-            <div class='result-card'>
-                <p style='font-size: 1.1rem; line-height: 1.6;'>{result.get('answer', 'No answer available')}</p>
-            </div>
-            """, unsafe_allow_html=True)
-            
-            # Citations
-            if result.get("citations"):
-                st.markdown("### 📎 Citations")
-                for citation in result["citations"]:
-                    with st.expander(f"📄 [{citation['source_number']}] {citation['title']} ({citation['source']})"):
-                        st.markdown(f"**Excerpt:** {citation['excerpt']}")
-                        if citation.get('url'):
-                            st.markdown(f"[🔗 View Source]({citation['url']})")
-            
-            # Documents
-            if result.get("documents"):
-                st.markdown("### 📚 Retrieved Documents")
-                
-                # Source distribution
-                source_counts = {}
-                for doc in result["documents"]:
-                    source = doc["source"]
-                    source_counts[source] = source_counts.get(source, 0) + 1
-                
-                # Visualization
-                fig = go.Figure(data=[
-                    go.Bar(
-                        x=list(source_counts.keys()),
-                        y=list(source_counts.values()),
-                        marker_color=['#667eea', '#764ba2', '#f093fb', '#4facfe']
-                    )
-                ])
-                fig.update_layout(
-                    title="Documents by Source",
-                    xaxis_title="Source",
-                    yaxis_title="Count",
-                    height=300
-                )
-                st.plotly_chart(fig, use_container_width=True)
-                
-                # Document list
-                for idx, doc in enumerate(result["documents"], 1):
-                    with st.expander(f"📄 {idx}. {doc['title']} ({doc['source']}) - Score: {doc['score']:.2f}"):
-                        st.markdown(f"**Excerpt:** {doc['excerpt']}")
-                        if doc.get('url'):
-                            st.markdown(f"[🔗 View Full Document]({doc['url']})")
-                        st.markdown(f"**Relevance Score:** {doc['score']:.3f}")
+            st.session_state.current_result = result
+
+# Display the current search; "Load more" reruns the script, so it lives in session state
+result = st.session_state.current_result
+if result:
+    # Display results
+    st.markdown("---")
+    
+    # Answer section
+    st.markdown("### 💬 Answer")
+    
+    # Confidence indicator
+    confidence = result.get("confidence", 0)
+    confidence_color = "green" if confidence > 0.7 else "orange" if confidence > 0.4 else "red"
+    
+    col1, col2, col3 = st.columns([3, 1, 1])
+    with col2:
+        st.metric("Confidence", f"{confidence*100:.0f}%")
+    with col3:
+        st.metric("Latency", f"{result.get('latency_ms', 0)}ms")
+    
+    # Answer text
+    st.markdown(f"""
+    <div class='result-card'>
+        <p style='font-size: 1.1rem; line-height: 1.6;'>{result.get('answer', 'No answer available')}</p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    # Citations
+    if result.get("citations"):
+        st.markdown("### 📎 Citations")
+        for citation in result["citations"]:
+            with st.expander(f"📄 [{citation['source_number']}] {citation['title']} ({citation['source']})"):
+                st.markdown(f"**Excerpt:** {citation['excerpt']}")
+                if citation.get('url'):
+                    st.markdown(f"[🔗 View Source]({citation['url']})")
+    
+    # Documents
+    if result.get("documents"):
+        st.markdown("### 📚 Retrieved Documents")
+        
+        # Source distribution
+        source_counts = {}
+        for doc in result["documents"]:
+            source = doc["source"]
+            source_counts[source] = source_counts.get(source, 0) + 1
+        
+        # Visualization
+        fig = go.Figure(data=[
+            go.Bar(
+                x=list(source_counts.keys()),
+                y=list(source_counts.values()),
+                marker_color=['#667eea', '#764ba2', '#f093fb', '#4facfe']
+            )
+        ])
+        fig.update_layout(
+            title="Documents by Source",
+            xaxis_title="Source",
+            yaxis_title="Count",
+            height=300
+        )
+        st.plotly_chart(fig, use_container_width=True)
+        
+        # Document list
+        for idx, doc in enumerate(result["documents"], 1):
+            with st.expander(f"📄 {idx}. {doc['title']} ({doc['source']}) - Score: {doc['score']:.2f}"):
+                st.markdown(f"**Excerpt:** {doc['excerpt']}")
+                if doc.get('url'):
+                    st.markdown(f"[🔗 View Full Document]({doc['url']})")
+                st.markdown(f"**Relevance Score:** {doc['score']:.3f}")
+        
+        # Next pages come from the server's stored result set, without a new answer
+        if result.get("next_cursor") and st.button("⬇️ Load more results"):
+            page = call_search_api(result["query"], max_results=max_results, cursor=result["next_cursor"])
+            if page:
+                result["documents"].extend(page["documents"])
+                result["next_cursor"] = page.get("next_cursor")
+                st.rerun()
 
 # Search history
 if st.session_state.search_history:
@@ -0,0 +1,41 @@
+import pytest
+
+from config.settings import settings
+from src.ingestion.jobs import BackendNotSupported, IngestionJobManager, check_job_backend
+
+
+@pytest.fixture
+def job_settings(monkeypatch):
+    monkeypatch.setattr(settings, "INGEST_JOBS_ENABLED", True)
+    monkeypatch.setattr(settings, "VECTOR_STORE_BACKEND", "chroma")
+    monkeypatch.setattr(settings, "CHROMA_HOST", "localhost")
+    return settings
+
+
+def test_jobs_allowed_against_chroma_server(job_settings):
+    check_job_backend()
+
+
+def test_jobs_disabled_by_default(job_settings, monkeypatch):
+    monkeypatch.setattr(settings, "INGEST_JOBS_ENABLED", False)
+    with pytest.raises(BackendNotSupported, match="disabled"):
+        check_job_backend()
+
+
+def test_jobs_refused_on_embedded_chroma(job_settings, monkeypatch):
+    monkeypatch.setattr(settings, "CHROMA_HOST", None)
+    with pytest.raises(BackendNotSupported, match="CHROMA_HOST"):
+        check_job_backend()
+
+
+@pytest.mark.parametrize("backend", ["sharded", "tiered", "ivfpq"])
+def test_jobs_refused_on_process_local_backends(job_settings, monkeypatch, backend):
+    monkeypatch.setattr(settings, "VECTOR_STORE_BACKEND", backend)
+    with pytest.raises(BackendNotSupported, match=backend):
+        check_job_backend()
+
+
+def test_manager_fails_fast_when_misconfigured(job_settings, monkeypatch):
+    monkeypatch.setattr(settings, "CHROMA_HOST", None)
+    with pytest.raises(BackendNotSupported):
+        IngestionJobManager()
@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+from config.settings import settings
+from src.storage.ivfpq_store import IVFPQVectorStore
+
+DIMENSION = 16
+NLIST = 4
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    # Probe every list so a search sees every live row
+    monkeypatch.setattr(settings, "IVFPQ_NPROBE", NLIST)
+    monkeypatch.setattr(settings, "IVFPQ_REFINE_FACTOR", 2)
+    store = IVFPQVectorStore(str(tmp_path / "ivfpq"))
+    sample = np.random.default_rng(0).standard_normal((300, DIMENSION)).astype(np.float32)
+    store.train(sample, nlist=NLIST, m=4)
+    return store
+
+
+def make_chunks(count: int, seed: int = 1, prefix: str = "doc"):
+    vectors = np.random.default_rng(seed).standard_normal((count, DIMENSION)).astype(np.float32)
+    return [
+        {
+            "id": f"{prefix}-{i // 2}_chunk_{i % 2}",
+            "embedding": vector.tolist(),
+            "content": f"{prefix} content {i}",
+            "metadata": {"source": "jira", "source_id": f"{prefix}-{i // 2}", "updated_ts": 1.0e9 + i}
+        }
+        for i, vector in enumerate(vectors)
+    ]
+
+
+def search_ids(store, embedding, n_results=50):
+    return [hit["id"] for hit in store.search(embedding, n_results=n_results)]
+
+
+def test_deleted_chunks_are_never_returned(store):
+    chunks = make_chunks(20)
+    store.add_documents(chunks)
+    deleted = chunks[3]
+
+    store.delete_chunks([deleted["id"]])
+
+    assert deleted["id"] not in search_ids(store, deleted["embedding"])
+    assert store.count() == 19
+    assert store.get_chunks([deleted["id"]]) == []
+    assert deleted["id"] not in {chunk["id"] for batch in store.iter_chunks() for chunk in batch}
+
+
+def test_deleted_documents_drop_all_their_chunks(store):
+    chunks = make_chunks(20)
+    store.add_documents(chunks)
+
+    store.delete_documents(["doc-1"])
+
+    returned = set(search_ids(store, chunks[2]["embedding"]))
+    assert not returned & {"doc-1_chunk_0", "doc-1_chunk_1"}
+    assert store.count() == 18
+
+
+def test_upsert_replaces_the_old_row(store):
+    chunks = make_chunks(20)
+    store.add_documents(chunks)
+    replacement = {**make_chunks(1, seed=7)[0], "id": chunks[5]["id"], "content": "updated content"}
+
+    store.add_documents([replacement])
+
+    hits = [hit for hit in store.search(chunks[5]["embedding"], n_results=50) if hit["id"] == chunks[5]["id"]]
+    assert len(hits) == 1
+    assert hits[0]["content"] == "updated content"
+    assert store.count() == 20
+    assert [chunk["content"] for chunk in store.get_chunks([chunks[5]["id"]])] == ["updated content"]
+
+
+def test_tombstones_survive_a_reload(store):
+    chunks = make_chunks(20)
+    store.add_documents(chunks)
+    store.delete_chunks([chunks[0]["id"]])
+    store.add_documents([{**chunks[1], "content": "updated content"}])
+
+    reopened = IVFPQVectorStore(store.path)
+
+    assert reopened.count() == 19
+    assert chunks[0]["id"] not in search_ids(reopened, chunks[0]["embedding"])
+    contents = [hit["content"] for hit in reopened.search(chunks[1]["embedding"], 50) if hit["id"] == chunks[1]["id"]]
+    assert contents == ["updated content"]
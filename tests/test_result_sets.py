@@ -0,0 +1,91 @@
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.agents.result_sets import CursorExpired, ResultSetStore
+from src.api import routes
+
+
+def result_set(count: int):
+    return {
+        "query": "deploy failures",
+        "documents": [{"id": f"doc-{i}", "score": 1.0 - i / count} for i in range(count)]
+    }
+
+
+def page_through(store: ResultSetStore, set_id: str, size: int):
+    cursor, pages = store.make_cursor(set_id, 0), []
+    while cursor:
+        _, documents, cursor = store.page(cursor, size)
+        pages.append([doc["id"] for doc in documents])
+    return pages
+
+
+def test_pages_cover_the_set_in_order_without_overlap():
+    store = ResultSetStore(ttl_seconds=60, max_sets=10)
+    set_id = store.put(result_set(23))
+
+    pages = page_through(store, set_id, 10)
+
+    assert [len(page) for page in pages] == [10, 10, 3]
+    ids = [doc_id for page in pages for doc_id in page]
+    assert ids == [f"doc-{i}" for i in range(23)]
+
+
+def test_pages_are_stable_across_reads():
+    store = ResultSetStore(ttl_seconds=60, max_sets=10)
+    set_id = store.put(result_set(15))
+
+    assert page_through(store, set_id, 5) == page_through(store, set_id, 5)
+
+
+def test_last_page_has_no_next_cursor():
+    store = ResultSetStore(ttl_seconds=60, max_sets=10)
+    set_id = store.put(result_set(10))
+
+    _, documents, next_cursor = store.page(store.make_cursor(set_id, 5), 5)
+
+    assert len(documents) == 5
+    assert next_cursor is None
+
+
+def test_expired_cursor_raises(monkeypatch):
+    store = ResultSetStore(ttl_seconds=60, max_sets=10)
+    set_id = store.put(result_set(20))
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 61)
+
+    with pytest.raises(CursorExpired):
+        store.page(store.make_cursor(set_id, 10), 10)
+
+
+def test_evicted_and_malformed_cursors_raise():
+    store = ResultSetStore(ttl_seconds=60, max_sets=1)
+    evicted = store.put(result_set(20))
+    store.put(result_set(20))
+
+    with pytest.raises(CursorExpired):
+        store.page(store.make_cursor(evicted, 10), 10)
+    with pytest.raises(CursorExpired):
+        store.page("not-a-cursor", 10)
+
+
+class ExpiredOrchestrator:
+    def search(self, **kwargs):
+        raise CursorExpired("Cursor expired; run the search again")
+
+    def retrieve(self, **kwargs):
+        raise CursorExpired("Cursor expired; run the search again")
+
+
+@pytest.mark.parametrize("path", ["/search", "/retrieve"])
+def test_expired_cursor_maps_to_410(monkeypatch, path):
+    monkeypatch.setattr(routes, "get_orchestrator", ExpiredOrchestrator)
+    app = FastAPI()
+    app.include_router(routes.router)
+
+    response = TestClient(app).post(path, json={"query": "deploy failures", "cursor": "abc.10"})
+
+    assert response.status_code == 410
@@ -0,0 +1,106 @@
+import threading
+
+import pytest
+
+from src.agents.singleflight import SingleFlight
+
+CALLERS = 8
+
+
+def run_concurrently(flight: SingleFlight, fn):
+    """Start CALLERS threads on the same key; returns ([(result, shared)], [errors])"""
+    results, errors = [], []
+    lock = threading.Lock()
+
+    def call():
+        try:
+            outcome = flight.do("key", fn)
+        except Exception as e:
+            with lock:
+                errors.append(e)
+        else:
+            with lock:
+                results.append(outcome)
+
+    threads = [threading.Thread(target=call) for _ in range(CALLERS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+    return results, errors
+
+
+def blocking(fn, entered: threading.Event, release: threading.Event):
+    """Wrap fn so the leader waits until every follower has joined the call"""
+    def wrapped():
+        entered.set()
+        release.wait(timeout=5)
+        return fn()
+    return wrapped
+
+
+def release_when_all_waiting(flight: SingleFlight, entered: threading.Event, release: threading.Event):
+    def watch():
+        entered.wait(timeout=5)
+        while flight._calls["key"].waiters < CALLERS - 1:
+            threading.Event().wait(0.001)
+        release.set()
+    threading.Thread(target=watch, daemon=True).start()
+
+
+def test_concurrent_callers_share_one_execution():
+    flight = SingleFlight()
+    calls = []
+    entered, release = threading.Event(), threading.Event()
+    release_when_all_waiting(flight, entered, release)
+
+    def fn():
+        calls.append(1)
+        return {"answer": 42}
+
+    results, errors = run_concurrently(flight, blocking(fn, entered, release))
+
+    assert not errors
+    assert len(calls) == 1
+    assert len(results) == CALLERS
+    assert all(result is results[0][0] for result, _ in results)
+    assert all(shared for _, shared in results)
+    assert flight.in_flight() == 0
+
+
+def test_exception_reaches_every_caller():
+    flight = SingleFlight()
+    calls = []
+    entered, release = threading.Event(), threading.Event()
+    release_when_all_waiting(flight, entered, release)
+
+    def fn():
+        calls.append(1)
+        raise RuntimeError("backend down")
+
+    results, errors = run_concurrently(flight, blocking(fn, entered, release))
+
+    assert not results
+    assert len(calls) == 1
+    assert len(errors) == CALLERS
+    assert all(isinstance(e, RuntimeError) and str(e) == "backend down" for e in errors)
+    assert flight.in_flight() == 0
+
+
+def test_sequential_calls_run_again():
+    flight = SingleFlight()
+    counter = iter(range(10))
+
+    assert flight.do("key", lambda: next(counter)) == (0, False)
+    assert flight.do("key", lambda: next(counter)) == (1, False)
+
+
+def test_failed_key_is_retried():
+    flight = SingleFlight()
+
+    def fail():
+        raise ValueError("first")
+
+    with pytest.raises(ValueError):
+        flight.do("key", fail)
+    assert flight.do("key", lambda: "second") == ("second", False)